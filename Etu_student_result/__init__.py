@@ -0,0 +1,7 @@
+# Load the Celery app when Django starts so shared_task uses it (Celery is optional).
+try:
+    from .celery import app as celery_app
+except ImportError:  # pragma: no cover - celery not installed
+    celery_app = None
+
+__all__ = ('celery_app',)
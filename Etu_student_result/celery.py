@@ -0,0 +1,20 @@
+"""
+Celery application for background jobs (result upload processing).
+
+Start a worker with:
+    celery -A Etu_student_result worker -l info
+
+Configuration is read from Django settings using the CELERY_ prefix. When no
+CELERY_BROKER_URL is configured, jobs are executed inline (see
+lecturer.tasks.enqueue_upload_job).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Etu_student_result.settings')
+
+app = Celery('Etu_student_result')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
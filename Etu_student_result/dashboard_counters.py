@@ -0,0 +1,93 @@
+"""
+Cached counters for the lecturer, HOD and DEAN dashboards.
+
+Each dashboard reads one cache entry per actor instead of running COUNT(*)
+queries over Result and ResultApprovalWorkflow on every page load. On a miss
+the counters are computed with a single conditional aggregate and cached for
+DASHBOARD_COUNTER_TTL seconds.
+
+Entries are invalidated explicitly whenever the underlying rows change: the
+post_save/post_delete receivers in admin_hierarchy.signals cover single-row
+writes, and the bulk paths (CSV/assessment ingestion, bulk review and publish)
+call invalidate_dashboard_counters with the actors they touched.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+
+def _key(scope, pk):
+    return f'dashboard-counters:{scope}:{pk}'
+
+
+def _cached(scope, pk, compute):
+    key = _key(scope, pk)
+    counters = cache.get(key)
+    if counters is None:
+        counters = compute()
+        cache.set(key, counters, getattr(settings, 'DASHBOARD_COUNTER_TTL', 600))
+    return counters
+
+
+def lecturer_counters(lecturer):
+    """{'total', 'pending', 'published'} for results uploaded by `lecturer`."""
+    from student.models import Result
+
+    return _cached('lecturer', lecturer.pk, lambda: Result.objects.filter(uploaded_by=lecturer).aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(is_published=False)),
+        published=Count('id', filter=Q(is_published=True)),
+    ))
+
+
+def hod_counters(hod):
+    """{'pending', 'approved'} workflows currently assigned to `hod`."""
+    from admin_hierarchy.models import ResultApprovalWorkflow
+
+    return _cached('hod', hod.pk, lambda: ResultApprovalWorkflow.objects.filter(current_hod=hod).aggregate(
+        pending=Count('id', filter=Q(status='lecturer_submitted')),
+        approved=Count('id', filter=Q(status='hod_approved')),
+    ))
+
+
+def dean_counters(dean):
+    """{'pending', 'approved'} workflows currently assigned to `dean`."""
+    from admin_hierarchy.models import ResultApprovalWorkflow
+
+    return _cached('dean', dean.pk, lambda: ResultApprovalWorkflow.objects.filter(current_dean=dean).aggregate(
+        pending=Count('id', filter=Q(status='hod_approved')),
+        approved=Count('id', filter=Q(status='dean_approved')),
+    ))
+
+
+def faculty_counters(faculty):
+    """{'hod_count', 'result_count'} for `faculty` (None gives zeros)."""
+    if faculty is None:
+        return {'hod_count': 0, 'result_count': 0}
+    from admin_hierarchy.models import HeadOfDepartment
+    from student.models import Result
+
+    return _cached('faculty', faculty.pk, lambda: {
+        'hod_count': HeadOfDepartment.objects.filter(department__faculty=faculty).count(),
+        'result_count': Result.objects.filter(faculty=faculty).count(),
+    })
+
+
+def invalidate_dashboard_counters(lecturers=(), hods=(), deans=(), faculties=()):
+    """Drop the cached counters of the given actors (ids); None ids are ignored.
+
+    Entries are dropped immediately and again once the surrounding
+    transaction commits, so a dashboard rendered mid-transaction cannot keep
+    stale numbers cached.
+    """
+    keys = [
+        _key(scope, pk)
+        for scope, ids in (('lecturer', lecturers), ('hod', hods), ('dean', deans), ('faculty', faculties))
+        for pk in set(ids)
+        if pk is not None
+    ]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
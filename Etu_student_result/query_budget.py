@@ -0,0 +1,162 @@
+"""
+Per-request SQL instrumentation and query budgets.
+
+QueryBudgetMiddleware counts the queries and database time of every request
+and groups the statements by shape (the SQL with literals and IN lists
+collapsed). A shape executed QUERY_REPEAT_THRESHOLD or more times in one
+request is reported as a likely N+1. Each request writes one JSON line to the
+'performance' logger and gets X-DB-Query-Count, X-DB-Time-Ms and, when shapes
+repeat, X-DB-Repeated-Queries headers. The middleware only runs when
+QUERY_INSPECTION is enabled (by default in DEBUG), so production requests
+pay nothing.
+
+Views declare how many queries they may run with @query_budget(n). Requests
+over budget are logged at WARNING, and tests enforce the budget with
+QueryBudgetTestMixin.assertWithinQueryBudget.
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('performance')
+
+DEFAULT_REPEAT_THRESHOLD = 5
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def query_shape(sql):
+    """`sql` with IN lists and literal values collapsed, so N+1 lookups compare equal."""
+    return _LITERAL.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+    """connection.execute_wrapper counting statements, time and shapes."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 1)
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """[(shape, count)] for shapes executed at least `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+@contextmanager
+def record_queries():
+    """Record every statement run on any configured database inside the block."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run per request."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def declared_budget(resolver_match):
+    """The @query_budget of the view `resolver_match` points at, or None."""
+    if resolver_match is None:
+        return None
+    func = resolver_match.func
+    budget = getattr(func, 'query_budget', None)
+    if budget is None:  # class-based views
+        budget = getattr(getattr(func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+class QueryBudgetMiddleware:
+    """Log query count, DB time and repeated query shapes for each request."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTION', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+
+    def __call__(self, request):
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        budget = declared_budget(match)
+        repeated = recorder.repeated(self.threshold)
+        over_budget = budget is not None and recorder.count > budget
+
+        logger.log(
+            logging.WARNING if repeated or over_budget else logging.INFO,
+            json.dumps({
+                'event': 'db_queries',
+                'view': (match.view_name or match._func_path) if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'db_ms': recorder.duration_ms,
+                'budget': budget,
+                'over_budget': over_budget,
+                'repeated': [{'count': count, 'sql': shape[:500]} for shape, count in repeated],
+            }),
+        )
+
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = str(recorder.duration_ms)
+        if repeated:
+            response['X-DB-Repeated-Queries'] = str(len(repeated))
+        return response
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin failing when a request runs more queries than its view's budget."""
+
+    def assertWithinQueryBudget(self, request, *args, budget=None, **kwargs):
+        """Call `request(*args, **kwargs)` (e.g. self.client.get) and check its query count.
+
+        The budget is `budget` or the view's @query_budget. Returns the response.
+        """
+        with record_queries() as recorder:
+            response = request(*args, **kwargs)
+
+        if budget is None:
+            budget = declared_budget(getattr(response, 'resolver_match', None))
+        if budget is None:
+            self.fail('No query budget given and the view does not declare one with @query_budget')
+
+        if recorder.count > budget:
+            repeated = ''.join(
+                f'\n  {count}x {shape}' for shape, count in recorder.repeated(threshold=2)
+            )
+            self.fail(
+                f'{recorder.count} queries exceed the budget of {budget}'
+                + (f'; repeated shapes:{repeated}' if repeated else '')
+            )
+        return response
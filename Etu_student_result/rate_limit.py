@@ -0,0 +1,112 @@
+"""
+Shared sliding-window rate limiting.
+
+Each client (the logged-in user, or the IP address for anonymous requests)
+gets a counter per RATE_LIMIT_WINDOW in the 'ratelimit' cache alias. A
+request is allowed while
+
+    previous window count * (share of the previous window still in range)
+    + current window count
+
+stays under the client's limit. Each check costs one get_many and one
+add/incr, whatever the client's request rate, and with a shared cache
+(DJANGO_CACHE_URL) the limits hold across all workers instead of per
+process. Counters expire two windows after their last write. The local-memory
+store evicts the least recently used clients once RATE_LIMIT_MAX_KEYS are
+tracked, and Redis should run with an LRU maxmemory-policy.
+
+Limits are per role (RATE_LIMITS) and, for sensitive paths such as the login
+forms, per route (RATE_LIMIT_ROUTES, counted separately from the role
+limit). The role is stored in the session at login (see the user_logged_in
+receiver in admin_hierarchy.signals), so checking a limit never queries the
+database.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+
+ROLE_SESSION_KEY = '_rate_limit_role'
+
+DEFAULT_WINDOW = 60
+DEFAULT_LIMITS = {'anonymous': 60, 'user': 120}
+
+# Checked in order; the first profile the user has decides the role
+PROFILE_ROLES = (
+    ('student_profile', 'student'),
+    ('lecturer_profile', 'lecturer'),
+    ('hod_profile', 'hod'),
+    ('dean_profile', 'dean'),
+    ('exam_officer_profile', 'exam_officer'),
+)
+
+
+def user_role(user):
+    """The rate-limit role of `user`: 'staff', a profile role or 'user'."""
+    if user.is_staff or user.is_superuser:
+        return 'staff'
+    for profile_attr, role in PROFILE_ROLES:
+        if hasattr(user, profile_attr):
+            return role
+    return 'user'
+
+
+def mark_session_role(session, user):
+    """Record the rate-limit role of `user` in their session."""
+    session[ROLE_SESSION_KEY] = user_role(user)
+
+
+def client_identity(request):
+    """(key, role) the request is limited under."""
+    session = getattr(request, 'session', None)
+    user_id = session.get(SESSION_KEY) if session is not None else None
+    if user_id is not None:
+        return f'user:{user_id}', session.get(ROLE_SESSION_KEY, 'user')
+    return f"ip:{request.META.get('REMOTE_ADDR', 'unknown')}", 'anonymous'
+
+
+def route_for(path):
+    """(path prefix, limit) of the RATE_LIMIT_ROUTES entry matching `path`, or None."""
+    for prefix, limit in getattr(settings, 'RATE_LIMIT_ROUTES', {}).items():
+        if path.startswith(prefix):
+            return prefix, limit
+    return None
+
+
+class SlidingWindowRateLimiter:
+    """Sliding-window counters kept in a Django cache."""
+
+    def __init__(self, cache_alias=None, window=None):
+        self.cache = caches[cache_alias or getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'ratelimit')]
+        self.window = window or getattr(settings, 'RATE_LIMIT_WINDOW', DEFAULT_WINDOW)
+
+    def hit(self, key, limit, now=None):
+        """Count a request for `key`; returns (allowed, seconds until the next request is allowed)."""
+        now = time.time() if now is None else now
+        window_index, offset = divmod(now, self.window)
+        current_key = f'rl:{key}:{int(window_index)}'
+        previous_key = f'rl:{key}:{int(window_index) - 1}'
+
+        counts = self.cache.get_many([previous_key, current_key])
+        previous, current = counts.get(previous_key, 0), counts.get(current_key, 0)
+        if previous * (1 - offset / self.window) + current >= limit:
+            # Blocked requests are not counted, so a client that backs off recovers
+            return False, self._retry_after(previous, current, limit, offset)
+
+        if not self.cache.add(current_key, 1, timeout=2 * self.window):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:  # expired or evicted between add and incr
+                self.cache.set(current_key, 1, timeout=2 * self.window)
+        return True, 0
+
+    def _retry_after(self, previous, current, limit, offset):
+        """Whole seconds until the next request may be allowed."""
+        wait = self.window - offset
+        if previous and current < limit:
+            # Until enough of the previous window has slid out of range
+            wait = min(wait, self.window - offset - self.window * (limit - current) / previous)
+        return math.floor(wait) + 1
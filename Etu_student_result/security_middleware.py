@@ -7,14 +7,17 @@ Implements protections against:
 - Directory Traversal
 - Command Injection
 - Suspicious User-Agent patterns
-- Rate limiting basics
+- Request flooding (shared per-client rate limits)
 """
 
 import re
 import logging
-from django.http import HttpResponseForbidden, HttpResponseBadRequest
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseBadRequest
 from django.utils.deprecation import MiddlewareMixin
 
+from .rate_limit import DEFAULT_LIMITS, SlidingWindowRateLimiter, client_identity, route_for
+
 logger = logging.getLogger('security')
 
 
@@ -188,10 +191,13 @@ class FileUploadSecurityMiddleware(MiddlewareMixin):
                         logger.warning(f"Dangerous file upload blocked: {filename} in field {file_field_name}")
                         return HttpResponseForbidden(f"File type {dangerous_ext} is not allowed.")
                 
-                # Check file size
-                if file_obj.size > 5242880:  # 5MB
+                # Check file size (result CSVs are streamed, so they get a larger cap)
+                max_size = 5242880  # 5MB
+                if filename.endswith('.csv'):
+                    max_size = getattr(settings, 'RESULT_CSV_MAX_UPLOAD_SIZE', max_size)
+                if file_obj.size > max_size:
                     logger.warning(f"Oversized file upload blocked: {filename} ({file_obj.size} bytes)")
-                    return HttpResponseForbidden("File size exceeds maximum limit (5MB).")
+                    return HttpResponseForbidden(f"File size exceeds maximum limit ({max_size // 1048576}MB).")
                 
                 # Check MIME type matches extension
                 if not self._validate_mime_type(filename, file_obj):
@@ -203,7 +209,7 @@ class FileUploadSecurityMiddleware(MiddlewareMixin):
     def _validate_mime_type(self, filename, file_obj):
         """Basic MIME type validation."""
         import mimetypes
-        expected_type, _ = mimetypes.guess_extension(filename)
+        expected_type, _ = mimetypes.guess_type(filename)
         return expected_type is not None
 
 
@@ -247,43 +253,32 @@ class XSSProtectionMiddleware(MiddlewareMixin):
 
 
 class RateLimitingMiddleware(MiddlewareMixin):
-    """Basic rate limiting to prevent brute force attacks."""
+    """Per-client rate limiting against brute force and scraping.
+
+    Counters live in the shared 'ratelimit' cache, so the limits hold across
+    worker processes; see Etu_student_result.rate_limit.
+    """
     
     def __init__(self, get_response):
-        self.get_response = get_response
-        self.request_counts = {}
-        self.MAX_REQUESTS_PER_MINUTE = 60
-    
-    def __call__(self, request):
-        remote_addr = request.META.get('REMOTE_ADDR', 'unknown')
-        
-        # Check rate limit
-        if not self._check_rate_limit(remote_addr):
-            logger.warning(f"Rate limit exceeded for {remote_addr}")
-            return HttpResponseForbidden("Too many requests. Please try again later.")
-        
-        response = self.get_response(request)
-        return response
+        super().__init__(get_response)
+        self.limiter = SlidingWindowRateLimiter()
     
-    def _check_rate_limit(self, remote_addr):
-        """Simple rate limiting check."""
-        import time
-        current_time = int(time.time())
-        minute_ago = current_time - 60
-        
-        if remote_addr not in self.request_counts:
-            self.request_counts[remote_addr] = []
-        
-        # Remove old requests
-        self.request_counts[remote_addr] = [
-            req_time for req_time in self.request_counts[remote_addr]
-            if req_time > minute_ago
-        ]
+    def process_request(self, request):
+        client, role = client_identity(request)
+        limits = getattr(settings, 'RATE_LIMITS', DEFAULT_LIMITS)
+        checks = [(client, limits.get(role, limits.get('user', DEFAULT_LIMITS['user'])))]
+        route = route_for(request.path)
+        if route is not None:
+            # Route first, so requests it blocks do not use up the client's overall limit
+            prefix, limit = route
+            checks.insert(0, (f'{client}:{prefix}', limit))
         
-        # Check if limit exceeded
-        if len(self.request_counts[remote_addr]) >= self.MAX_REQUESTS_PER_MINUTE:
-            return False
+        for key, limit in checks:
+            allowed, retry_after = self.limiter.hit(key, limit)
+            if not allowed:
+                logger.warning(f"Rate limit exceeded for {key} ({role}) on {request.path}")
+                response = HttpResponse("Too many requests. Please try again later.", status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
         
-        # Add current request
-        self.request_counts[remote_addr].append(current_time)
-        return True
+        return None
@@ -0,0 +1,48 @@
+"""
+Sliding session expiry without a session write on every request.
+
+SESSION_SAVE_EVERY_REQUEST re-saved every logged-in user's session on every
+request just to push its expiry forward, which made session writes the
+largest write load on results day. SlidingSessionMiddleware records when the
+session was last saved and marks it modified only once
+SESSION_REFRESH_INTERVAL seconds have passed, so SessionMiddleware writes (and
+re-issues the cookie) at most once per interval per user while active
+sessions still slide forward. Logging in stamps the session too (see the
+user_logged_in receiver in admin_hierarchy.signals), so the save done by
+login() starts the first interval.
+"""
+
+import time
+
+from django.conf import settings
+
+REFRESHED_AT_KEY = '_session_refreshed_at'
+
+
+def session_needs_refresh(session, now=None):
+    """Whether `session` should be saved to move its expiry forward."""
+    if session.is_empty():
+        return False
+    refreshed_at = session.get(REFRESHED_AT_KEY)  # loads the session
+    if session.session_key is None:  # expired or unknown session cookie
+        return False
+    now = time.time() if now is None else now
+    return refreshed_at is None or now - refreshed_at >= getattr(settings, 'SESSION_REFRESH_INTERVAL', 300)
+
+
+def mark_session_refreshed(session, now=None):
+    """Record that `session` is being saved now (marks it modified)."""
+    session[REFRESHED_AT_KEY] = int(time.time() if now is None else now)
+
+
+class SlidingSessionMiddleware:
+    """Refresh the session expiry at most once per SESSION_REFRESH_INTERVAL."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        now = time.time()
+        if session_needs_refresh(request.session, now):
+            mark_session_refreshed(request.session, now)
+        return self.get_response(request)
@@ -13,8 +13,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import sys
+import importlib.util
 from urllib.parse import urlparse
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -78,7 +81,13 @@ CSRF_COOKIE_SAMESITE = 'Strict'
 # 5. SESSION SECURITY
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_AGE = 3600  # 1 hour session timeout
-SESSION_SAVE_EVERY_REQUEST = True
+# Sliding expiry without a session write per request: SlidingSessionMiddleware
+# saves the session again only once SESSION_REFRESH_INTERVAL seconds have
+# passed since its last save, so an idle session expires between
+# SESSION_COOKIE_AGE - SESSION_REFRESH_INTERVAL and SESSION_COOKIE_AGE seconds
+# after the last request.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = int(os.environ.get('SESSION_REFRESH_INTERVAL', 300))
 
 # 6. PASSWORD SECURITY
 PASSWORD_HASHERS = [
@@ -95,6 +104,172 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755
 FILE_UPLOAD_TEMP_DIR = None  # Use system temp dir
 
+# Result CSV sheets are streamed from the temp file in chunks of rows, so they
+# may exceed FILE_UPLOAD_MAX_MEMORY_SIZE (anything above it is spooled to disk).
+RESULT_CSV_MAX_UPLOAD_SIZE = int(os.environ.get('RESULT_CSV_MAX_UPLOAD_SIZE', 52428800))  # 50MB
+RESULT_CSV_CHUNK_ROWS = int(os.environ.get('RESULT_CSV_CHUNK_ROWS', 1000))
+RESULT_CSV_MAX_LOGGED_ERRORS = 50
+
+# Background upload jobs (Celery). Without a broker, tasks run inline.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'django-db')
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# When enabled, upload views enqueue an UploadJob and return its id instead of
+# processing the sheet inside the request.
+RESULT_UPLOADS_IN_BACKGROUND = os.environ.get(
+    'RESULT_UPLOADS_IN_BACKGROUND', 'true' if CELERY_BROKER_URL else 'false'
+).lower() in ('1', 'true', 'yes')
+
+# Dashboard counters are cached per lecturer/HOD/DEAN/faculty and invalidated
+# on result and workflow writes; the TTL only bounds missed invalidations.
+DASHBOARD_COUNTER_TTL = int(os.environ.get('DASHBOARD_COUNTER_TTL', 600))
+
+# Performance trends are cached per program/department/faculty and dropped
+# when results of that scope are published.
+PERFORMANCE_TREND_TTL = int(os.environ.get('PERFORMANCE_TREND_TTL', 3600))
+
+# Shared cache. Set DJANGO_CACHE_URL (redis://host:6379/0 or
+# memcached://host:11211) in production so every worker sees the same
+# dashboard counters, trends, sessions and rate-limit state; without it each
+# process keeps its own local-memory cache, which is only fit for development.
+DJANGO_CACHE_URL = os.environ.get('DJANGO_CACHE_URL', '')
+_cache_url = urlparse(DJANGO_CACHE_URL)
+if not DJANGO_CACHE_URL:
+    _default_cache = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+elif _cache_url.scheme in ('redis', 'rediss'):
+    _default_cache = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': DJANGO_CACHE_URL}
+elif _cache_url.scheme == 'memcached':
+    _default_cache = {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': _cache_url.netloc}
+else:
+    raise ImproperlyConfigured(f'DJANGO_CACHE_URL must be a redis://, rediss:// or memcached:// URL, not {DJANGO_CACHE_URL!r}')
+_default_cache['KEY_PREFIX'] = os.environ.get('DJANGO_CACHE_KEY_PREFIX', 'etu')
+
+# Results-day read cache (student.results_cache): a student's published results
+# and rendered result pages, keyed on a per-student version that publishing or
+# editing one of their results bumps. RESULTS_CACHE_BACKEND is 'locmem' (per
+# process), 'file' (RESULTS_CACHE_LOCATION is a directory), 'redis'
+# (RESULTS_CACHE_LOCATION is a redis:// URL; needs the redis package) or
+# 'memcached'. A bump is only seen by processes sharing the store, so
+# multi-worker deployments need 'file' (one host), 'redis' or 'memcached'; with 'locmem'
+# the other workers keep serving edited or withdrawn results for up to
+# RESULTS_CACHE_TTL. It follows DJANGO_CACHE_URL unless set; without one it is
+# 'file', or 'locmem' under DEBUG (single-process runserver).
+RESULTS_CACHE_BACKEND = os.environ.get(
+    'RESULTS_CACHE_BACKEND',
+    'redis' if _cache_url.scheme in ('redis', 'rediss')
+    else 'memcached' if _cache_url.scheme == 'memcached'
+    else 'locmem' if DEBUG else 'file',
+).lower()
+RESULTS_CACHE_TTL = int(os.environ.get('RESULTS_CACHE_TTL', 900))
+_RESULTS_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'student-results'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache' / 'results')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', DJANGO_CACHE_URL or 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', _cache_url.netloc or '127.0.0.1:11211'),
+}
+if RESULTS_CACHE_BACKEND not in _RESULTS_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"RESULTS_CACHE_BACKEND must be one of {', '.join(_RESULTS_CACHE_BACKENDS)}, not {RESULTS_CACHE_BACKEND!r}"
+    )
+
+CACHES = {
+    'default': _default_cache,
+    'results': {
+        'BACKEND': _RESULTS_CACHE_BACKENDS[RESULTS_CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('RESULTS_CACHE_LOCATION', _RESULTS_CACHE_BACKENDS[RESULTS_CACHE_BACKEND][1]),
+        'KEY_PREFIX': f"{_default_cache['KEY_PREFIX']}-results",
+        'TIMEOUT': RESULTS_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 50000} if RESULTS_CACHE_BACKEND in ('locmem', 'file') else {},
+    },
+}
+
+# Rate limiting (Etu_student_result.rate_limit): requests allowed per client
+# (logged-in user, or IP address when anonymous) in any RATE_LIMIT_WINDOW
+# seconds, by role, plus stricter per-route limits by path prefix. The
+# counters share the DJANGO_CACHE_URL cache so the limits hold across workers;
+# without it each process counts on its own and evicts the least recently
+# seen clients beyond RATE_LIMIT_MAX_KEYS.
+RATE_LIMIT_WINDOW = int(os.environ.get('RATE_LIMIT_WINDOW', 60))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 20000))
+RATE_LIMITS = {
+    'anonymous': int(os.environ.get('RATE_LIMIT_ANONYMOUS', 60)),
+    'user': 120,
+    'student': int(os.environ.get('RATE_LIMIT_STUDENT', 120)),
+    'lecturer': 300,
+    'hod': 300,
+    'dean': 300,
+    'exam_officer': 300,
+    'staff': 600,
+}
+_login_limit = int(os.environ.get('RATE_LIMIT_LOGIN', 20))
+RATE_LIMIT_ROUTES = {
+    '/student/login/': _login_limit,
+    '/lecturer/login/': _login_limit,
+    '/officer/login/': _login_limit,
+    '/hod/login/': _login_limit,
+    '/dean/login/': _login_limit,
+    '/admin/login/': _login_limit,
+}
+RATE_LIMIT_CACHE_ALIAS = 'ratelimit'
+CACHES[RATE_LIMIT_CACHE_ALIAS] = (
+    dict(_default_cache, KEY_PREFIX=f"{_default_cache['KEY_PREFIX']}-ratelimit") if DJANGO_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rate-limit',
+        'OPTIONS': {'MAX_ENTRIES': RATE_LIMIT_MAX_KEYS},
+    }
+)
+
+# Session store. 'cached_db' reads sessions from the shared cache and writes
+# through to the database; 'signed_cookies' keeps them in the client cookie
+# with no server-side writes (but sessions cannot be revoked server-side);
+# 'db' is the plain database store. cached_db needs a shared cache, so it is
+# only the default when DJANGO_CACHE_URL is set.
+DJANGO_SESSION_STORE = os.environ.get('DJANGO_SESSION_STORE', 'cached_db' if DJANGO_CACHE_URL else 'db').lower()
+_SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+if DJANGO_SESSION_STORE not in _SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"DJANGO_SESSION_STORE must be one of {', '.join(_SESSION_ENGINES)}, not {DJANGO_SESSION_STORE!r}"
+    )
+SESSION_ENGINE = _SESSION_ENGINES[DJANGO_SESSION_STORE]
+
+# Per-request query counting and N+1 detection (debug and staging only); see
+# Etu_student_result.query_budget. A query shape repeated
+# QUERY_REPEAT_THRESHOLD times in one request is reported as an N+1.
+QUERY_INSPECTION = os.environ.get('QUERY_INSPECTION', 'true' if DEBUG else 'false').lower() in ('1', 'true', 'yes')
+QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+
+# The 'performance' logger gets one JSON line per request from
+# QueryBudgetMiddleware and the 'security' logger the security middleware
+# events; both go to the console (stderr) so the process manager collects them.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '{asctime} {levelname} {name} {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'performance': {
+            'handlers': ['console'],
+            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'security': {
+            'handlers': ['console'],
+            'level': os.environ.get('SECURITY_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # 8. ALLOWED FILE TYPES FOR UPLOADS
 ALLOWED_UPLOAD_EXTENSIONS = ['.pdf', '.csv', '.xlsx', '.xls', '.jpg', '.jpeg', '.png', '.gif']
 BLOCKED_UPLOAD_EXTENSIONS = ['.exe', '.bat', '.cmd', '.com', '.scr', '.vbs', '.js', '.php', '.asp', '.aspx', '.sh']
@@ -125,9 +300,16 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
 ]
 
+# Stores Celery task results in the database when the package is installed
+if importlib.util.find_spec('django_celery_results'):
+    INSTALLED_APPS.append('django_celery_results')
+
 MIDDLEWARE = [
+    # Outermost so session/auth queries are counted too; inactive unless QUERY_INSPECTION
+    'Etu_student_result.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'Etu_student_result.sessions.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
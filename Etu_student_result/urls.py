@@ -82,6 +82,7 @@ urlpatterns = [
     path('dean/overviews/<int:overview_id>/', admin_hierarchy.views.dean_view_overview, name='dean_view_overview'),
     path('dean/overviews/<int:overview_id>/publish/', admin_hierarchy.views.dean_publish_overview, name='dean_publish_overview'),
     path('dean/review/<int:workflow_id>/', admin_hierarchy.views.dean_review_result, name='dean_review_result'),
+    path('dean/review/bulk/', admin_hierarchy.views.dean_bulk_review, name='dean_bulk_review'),
     path('dean/logout/', admin_hierarchy.views.dean_logout, name='dean_logout'),
     
     path('hod/login/', admin_hierarchy.views.hod_login, name='hod_login'),
@@ -89,6 +90,7 @@ urlpatterns = [
     path('hod/pending/', admin_hierarchy.views.hod_pending_list, name='hod_pending_list'),
     path('hod/approved/', admin_hierarchy.views.hod_approved_list, name='hod_approved_list'),
     path('hod/review/<int:workflow_id>/', admin_hierarchy.views.hod_review_result, name='hod_review_result'),
+    path('hod/review/bulk/', admin_hierarchy.views.hod_bulk_review, name='hod_bulk_review'),
     path('hod/student-folders/', admin_hierarchy.views.hod_student_folders, name='hod_student_folders'),
     path('hod/student-folder/<int:folder_id>/', admin_hierarchy.views.hod_folder_detail, name='hod_folder_detail'),
     path('hod/overviews/', admin_hierarchy.views.hod_result_overviews, name='hod_result_overviews'),
@@ -105,6 +107,7 @@ urlpatterns = [
     path('department/<int:dept_id>/', admin_hierarchy.views.department_detail, name='department_detail'),
     path('exam-officer/preview/', admin_hierarchy.views.exam_officer_preview_results, name='exam_officer_preview_results'),
     path('exam-officer/publish/<int:workflow_id>/', admin_hierarchy.views.exam_officer_publish_result, name='exam_officer_publish_result'),
+    path('exam-officer/publish/bulk/', admin_hierarchy.views.exam_officer_bulk_publish, name='exam_officer_bulk_publish'),
     path('export-results/', admin_hierarchy.views.export_results_csv, name='export_results_csv'),
     path('archive-results/', admin_hierarchy.views.archive_program_results, name='archive_program_results'),
     
@@ -1,105 +1,220 @@
 """
 Django signals for automatic notification sending in the results workflow.
 Notifications are sent when results move through different approval stages.
+
+Each stage has a `*_notification(workflow)` builder returning an unsaved
+Notification (or None when there is nobody to notify). `notify_*` saves one;
+`bulk_notify` saves the notifications for many workflows in one bulk_create.
+
+The receivers at the bottom drop the cached dashboard counters and student
+results folders affected by single-row writes, mark the analytics snapshots
+of published results for refresh and stamp new sessions for the sliding
+session expiry and the rate limiter.
 """
 
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from admin_hierarchy.models import ResultApprovalWorkflow, HeadOfDepartment, DeanOfFaculty
 from exam_officer.models import Notification
-from student.models import Result, Student
+from student.models import Result, Student, Department
 from lecturer.models import Lecturer
+from Etu_student_result.dashboard_counters import invalidate_dashboard_counters
+from Etu_student_result.rate_limit import mark_session_role
+from Etu_student_result.sessions import mark_session_refreshed
+from student.models import StudentSemesterFolder
+from student.results_cache import bump_results_version
+from student.tasks import mark_analytics_dirty
+
+
+def _build(workflow, recipient_id, notification_type, title, message):
+    if not recipient_id:
+        return None
+    return Notification(
+        recipient_id=recipient_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        workflow=workflow,
+        result=workflow.result,
+    )
+
+
+def _send(notification):
+    if notification is not None:
+        notification.save()
+    return notification
+
+
+def bulk_notify(workflows, *builders, batch_size=500):
+    """Build notifications for every workflow with each builder and insert them at once."""
+    notifications = [
+        notification
+        for workflow in workflows
+        for builder in builders
+        for notification in [builder(workflow)]
+        if notification is not None
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=batch_size)
+    return len(notifications)
+
+
+def hod_approved_notification(workflow):
+    """Notify DEAN when HOD approves a result"""
+    return _build(
+        workflow,
+        workflow.current_dean.user_id if workflow.current_dean else None,
+        'hod_approved',
+        'Result Approved by HOD',
+        f'HOD has approved result for student {workflow.result.student.student_id} in {workflow.result.subject}. Please review and approve.',
+    )
+
+
+def hod_rejected_notification(workflow):
+    """Notify LECTURER when HOD rejects a result"""
+    return _build(
+        workflow,
+        workflow.result.uploaded_by.user_id if workflow.result.uploaded_by else None,
+        'hod_rejected',
+        'Result Rejected by HOD',
+        f'Your result submission for student {workflow.result.student.student_id} in {workflow.result.subject} has been rejected by HOD. Please review and resubmit.',
+    )
+
+
+def dean_approved_notification(workflow):
+    """Notify EXAM OFFICER when DEAN approves a result"""
+    return _build(
+        workflow,
+        workflow.current_exam_officer.user_id if workflow.current_exam_officer else None,
+        'dean_approved',
+        'Result Approved by Dean',
+        f'Dean has approved result for student {workflow.result.student.student_id} in {workflow.result.subject}. Ready for publication.',
+    )
+
+
+def dean_rejected_notification(workflow):
+    """Notify HOD when DEAN rejects a result"""
+    return _build(
+        workflow,
+        workflow.current_hod.user_id if workflow.current_hod else None,
+        'dean_rejected',
+        'Result Rejected by Dean',
+        f'Dean has rejected result for student {workflow.result.student.student_id} in {workflow.result.subject}. Please review and resubmit.',
+    )
+
+
+def student_results_published_notification(workflow):
+    """Notify STUDENT when their results are published"""
+    return _build(
+        workflow,
+        workflow.result.student.user_id,
+        'result',
+        'Your Results Have Been Published',
+        f'Your result for {workflow.result.subject} has been published. You can now view your grade.',
+    )
+
+
+def department_results_published_notification(workflow):
+    """Notify HOD when department results are published"""
+    return _build(
+        workflow,
+        workflow.current_hod.user_id if workflow.current_hod else None,
+        'result',
+        'Department Results Published',
+        f'Result for student {workflow.result.student.student_id} in {workflow.result.subject} has been published.',
+    )
+
+
+def faculty_results_published_notification(workflow):
+    """Notify DEAN when faculty results are published"""
+    return _build(
+        workflow,
+        workflow.current_dean.user_id if workflow.current_dean else None,
+        'result',
+        'Faculty Results Published',
+        f'Result for student {workflow.result.student.student_id} in {workflow.result.subject} has been published.',
+    )
+
+
+RESULTS_PUBLISHED_NOTIFICATIONS = (
+    student_results_published_notification,
+    department_results_published_notification,
+    faculty_results_published_notification,
+)
 
 
 def notify_hod_approved(workflow):
     """Notify DEAN when HOD approves a result"""
-    if workflow.current_dean and workflow.current_dean.user:
-        Notification.objects.create(
-            recipient=workflow.current_dean.user,
-            notification_type='hod_approved',
-            title='Result Approved by HOD',
-            message=f'HOD has approved result for student {workflow.result.student.student_id} in {workflow.result.subject}. Please review and approve.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(hod_approved_notification(workflow))
 
 
 def notify_hod_rejected(workflow):
     """Notify LECTURER when HOD rejects a result"""
-    if workflow.result.uploaded_by and workflow.result.uploaded_by.user:
-        Notification.objects.create(
-            recipient=workflow.result.uploaded_by.user,
-            notification_type='hod_rejected',
-            title='Result Rejected by HOD',
-            message=f'Your result submission for student {workflow.result.student.student_id} in {workflow.result.subject} has been rejected by HOD. Please review and resubmit.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(hod_rejected_notification(workflow))
 
 
 def notify_dean_approved(workflow):
     """Notify EXAM OFFICER when DEAN approves a result"""
-    if workflow.current_exam_officer and workflow.current_exam_officer.user:
-        Notification.objects.create(
-            recipient=workflow.current_exam_officer.user,
-            notification_type='dean_approved',
-            title='Result Approved by Dean',
-            message=f'Dean has approved result for student {workflow.result.student.student_id} in {workflow.result.subject}. Ready for publication.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(dean_approved_notification(workflow))
 
 
 def notify_dean_rejected(workflow):
     """Notify HOD when DEAN rejects a result"""
-    if workflow.current_hod and workflow.current_hod.user:
-        Notification.objects.create(
-            recipient=workflow.current_hod.user,
-            notification_type='dean_rejected',
-            title='Result Rejected by Dean',
-            message=f'Dean has rejected result for student {workflow.result.student.student_id} in {workflow.result.subject}. Please review and resubmit.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(dean_rejected_notification(workflow))
 
 
 def notify_student_results_published(workflow):
     """Notify STUDENT when their results are published"""
-    student_user = workflow.result.student.user
-    if student_user:
-        Notification.objects.create(
-            recipient=student_user,
-            notification_type='result',
-            title='Your Results Have Been Published',
-            message=f'Your result for {workflow.result.subject} has been published. You can now view your grade.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(student_results_published_notification(workflow))
 
 
 def notify_department_results_published(workflow):
     """Notify HOD when department results are published"""
-    if workflow.current_hod and workflow.current_hod.user:
-        Notification.objects.create(
-            recipient=workflow.current_hod.user,
-            notification_type='result',
-            title='Department Results Published',
-            message=f'Result for student {workflow.result.student.student_id} in {workflow.result.subject} has been published.',
-            workflow=workflow,
-            result=workflow.result,
-        )
+    return _send(department_results_published_notification(workflow))
 
 
 def notify_faculty_results_published(workflow):
     """Notify DEAN when faculty results are published"""
-    if workflow.current_dean and workflow.current_dean.user:
-        Notification.objects.create(
-            recipient=workflow.current_dean.user,
-            notification_type='result',
-            title='Faculty Results Published',
-            message=f'Result for student {workflow.result.student.student_id} in {workflow.result.subject} has been published.',
-            workflow=workflow,
-            result=workflow.result,
+    return _send(faculty_results_published_notification(workflow))
+
+
+@receiver([post_save, post_delete], sender=Result)
+def result_changed(sender, instance, **kwargs):
+    invalidate_dashboard_counters(lecturers=[instance.uploaded_by_id], faculties=[instance.faculty_id])
+    bump_results_version([instance.student_id])
+    # published_date survives unpublishing, so withdrawn results refresh too
+    if instance.is_published or instance.published_date:
+        mark_analytics_dirty([instance])
+
+
+@receiver([post_save, post_delete], sender=StudentSemesterFolder)
+def folder_changed(sender, instance, **kwargs):
+    bump_results_version([instance.student_id])
+
+
+@receiver(post_save, sender=Student)
+def student_changed(sender, instance, **kwargs):
+    bump_results_version([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ResultApprovalWorkflow)
+def workflow_changed(sender, instance, **kwargs):
+    invalidate_dashboard_counters(hods=[instance.current_hod_id], deans=[instance.current_dean_id])
+
+
+@receiver([post_save, post_delete], sender=HeadOfDepartment)
+def hod_changed(sender, instance, **kwargs):
+    if instance.department_id:
+        invalidate_dashboard_counters(
+            faculties=Department.objects.filter(pk=instance.department_id).values_list('faculty_id', flat=True)
         )
 
+
+@receiver(user_logged_in)
+def session_logged_in(sender, request, user, **kwargs):
+    # login() saves the session anyway; start the sliding-expiry interval and
+    # record the rate-limit role with it
+    if request is not None and hasattr(request, 'session'):
+        mark_session_refreshed(request.session)
+        mark_session_role(request.session, user)
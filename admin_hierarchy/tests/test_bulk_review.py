@@ -0,0 +1,97 @@
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from admin_hierarchy.models import HeadOfDepartment, DeanOfFaculty, ResultApprovalWorkflow, ApprovalHistory
+from admin_hierarchy.workflow_actions import review_workflows
+from exam_officer.models import ExamOfficer, Notification
+from lecturer.models import Lecturer
+from student.models import Faculty, Department, Program, Student, Result
+
+
+class BulkReviewTests(TestCase):
+    def setUp(self):
+        self.faculty = Faculty.objects.create(name='RFac', code='RF')
+        self.department = Department.objects.create(name='RDept', code='RD', faculty=self.faculty)
+        program = Program.objects.create(name='RProg', code='RP', department=self.department)
+
+        self.hod_user = User.objects.create_user(username='rhod', password='pass')
+        self.hod = HeadOfDepartment.objects.create(user=self.hod_user, hod_id='RH1', email='rh@example.com', department=self.department)
+        self.dean_user = User.objects.create_user(username='rdean', password='pass')
+        self.dean = DeanOfFaculty.objects.create(user=self.dean_user, dean_id='RD1', email='rd@example.com', faculty=self.faculty)
+        self.exam_officer = ExamOfficer.objects.create(
+            user=User.objects.create_user(username='rexam', password='pass'), officer_id='RE1', email='re@example.com',
+        )
+        self.lecturer = Lecturer.objects.create(
+            user=User.objects.create_user(username='rlect', password='pass'), lecturer_id='RL1', email='rl@example.com',
+        )
+
+        self.workflows = []
+        for i in range(5):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'rstudent{i}', password='pass'),
+                student_id=f'RS{i}', email=f'rs{i}@example.com',
+                department=self.department, program=program, faculty=self.faculty,
+            )
+            result = Result.objects.create(
+                student=student, subject='Sub', result_type='exam', score=65, total_score=100, grade='C',
+                academic_year='2024/2025', semester='1', program=program, department=self.department,
+                faculty=self.faculty, uploaded_by=self.lecturer,
+            )
+            self.workflows.append(ResultApprovalWorkflow.objects.create(result=result, current_hod=self.hod))
+        self.ids = [wf.id for wf in self.workflows]
+
+    def test_hod_bulk_approve_forwards_to_dean(self):
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(self.hod_user)
+        resp = client.post(reverse('hod_bulk_review'), {'workflow_ids': self.ids[:3], 'action': 'approve', 'notes': 'fine'})
+        self.assertRedirects(resp, reverse('hod_pending_list'), fetch_redirect_response=False)
+
+        approved = ResultApprovalWorkflow.objects.filter(status='hod_approved')
+        self.assertEqual(set(approved.values_list('id', flat=True)), set(self.ids[:3]))
+        self.assertEqual(approved.filter(current_dean=self.dean, hod_notes='fine', hod_reviewed_at__isnull=False).count(), 3)
+        self.assertEqual(ApprovalHistory.objects.filter(action='hod_approved', notes='fine', admin_user=self.hod_user).count(), 3)
+        self.assertEqual(Notification.objects.filter(recipient=self.dean_user, notification_type='hod_approved').count(), 3)
+
+    def test_dean_bulk_reject_notifies_hod(self):
+        review_workflows(
+            ResultApprovalWorkflow.objects.all(), 'hod', 'approve', self.hod_user, assign={'current_dean': self.dean},
+        )
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(self.dean_user)
+        client.post(reverse('dean_bulk_review'), {'workflow_ids': self.ids, 'action': 'reject', 'notes': 'redo'})
+
+        self.assertEqual(ResultApprovalWorkflow.objects.filter(status='dean_rejected', dean_notes='redo').count(), 5)
+        self.assertEqual(Notification.objects.filter(recipient=self.hod_user, notification_type='dean_rejected').count(), 5)
+
+    def test_dean_bulk_approve_assigns_exam_officer(self):
+        review_workflows(
+            ResultApprovalWorkflow.objects.all(), 'hod', 'approve', self.hod_user, assign={'current_dean': self.dean},
+        )
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(self.dean_user)
+        client.post(reverse('dean_bulk_review'), {'workflow_ids': self.ids[:2], 'action': 'approve'})
+
+        approved = ResultApprovalWorkflow.objects.filter(status='dean_approved', current_exam_officer=self.exam_officer)
+        self.assertEqual(approved.count(), 2)
+        self.assertEqual(Notification.objects.filter(notification_type='dean_approved').count(), 2)
+
+    def test_batches_report_counts_and_skip_already_reviewed(self):
+        review_workflows(ResultApprovalWorkflow.objects.filter(pk=self.ids[0]), 'hod', 'reject', self.hod_user)
+
+        transitioned = review_workflows(
+            ResultApprovalWorkflow.objects.all(), 'hod', 'reject', self.hod_user, notes='bad', batch_size=2,
+        )
+        self.assertEqual(transitioned, [2, 2])
+        self.assertEqual(ResultApprovalWorkflow.objects.filter(status='hod_rejected').count(), 5)
+        # lecturer is told once per rejected result
+        self.assertEqual(Notification.objects.filter(recipient=self.lecturer.user, notification_type='hod_rejected').count(), 5)
+
+    def test_hod_cannot_review_other_departments(self):
+        other_hod = HeadOfDepartment.objects.create(
+            user=User.objects.create_user(username='otherhod', password='pass'), hod_id='RH2', email='rh2@example.com',
+        )
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(other_hod.user)
+        client.post(reverse('hod_bulk_review'), {'workflow_ids': self.ids, 'action': 'reject'})
+        self.assertFalse(ResultApprovalWorkflow.objects.exclude(status='lecturer_submitted').exists())
@@ -0,0 +1,104 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from Etu_student_result.dashboard_counters import (
+    lecturer_counters, hod_counters, dean_counters, faculty_counters,
+)
+from admin_hierarchy.models import HeadOfDepartment, DeanOfFaculty, ResultApprovalWorkflow
+from admin_hierarchy.workflow_actions import review_workflows, publish_workflows
+from lecturer.ingestion import ResultCSVIngestor, submit_workflows_to_hod
+from lecturer.models import Lecturer
+from student.models import Faculty, Department, Program, Student, Result
+
+
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.faculty = Faculty.objects.create(name='CFac', code='CF')
+        self.department = Department.objects.create(name='CDept', code='CD', faculty=self.faculty)
+        self.program = Program.objects.create(name='CProg', code='CP', department=self.department)
+        self.hod_user = User.objects.create_user(username='chod', password='pass')
+        self.hod = HeadOfDepartment.objects.create(user=self.hod_user, hod_id='CH1', email='ch@example.com', department=self.department)
+        self.dean = DeanOfFaculty.objects.create(
+            user=User.objects.create_user(username='cdean', password='pass'), dean_id='CD1', email='cd@example.com',
+            faculty=self.faculty,
+        )
+        self.lecturer = Lecturer.objects.create(
+            user=User.objects.create_user(username='clect', password='pass'), lecturer_id='CL1', email='cl@example.com',
+        )
+        self.student = Student.objects.create(
+            user=User.objects.create_user(username='cstudent', password='pass'), student_id='CS1',
+            email='cs@example.com', department=self.department, program=self.program, faculty=self.faculty,
+        )
+        for subject in ('A', 'B', 'C'):
+            self._submit(subject)
+
+    def _submit(self, subject):
+        result = Result.objects.create(
+            student=self.student, subject=subject, result_type='exam', score=70, grade='B',
+            academic_year='2024/2025', semester='1', program=self.program, department=self.department,
+            faculty=self.faculty, uploaded_by=self.lecturer,
+        )
+        return ResultApprovalWorkflow.objects.create(result=result, current_hod=self.hod)
+
+    def test_counters_are_cached(self):
+        self.assertEqual(lecturer_counters(self.lecturer), {'total': 3, 'pending': 3, 'published': 0})
+        self.assertEqual(hod_counters(self.hod), {'pending': 3, 'approved': 0})
+        self.assertEqual(faculty_counters(self.faculty), {'hod_count': 1, 'result_count': 3})
+        with self.assertNumQueries(0):
+            lecturer_counters(self.lecturer)
+            hod_counters(self.hod)
+            faculty_counters(self.faculty)
+
+    def test_single_row_writes_invalidate(self):
+        lecturer_counters(self.lecturer)
+        hod_counters(self.hod)
+        faculty_counters(self.faculty)
+        self._submit('D')
+        self.assertEqual(lecturer_counters(self.lecturer)['total'], 4)
+        self.assertEqual(hod_counters(self.hod)['pending'], 4)
+        self.assertEqual(faculty_counters(self.faculty)['result_count'], 4)
+
+    def test_bulk_transitions_invalidate(self):
+        hod_counters(self.hod)
+        dean_counters(self.dean)
+        lecturer_counters(self.lecturer)
+
+        review_workflows(
+            ResultApprovalWorkflow.objects.all(), 'hod', 'approve', self.hod_user, assign={'current_dean': self.dean},
+        )
+        self.assertEqual(hod_counters(self.hod), {'pending': 0, 'approved': 3})
+        self.assertEqual(dean_counters(self.dean), {'pending': 3, 'approved': 0})
+
+        review_workflows(ResultApprovalWorkflow.objects.all(), 'dean', 'approve', self.dean.user)
+        self.assertEqual(dean_counters(self.dean), {'pending': 0, 'approved': 3})
+
+        publish_workflows(ResultApprovalWorkflow.objects.all(), self.dean.user)
+        self.assertEqual(dean_counters(self.dean)['approved'], 0)
+        self.assertEqual(lecturer_counters(self.lecturer), {'total': 3, 'pending': 0, 'published': 3})
+
+    def test_reassigned_workflows_invalidate_previous_hod(self):
+        self.assertEqual(hod_counters(self.hod)['pending'], 3)
+        other_department = Department.objects.create(name='ODept', code='OD', faculty=self.faculty)
+        other_hod = HeadOfDepartment.objects.create(
+            user=User.objects.create_user(username='ohod', password='pass'), hod_id='OH1', email='oh@example.com',
+            department=other_department,
+        )
+
+        results = list(Result.objects.all())
+        submit_workflows_to_hod(results, {self.department.id: other_hod})
+        self.assertEqual(hod_counters(self.hod)['pending'], 0)
+        self.assertEqual(hod_counters(other_hod)['pending'], 3)
+
+    def test_reupload_invalidates_previous_uploader(self):
+        self.assertEqual(lecturer_counters(self.lecturer)['total'], 3)
+        other = Lecturer.objects.create(
+            user=User.objects.create_user(username='olect', password='pass'), lecturer_id='OL1', email='ol@example.com',
+        )
+
+        ingestor = ResultCSVIngestor(other, self.program, 'exam', '2024/2025', '1')
+        ingestor.ingest([(2, {'Student_ID': 'CS1', 'Module_Code': 'A', 'Score': '80'})])
+        self.assertEqual((ingestor.created_count, ingestor.updated_count), (0, 1))
+        self.assertEqual(lecturer_counters(self.lecturer)['total'], 2)
+        self.assertEqual(lecturer_counters(other)['total'], 1)
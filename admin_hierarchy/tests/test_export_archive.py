@@ -1,6 +1,11 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
 from student.models import Faculty, Department, Program, Student, Result, StudentSemesterFolder
 from lecturer.models import Lecturer
 
@@ -47,10 +52,48 @@ class ExportArchiveTests(TestCase):
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, 200)
         self.assertTrue(resp['Content-Type'].startswith('text/csv'))
-        content = resp.content.decode('utf-8')
+        content = b''.join(resp.streaming_content).decode('utf-8')
         self.assertIn('student_id,student_name,faculty,department,program', content)
         self.assertIn('S100', content)
 
+    def _export_lines(self):
+        resp = self.client.get(reverse('export_results_csv'))
+        self.assertTrue(resp.streaming)
+        return b''.join(resp.streaming_content).decode('utf-8').splitlines()
+
+    def test_export_streams_with_constant_queries(self):
+        self.stud.user.first_name, self.stud.user.last_name = 'Ama', 'Mensah'
+        self.stud.user.save()
+        self.lect.user.first_name, self.lect.user.last_name = 'Kofi', 'Owusu'
+        self.lect.user.save()
+        with CaptureQueriesContext(connection) as one:
+            lines = self._export_lines()
+        self.assertEqual(lines[1].split(',')[:2], ['S100', 'Ama Mensah'])
+        self.assertEqual(lines[1].split(',')[12], 'Kofi Owusu')
+
+        for i in range(5):
+            student = Student.objects.create(
+                user=User.objects.create_user(f'extra{i}', f'extra{i}@example.com', 'pass'),
+                student_id=f'S2{i:02d}', email=f'extra{i}@example.com',
+                faculty=self.fac, department=self.dept, program=self.prog,
+            )
+            Result.objects.create(
+                student=student, program=self.prog, department=self.dept, faculty=self.fac,
+                subject='Intro to CS', result_type='exam', score=60, grade='C',
+                academic_year='2024/2025', semester='1', uploaded_by=self.lect, is_published=True,
+            )
+        with CaptureQueriesContext(connection) as many:
+            lines = self._export_lines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(len(one), len(many))
+
+        # Smaller chunks are fetched by primary key without skipping or repeating rows
+        with mock.patch('admin_hierarchy.views.EXPORT_CHUNK_SIZE', 2), \
+                CaptureQueriesContext(connection) as chunked:
+            chunked_lines = self._export_lines()
+        self.assertEqual(chunked_lines, lines)
+        self.assertEqual(len(chunked), len(many) + 3)  # 6 rows: chunks of 2, 2, 2 and an empty one
+
     def test_archive_program_results_creates_folders(self):
         url = reverse('archive_program_results')
         resp = self.client.post(url, {'program_id': self.prog.id, 'academic_year': '2024/2025', 'semester': '1'})
@@ -63,3 +106,61 @@ class ExportArchiveTests(TestCase):
         # result should be attached to folder
         self.result.refresh_from_db()
         self.assertEqual(self.result.folder, folder)
+
+    def _add_student(self, i, subjects=(('Intro to CS', 80, 'A'), ('Calculus', 50, 'D'))):
+        student = Student.objects.create(
+            user=User.objects.create_user(f'arch{i}', f'arch{i}@example.com', 'pass'),
+            student_id=f'A{i:03d}', email=f'arch{i}@example.com',
+            faculty=self.fac, department=self.dept, program=self.prog,
+        )
+        # bulk_create skips Result.save(), so these results have no folder yet
+        Result.objects.bulk_create([
+            Result(
+                student=student, program=self.prog, department=self.dept, faculty=self.fac,
+                subject=subject, result_type='exam', score=score, grade=grade,
+                academic_year='2024/2025', semester='1', is_published=True,
+            )
+            for subject, score, grade in subjects
+        ])
+        return student
+
+    def _archive(self):
+        return self.client.post(
+            reverse('archive_program_results'),
+            {'program_id': self.prog.id, 'academic_year': '2024/2025', 'semester': '1'},
+        )
+
+    def test_archive_query_count_does_not_grow_with_students(self):
+        for i in range(2):
+            self._add_student(i)
+        with CaptureQueriesContext(connection) as few:
+            self._archive()
+        for i in range(2, 8):
+            self._add_student(i)
+        with CaptureQueriesContext(connection) as many:
+            self._archive()
+        self.assertEqual(len(few), len(many))
+        self.assertFalse(Result.objects.filter(folder=None).exists())
+        self.assertEqual(StudentSemesterFolder.objects.count(), 9)
+
+    def test_archive_reuses_folders_and_recalculates(self):
+        students = [self._add_student(i) for i in range(2)]
+        StudentSemesterFolder.objects.create(student=students[0], academic_year='2024/2025', semester='1')
+
+        resp = self._archive()
+        self.assertEqual(
+            [str(m) for m in get_messages(resp.wsgi_request)][0].split(' in ')[0],
+            'Archiving complete. Created 1 new semester folders and attached 4 results for 3 students',
+        )
+        for student in students:
+            folder = StudentSemesterFolder.objects.get(student=student)
+            self.assertEqual(folder.results.count(), 2)
+            self.assertEqual((float(folder.total_score), float(folder.gpa)), (65.0, 2.5))
+        self.assertEqual(StudentSemesterFolder.objects.get(student=students[1]).program, self.prog)
+
+    def test_archive_rejects_unknown_program(self):
+        resp = self.client.post(
+            reverse('archive_program_results'), {'program_id': 'x', 'academic_year': '2024/2025', 'semester': '1'},
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(StudentSemesterFolder.objects.filter(student__student_id__startswith='A').count(), 0)
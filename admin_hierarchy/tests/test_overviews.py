@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from admin_hierarchy.models import HeadOfDepartment, DeanOfFaculty
+from student.models import Faculty, Department, Program, Student, Result
+from student.models_enhanced import DepartmentResultOverview, FacultyResultOverview
+
+
+class ResultOverviewTests(TestCase):
+    def setUp(self):
+        self.faculty = Faculty.objects.create(name='OFac', code='OF')
+        self.department = Department.objects.create(name='ODept', code='OD', faculty=self.faculty)
+        program = Program.objects.create(name='OProg', code='OP', department=self.department)
+        self.hod = HeadOfDepartment.objects.create(
+            user=User.objects.create_user(username='ohod', password='pass'), hod_id='OH1', email='oh@example.com',
+            department=self.department,
+        )
+        self.dean = DeanOfFaculty.objects.create(
+            user=User.objects.create_user(username='odean', password='pass'), dean_id='OD1', email='od@example.com',
+            faculty=self.faculty,
+        )
+        for i, (grade, score) in enumerate((('A', 90), ('B', 72), ('F', 30))):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'ostudent{i}', password='pass'), student_id=f'OS{i}',
+                email=f'os{i}@example.com', department=self.department, program=program, faculty=self.faculty,
+            )
+            Result.objects.create(
+                student=student, subject='Statics', result_type='exam', score=score, grade=grade,
+                academic_year='2024/2025', semester='1', program=program, department=self.department,
+                faculty=self.faculty, is_published=True,
+            )
+
+    def _post(self, user, url):
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(user)
+        return client.post(url, {
+            'academic_year': '2024/2025', 'semester': '1', 'key_findings': '', 'improvement_areas': '',
+            'best_performing_modules': '', 'worst_performing_modules': '',
+            'best_performing_departments': '', 'worst_performing_departments': '',
+        })
+
+    def test_hod_overview_statistics(self):
+        self._post(self.hod.user, reverse('hod_create_overview'))
+        overview = DepartmentResultOverview.objects.get(department=self.department)
+        self.assertEqual((overview.total_results, overview.total_students, overview.total_modules), (3, 3, 1))
+        self.assertEqual((overview.grade_a_count, overview.grade_b_count, overview.grade_f_count), (1, 1, 1))
+        self.assertEqual(float(overview.overall_gpa), 2.33)
+        self.assertEqual(float(overview.overall_pass_rate), 66.67)
+
+    def test_dean_overview_statistics(self):
+        self._post(self.dean.user, reverse('dean_create_overview'))
+        overview = FacultyResultOverview.objects.get(faculty=self.faculty)
+        self.assertEqual((overview.total_results, overview.total_modules), (3, 1))
+        self.assertEqual(float(overview.average_score), 64.0)
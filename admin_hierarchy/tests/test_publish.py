@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from student.models import Faculty, Department, Program, Student, Result
@@ -47,3 +49,87 @@ class PublishWorkflowTests(TestCase):
         self.assertEqual(wf.status, 'dean_approved')
         history = ApprovalHistory.objects.filter(workflow=wf, action='exam_returned')
         self.assertTrue(history.exists())
+
+
+class BulkPublishTests(TestCase):
+    def setUp(self):
+        from admin_hierarchy.models import HeadOfDepartment, DeanOfFaculty
+
+        self.faculty = Faculty.objects.create(name='BFac', code='BF')
+        self.department = Department.objects.create(name='BDept', code='BD', faculty=self.faculty)
+        self.program = Program.objects.create(name='BProg', code='BP', department=self.department)
+        self.other_program = Program.objects.create(name='BOther', code='BO', department=self.department)
+
+        self.exam_user = User.objects.create_user(username='bulkexam', password='pass')
+        ExamOfficer.objects.create(user=self.exam_user, officer_id='EO2', email='eo2@example.com')
+        hod = HeadOfDepartment.objects.create(
+            user=User.objects.create_user(username='bulkhod', password='pass'),
+            hod_id='H1', email='h1@example.com', department=self.department,
+        )
+        dean = DeanOfFaculty.objects.create(
+            user=User.objects.create_user(username='bulkdean', password='pass'),
+            dean_id='D1', email='d1@example.com', faculty=self.faculty,
+        )
+
+        self.workflows = []
+        for i in range(4):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'bulkstudent{i}', password='pass'),
+                student_id=f'BS{i}', email=f'bs{i}@example.com',
+                department=self.department, program=self.program, faculty=self.faculty,
+            )
+            for subject, program in (('Sub', self.program), ('Other', self.other_program)):
+                result = Result.objects.create(
+                    student=student, subject=subject, result_type='exam', score=75, total_score=100, grade='B',
+                    academic_year='2024/2025', semester='1', program=program,
+                    department=self.department, faculty=self.faculty,
+                )
+                self.workflows.append(ResultApprovalWorkflow.objects.create(
+                    result=result, status='dean_approved', current_hod=hod, current_dean=dean,
+                    dean_reviewed_at=timezone.now(),
+                ))
+
+        self.client = Client(SERVER_NAME='127.0.0.1')
+        self.client.force_login(self.exam_user)
+        self.url = reverse('exam_officer_bulk_publish')
+
+    def test_publish_by_filter(self):
+        from exam_officer.models import Notification
+        from student.models import StudentSemesterFolder
+
+        resp = self.client.post(self.url, {
+            'publish_all': '1', 'program': self.program.id, 'year_semester': '2024/2025-1', 'notes': 'batch',
+        })
+        self.assertEqual(resp.status_code, 302)
+
+        published = Result.objects.filter(is_published=True)
+        self.assertEqual(published.count(), 4)
+        self.assertFalse(published.exclude(program=self.program).exists())
+        self.assertFalse(published.filter(published_date__isnull=True).exists())
+        self.assertEqual(ResultApprovalWorkflow.objects.filter(status='exam_published', exam_notes='batch').count(), 4)
+        self.assertEqual(ApprovalHistory.objects.filter(action='exam_published', notes='batch').count(), 4)
+        # student, HOD and DEAN for each result
+        self.assertEqual(Notification.objects.filter(notification_type='result').count(), 12)
+        self.assertEqual(set(StudentSemesterFolder.objects.values_list('gpa', flat=True)), {Decimal('3.00')})
+
+    def test_publish_selected_ids_with_constant_queries(self):
+        ids = [wf.id for wf in self.workflows[:2]]
+        self.client.post(self.url, {'workflow_ids': ids})
+        self.assertEqual(
+            set(ResultApprovalWorkflow.objects.filter(status='exam_published').values_list('id', flat=True)), set(ids)
+        )
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        remaining = [wf.id for wf in self.workflows[2:]]
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, {'workflow_ids': remaining[:1]})
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, {'workflow_ids': remaining[1:]})
+        self.assertEqual(len(few), len(many))
+
+    def test_requires_selection_or_filter(self):
+        self.client.post(self.url, {'program': self.program.id})
+        self.client.post(self.url, {})
+        self.assertFalse(Result.objects.filter(is_published=True).exists())
@@ -0,0 +1,101 @@
+import json
+import logging
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+
+from Etu_student_result.query_budget import (
+    QueryBudgetMiddleware, QueryBudgetTestMixin, query_budget, query_shape, record_queries,
+)
+from student.models import Faculty
+
+
+@query_budget(3)
+def faculty_names(request):
+    count = int(request.GET.get('n', 1))
+    names = [Faculty.objects.filter(pk=pk).values_list('name', flat=True).first() for pk in range(count)]
+    return HttpResponse(','.join(filter(None, names)))
+
+
+urlpatterns = [path('faculty-names/', faculty_names, name='faculty_names')]
+
+INSTRUMENTED = {
+    'ROOT_URLCONF': __name__,
+    'QUERY_INSPECTION': True,
+    'QUERY_REPEAT_THRESHOLD': 3,
+    'MIDDLEWARE': ['Etu_student_result.query_budget.QueryBudgetMiddleware'],
+}
+
+
+class QueryShapeTests(SimpleTestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            query_shape('SELECT "a" FROM "t" WHERE "id" IN (%s, %s, %s) AND "x" = 12 LIMIT 21'),
+            query_shape('SELECT "a" FROM "t" WHERE "id" IN (%s) AND "x" = 7 LIMIT 21'),
+        )
+        self.assertEqual(query_shape("SELECT 'it''s' FROM \"t2\""), 'SELECT ? FROM "t2"')
+
+
+@override_settings(**INSTRUMENTED)
+class QueryBudgetMiddlewareTests(TestCase):
+    def test_headers_and_log_line(self):
+        with self.assertLogs('performance', 'INFO') as logs:
+            response = self.client.get('/faculty-names/', {'n': 2})
+        self.assertEqual(response['X-DB-Query-Count'], '2')
+        self.assertIn('X-DB-Time-Ms', response)
+        self.assertNotIn('X-DB-Repeated-Queries', response)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual(
+            (record['view'], record['queries'], record['budget'], record['over_budget'], record['repeated']),
+            ('faculty_names', 2, 3, False, []),
+        )
+
+    def test_log_lines_reach_the_console(self):
+        logger = logging.getLogger('performance')
+        self.assertEqual(logger.getEffectiveLevel(), logging.INFO)
+        self.assertTrue(any(isinstance(handler, logging.StreamHandler) for handler in logger.handlers))
+
+        with self.assertLogs('performance', 'INFO') as logs:
+            self.client.get('/faculty-names/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['event'], 'db_queries')
+        self.assertEqual((record['method'], record['path'], record['status']), ('GET', '/faculty-names/', 200))
+        self.assertIsInstance(record['db_ms'], float)
+
+    def test_repeated_shapes_are_flagged(self):
+        with self.assertLogs('performance', 'WARNING') as logs:
+            response = self.client.get('/faculty-names/', {'n': 4})
+        self.assertEqual(response['X-DB-Repeated-Queries'], '1')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['over_budget'])
+        self.assertEqual(record['repeated'][0]['count'], 4)
+        self.assertIn('"student_faculty"', record['repeated'][0]['sql'])
+
+    @override_settings(QUERY_INSPECTION=False)
+    def test_disabled_outside_debug(self):
+        response = self.client.get('/faculty-names/')
+        self.assertNotIn('X-DB-Query-Count', response)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class QueryBudgetTestMixinTests(QueryBudgetTestMixin, TestCase):
+    def test_declared_budget(self):
+        response = self.assertWithinQueryBudget(self.client.get, '/faculty-names/', {'n': 3})
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaisesMessage(AssertionError, '4 queries exceed the budget of 3; repeated shapes:'):
+            self.assertWithinQueryBudget(self.client.get, '/faculty-names/', {'n': 4})
+
+    def test_explicit_budget(self):
+        with self.assertRaisesMessage(AssertionError, '2 queries exceed the budget of 1'):
+            self.assertWithinQueryBudget(self.client.get, '/faculty-names/', {'n': 2}, budget=1)
+
+    def test_records_all_statements(self):
+        with record_queries() as recorder:
+            User.objects.count()
+            Faculty.objects.count()
+        self.assertEqual(recorder.count, 2)
+        self.assertEqual(recorder.repeated(threshold=2), [])
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+
+from Etu_student_result.rate_limit import ROLE_SESSION_KEY, SlidingWindowRateLimiter
+from student.models import Student, Faculty, Department, Program
+
+
+class SlidingWindowRateLimiterTest(TestCase):
+    """Counters are weighted across two windows and kept in the cache."""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.limiter = SlidingWindowRateLimiter(window=60)
+
+    def test_blocks_at_limit_until_window_slides(self):
+        for _ in range(3):
+            self.assertEqual(self.limiter.hit('ip:1', 3, now=6000), (True, 0))
+        self.assertEqual(self.limiter.hit('ip:1', 3, now=6010), (False, 51))
+        self.assertTrue(self.limiter.hit('ip:2', 3, now=6010)[0])  # other clients are unaffected
+
+        # Half way into the next window the previous 3 weigh 1.5, leaving room for two more
+        self.assertEqual(self.limiter.hit('ip:1', 3, now=6090), (True, 0))
+        self.assertEqual(self.limiter.hit('ip:1', 3, now=6090), (True, 0))
+        self.assertEqual(self.limiter.hit('ip:1', 3, now=6090), (False, 11))
+        self.assertFalse(self.limiter.hit('ip:1', 3, now=6100)[0])  # 3 * 1/3 + 2 is still at the limit
+        self.assertTrue(self.limiter.hit('ip:1', 3, now=6101)[0])
+
+    def test_blocked_requests_are_not_counted(self):
+        self.limiter.hit('ip:1', 1, now=6000)
+        for _ in range(5):
+            self.assertFalse(self.limiter.hit('ip:1', 1, now=6030)[0])
+        self.assertTrue(self.limiter.hit('ip:1', 1, now=6120)[0])
+
+    def test_no_database_queries(self):
+        with self.assertNumQueries(0):
+            self.limiter.hit('ip:1', 3)
+
+
+@override_settings(
+    RATE_LIMITS={'anonymous': 3, 'user': 3, 'student': 5},
+    RATE_LIMIT_ROUTES={'/student/login/': 2},
+)
+class RateLimitingMiddlewareTest(TestCase):
+    """Limits are shared across handlers and chosen by role and route."""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        self.user = User.objects.create_user(username='rl@example.com', password='pass123')
+        Student.objects.create(
+            user=self.user, student_id='RL1', email='rl@example.com',
+            faculty=faculty, department=department, program=program,
+        )
+
+    def test_anonymous_limit_is_shared_between_handlers(self):
+        # Each Client builds its own middleware chain, like separate worker processes
+        for _ in range(3):
+            self.assertEqual(Client(SERVER_NAME='127.0.0.1').get('/').status_code, 200)
+        response = Client(SERVER_NAME='127.0.0.1').get('/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(Client(SERVER_NAME='127.0.0.1', REMOTE_ADDR='10.0.0.2').get('/').status_code, 200)
+
+    def test_route_limit(self):
+        client = Client(SERVER_NAME='127.0.0.1')
+        self.assertEqual(client.get('/student/login/').status_code, 200)
+        self.assertEqual(client.get('/student/login/').status_code, 200)
+        self.assertEqual(client.get('/student/login/').status_code, 429)
+        self.assertEqual(client.get('/').status_code, 200)  # the role limit still has room
+
+    def test_logged_in_users_are_limited_by_role(self):
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(self.user)
+        self.assertEqual(client.session[ROLE_SESSION_KEY], 'student')
+        for i in range(5):
+            # Changing address does not reset a logged-in user's count
+            self.assertEqual(client.get('/', REMOTE_ADDR=f'10.0.0.{i}').status_code, 200)
+        self.assertEqual(client.get('/', REMOTE_ADDR='10.0.1.1').status_code, 429)
+        self.assertEqual(Client(SERVER_NAME='127.0.0.1').get('/').status_code, 200)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
+
+from Etu_student_result.sessions import REFRESHED_AT_KEY
+from student.models import Faculty, Department, Program, Student
+
+
+@override_settings(SESSION_REFRESH_INTERVAL=300)
+class SlidingSessionTests(TestCase):
+    def setUp(self):
+        faculty = Faculty.objects.create(name='SFac', code='SF')
+        department = Department.objects.create(name='SDept', code='SD', faculty=faculty)
+        program = Program.objects.create(name='SProg', code='SP', department=department)
+        self.user = User.objects.create_user(username='sliding', password='pass')
+        Student.objects.create(
+            user=self.user, student_id='SL1', email='sl@example.com',
+            faculty=faculty, department=department, program=program,
+        )
+
+    def _get(self, at):
+        with mock.patch('Etu_student_result.sessions.time') as clock:
+            clock.time.return_value = at
+            response = self.client.get('/student/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return settings.SESSION_COOKIE_NAME in response.cookies
+
+    def test_session_saved_once_per_interval(self):
+        self.client.force_login(self.user)
+        logged_in_at = self.client.session[REFRESHED_AT_KEY]  # stamped by the login save
+        self.assertFalse(self._get(logged_in_at + 10))
+        self.assertFalse(self._get(logged_in_at + 299))
+        self.assertTrue(self._get(logged_in_at + 300))  # window moved: expiry slides forward
+        self.assertFalse(self._get(logged_in_at + 400))
+        self.assertEqual(self.client.session[REFRESHED_AT_KEY], logged_in_at + 300)
+
+    def test_unstamped_session_is_refreshed(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        del session[REFRESHED_AT_KEY]
+        session.save()
+        self.assertTrue(self._get(1000))
+        self.assertFalse(self._get(1010))
+
+    def test_anonymous_requests_do_not_create_sessions(self):
+        response = self.client.get('/')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_stale_cookie_is_not_revived(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'x' * 32
+        response = self.client.get('/')
+        self.assertEqual(response.cookies[settings.SESSION_COOKIE_NAME].value, '')  # deleted, not re-issued
+        self.assertFalse(Session.objects.exists())
@@ -9,6 +9,7 @@ urlpatterns = [
     path('hod/pending/', views.hod_pending_list, name='hod_pending_list'),
     path('hod/approved/', views.hod_approved_list, name='hod_approved_list'),
     path('hod/review/<int:workflow_id>/', views.hod_review_result, name='hod_review_result'),
+    path('hod/review/bulk/', views.hod_bulk_review, name='hod_bulk_review'),
     path('hod/student-folders/', views.hod_student_folders, name='hod_student_folders'),
     path('hod/student-folder/<int:folder_id>/', views.hod_folder_detail, name='hod_folder_detail'),
     
@@ -46,10 +47,12 @@ urlpatterns = [
     path('faculty/<int:faculty_id>/', views.faculty_detail, name='faculty_detail'),
     path('department/<int:dept_id>/', views.department_detail, name='department_detail'),
     path('dean/review/<int:workflow_id>/', views.dean_review_result, name='dean_review_result'),
+    path('dean/review/bulk/', views.dean_bulk_review, name='dean_bulk_review'),
     path('dean/logout/', views.dean_logout, name='dean_logout'),
     # Exam Officer preview and publish
     path('exam-officer/preview/', views.exam_officer_preview_results, name='exam_officer_preview_results'),
     path('exam-officer/publish/<int:workflow_id>/', views.exam_officer_publish_result, name='exam_officer_publish_result'),
+    path('exam-officer/publish/bulk/', views.exam_officer_bulk_publish, name='exam_officer_bulk_publish'),
     # CSV export and archive endpoints
     path('export-results/', views.export_results_csv, name='export_results_csv'),
     path('archive-results/', views.archive_program_results, name='archive_program_results'),
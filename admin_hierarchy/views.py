@@ -8,18 +8,22 @@ from django.contrib import messages
 from django.views.decorators.http import require_http_methods, require_POST
 from django.utils import timezone
 from django.core.paginator import Paginator
-from django.db.models import Q, Avg, Count
-from django.http import HttpResponse, JsonResponse
-import csv, io, logging
+from django.db.models import Q, Count
+from django.http import JsonResponse, StreamingHttpResponse
+import csv, itertools, logging, time
 from student.models import Faculty, Department, Program, StudentSemesterFolder
 from student.models_enhanced import FacultyResultOverview, DepartmentResultOverview, LecturerResultReport
 from django.urls import reverse
 
 from .models import HeadOfDepartment, DeanOfFaculty, ResultApprovalWorkflow, ApprovalHistory
-from student.models import Student, Result, Department, Faculty, Program
+from student.models import (
+    Student, Result, Department, Faculty, Program, archive_results_into_folders, grade_statistics,
+)
 from exam_officer.models import ExamOfficer, Notification
 from .forms import DeanStudentForm
 from .forms import DeanProgramForm
+from Etu_student_result.dashboard_counters import hod_counters, dean_counters, faculty_counters
+from .workflow_actions import publishable_workflows, publish_workflows, review_workflows
 
 logger = logging.getLogger('security')
 
@@ -106,10 +110,11 @@ def hod_dashboard(request):
     # Students in this HOD's department
     students = Student.objects.filter(department=hod.department, is_active=True)
     
+    counters = hod_counters(hod)
     context = {
         'hod': hod,
-        'pending_count': pending_workflows.count(),
-        'approved_count': approved_by_hod.count(),
+        'pending_count': counters['pending'],
+        'approved_count': counters['approved'],
         'pending_workflows': pending_workflows[:10],
         'approved_workflows': approved_by_hod[:10],
         'students': students[:20],
@@ -183,6 +188,46 @@ def hod_approved_list(request):
 
 
 
+def _bulk_review_message(request, transitioned, action, forwarded_to):
+    """Flash how many workflows each batch of a bulk review transitioned."""
+    total = sum(transitioned)
+    if not total:
+        messages.info(request, 'None of the selected results were still awaiting your review.')
+        return
+    per_batch = ', '.join(str(count) for count in transitioned)
+    if action == 'approve':
+        messages.success(request, f'{total} result(s) approved and forwarded to {forwarded_to} (per batch: {per_batch}).')
+    else:
+        messages.warning(request, f'{total} result(s) rejected (per batch: {per_batch}).')
+
+
+@require_profile('hod_profile', login_url='hod_login')
+@require_POST
+def hod_bulk_review(request):
+    """HOD approves or rejects the selected pending results with one shared note"""
+    hod = request.user.hod_profile
+    action = request.POST.get('action')
+    notes = request.POST.get('notes', '')
+    workflow_ids = [wid for wid in request.POST.getlist('workflow_ids') if wid.isdigit()]
+
+    if action not in ('approve', 'reject') or not workflow_ids:
+        messages.error(request, 'Select at least one result and choose approve or reject.')
+        return redirect('hod_pending_list')
+
+    assign = None
+    if action == 'approve':
+        dean = DeanOfFaculty.objects.filter(faculty=hod.department.faculty).first() if hod.department else None
+        if dean is None:
+            messages.error(request, 'No DEAN is assigned to your faculty; results cannot be forwarded.')
+            return redirect('hod_pending_list')
+        assign = {'current_dean': dean}
+
+    workflows = ResultApprovalWorkflow.objects.filter(current_hod=hod, pk__in=workflow_ids)
+    transitioned = review_workflows(workflows, 'hod', action, request.user, notes, assign=assign)
+    _bulk_review_message(request, transitioned, action, 'DEAN')
+    return redirect('hod_pending_list')
+
+
 @login_required(login_url='hod_login')
 def hod_review_result(request, workflow_id):
     """HOD reviews a result submission and approves/rejects"""
@@ -344,16 +389,23 @@ def dean_dashboard(request):
     except:
         approved_page = approved_paginator.get_page(1)
     
+    # Unfiltered counts come from the cached counters; searches count the matches
+    if q:
+        counters = {'pending': pending_paginator.count, 'approved': approved_paginator.count}
+    else:
+        counters = dean_counters(dean)
+    faculty_stats = faculty_counters(dean.faculty)
+
     context = {
         'dean': dean,
-        'pending_count': pending_qs.count(),
-        'approved_count': approved_qs.count(),
+        'pending_count': counters['pending'],
+        'approved_count': counters['approved'],
         'pending_page': pending_page,
         'approved_page': approved_page,
         'q': q,
         # Extra counts for dashboard widgets
-        'hod_count': HeadOfDepartment.objects.filter(department__faculty=dean.faculty).count(),
-        'total_count': Result.objects.filter(faculty=dean.faculty).count(),
+        'hod_count': faculty_stats['hod_count'],
+        'total_count': faculty_stats['result_count'],
     }
     
     return render(request, 'admin_hierarchy/dean_dashboard.html', context)
@@ -762,6 +814,32 @@ def dean_add_program(request):
     return render(request, 'admin_hierarchy/dean_add_program.html', {'form': form, 'dean': dean})
 
 
+@require_profile('dean_profile', login_url='dean_login')
+@require_POST
+def dean_bulk_review(request):
+    """DEAN approves or rejects the selected HOD-approved results with one shared note"""
+    dean = request.user.dean_profile
+    action = request.POST.get('action')
+    notes = request.POST.get('notes', '')
+    workflow_ids = [wid for wid in request.POST.getlist('workflow_ids') if wid.isdigit()]
+
+    if action not in ('approve', 'reject') or not workflow_ids:
+        messages.error(request, 'Select at least one result and choose approve or reject.')
+        return redirect('dean_pending_list')
+
+    assign = None
+    if action == 'approve':
+        # Assign to an active EXAM Officer, as the single review does
+        exam_officer = ExamOfficer.objects.filter(is_active=True).first()
+        if exam_officer:
+            assign = {'current_exam_officer': exam_officer}
+
+    workflows = ResultApprovalWorkflow.objects.filter(current_dean=dean, pk__in=workflow_ids)
+    transitioned = review_workflows(workflows, 'dean', action, request.user, notes, assign=assign)
+    _bulk_review_message(request, transitioned, action, 'the EXAM officer')
+    return redirect('dean_pending_list')
+
+
 @login_required(login_url='dean_login')
 def dean_review_result(request, workflow_id):
     """DEAN reviews HOD-approved results and forwards to EXAM"""
@@ -857,37 +935,17 @@ def exam_officer_preview_results(request):
     except:
         return redirect('exam_officer_login')
 
-    # Get all workflows with status 'dean_approved' (ready to publish)
-    workflows = ResultApprovalWorkflow.objects.filter(
-        status='dean_approved'
-    ).select_related('result', 'result__student', 'result__program', 'result__department', 'result__faculty').order_by('-dean_reviewed_at')
-
-    # Optional filtering by program/department/faculty
+    # Workflows with status 'dean_approved' (ready to publish), optionally filtered
+    # by program/department/faculty, academic year and semester, and course name
+    workflows = publishable_workflows(request.GET).select_related(
+        'result', 'result__student', 'result__program', 'result__department', 'result__faculty'
+    ).order_by('-dean_reviewed_at')
     program_id = request.GET.get('program')
     department_id = request.GET.get('department')
     faculty_id = request.GET.get('faculty')
     year_semester = request.GET.get('year_semester')
     course = request.GET.get('course', '').strip()
 
-    if program_id:
-        workflows = workflows.filter(result__program_id=program_id)
-    if department_id:
-        workflows = workflows.filter(result__department_id=department_id)
-    if faculty_id:
-        workflows = workflows.filter(result__faculty_id=faculty_id)
-    
-    # Filter by academic year and semester
-    if year_semester:
-        try:
-            year, semester = year_semester.split('-')
-            workflows = workflows.filter(result__academic_year=year, result__semester=semester)
-        except:
-            pass
-    
-    # Filter by course/module/subject name
-    if course:
-        workflows = workflows.filter(result__subject__icontains=course)
-
     paginator = Paginator(workflows, 20)
     page_number = request.GET.get('page', 1)
     page = paginator.get_page(page_number)
@@ -933,38 +991,9 @@ def exam_officer_publish_result(request, workflow_id):
         notes = request.POST.get('notes', '')
 
         if action == 'publish':
-            result.is_published = True
-            result.save()
-
-            workflow.status = 'exam_published'
-            workflow.exam_officer_notes = notes
-            workflow.exam_officer_reviewed_at = timezone.now()
-            workflow.save()
-
-            ApprovalHistory.objects.create(
-                workflow=workflow,
-                action='exam_published',
-                admin_user=request.user,
-                notes=notes
-            )
-
-            # Auto-calculate GPA and total score for the student's semester folder
-            try:
-                if result.folder:
-                    result.folder.recalculate_all()
-            except Exception as e:
-                # Log but don't fail if GPA calculation has issues
-                pass
-
-            # Send notifications to students, department, and faculty
-            from admin_hierarchy.signals import (
-                notify_student_results_published,
-                notify_department_results_published,
-                notify_faculty_results_published
-            )
-            notify_student_results_published(workflow)
-            notify_department_results_published(workflow)
-            notify_faculty_results_published(workflow)
+            # Same path as the bulk publish: result, workflow, history,
+            # notifications and the semester folder GPA in one transaction
+            publish_workflows(ResultApprovalWorkflow.objects.filter(pk=workflow.pk), request.user, notes)
 
             messages.success(request, f'Result for {result.student.student_id} published successfully. Students can now view their grades.')
             return redirect('exam_officer_preview_results')
@@ -995,6 +1024,35 @@ def exam_officer_publish_result(request, workflow_id):
     return render(request, 'admin_hierarchy/exam_officer_publish_result.html', context)
 
 
+@require_profile('exam_officer_profile', login_url='exam_officer_login')
+@require_POST
+def exam_officer_bulk_publish(request):
+    """
+    Publish many dean-approved results at once.
+    POST either `workflow_ids` (selected rows) or `publish_all` together with the
+    preview filters (program/department/faculty, year_semester or academic_year
+    + semester, course).
+    """
+    notes = request.POST.get('notes', '')
+    workflow_ids = [wid for wid in request.POST.getlist('workflow_ids') if wid.isdigit()]
+    filter_keys = ('program', 'department', 'faculty', 'year_semester', 'academic_year', 'semester', 'course')
+
+    if workflow_ids:
+        workflows = publishable_workflows({}).filter(pk__in=workflow_ids)
+    elif request.POST.get('publish_all') and any(request.POST.get(key) for key in filter_keys):
+        workflows = publishable_workflows(request.POST)
+    else:
+        messages.error(request, 'Select results or set at least one filter before publishing in bulk.')
+        return redirect('exam_officer_preview_results')
+
+    published = publish_workflows(workflows, request.user, notes)
+    if published:
+        messages.success(request, f'{published} result(s) published successfully. Students can now view their grades.')
+    else:
+        messages.info(request, 'No results awaiting publication matched your selection.')
+    return redirect('exam_officer_preview_results')
+
+
 @require_profile('hod_profile', login_url='hod_login')
 def hod_student_folders(request):
     """HOD views all student semester folders in their department, grouped by program."""
@@ -1161,6 +1219,63 @@ def dean_folder_detail(request, folder_id):
     return render(request, 'admin_hierarchy/dean_folder_detail.html', context)
 
 
+# Rows fetched per round trip by the streaming CSV export
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_CSV_HEADER = [
+    'student_id', 'student_name', 'faculty', 'department', 'program',
+    'academic_year', 'semester', 'subject', 'result_type', 'score', 'total_score', 'grade',
+    'uploaded_by', 'uploaded_date', 'published_date'
+]
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _keyset_rows(qs, chunk_size):
+    """Rows of `qs` in primary key order, read `chunk_size` rows per query.
+
+    Each chunk is a separate `pk > last pk` query rather than one
+    QuerySet.iterator(): on MySQL Django has no server-side cursors, so
+    mysqlclient would load the whole result set into memory before the first
+    row is yielded.
+    """
+    last_pk = None
+    while True:
+        page = qs.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1].pk
+
+
+def _export_row(r):
+    return [
+        r.student.student_id,
+        r.student.user.get_full_name(),
+        r.faculty.name if r.faculty else '',
+        r.department.name if r.department else '',
+        r.program.name if r.program else '',
+        r.academic_year,
+        r.semester,
+        r.subject,
+        r.result_type,
+        float(r.score),
+        float(r.total_score),
+        r.grade,
+        r.uploaded_by.user.get_full_name() if r.uploaded_by else '',
+        r.uploaded_date.isoformat() if r.uploaded_date else '',
+        r.published_date.isoformat() if r.published_date else '',
+    ]
+
+
 @login_required
 def export_results_csv(request):
     """Export published results as CSV filtered by faculty/department/program/year/semester.
@@ -1179,7 +1294,9 @@ def export_results_csv(request):
     academic_year = request.GET.get('academic_year')
     semester = request.GET.get('semester')
 
-    qs = Result.objects.filter(is_published=True).select_related('student', 'program', 'department', 'faculty', 'uploaded_by')
+    qs = Result.objects.filter(is_published=True).select_related(
+        'student__user', 'program', 'department', 'faculty', 'uploaded_by__user',
+    )
 
     # Apply explicit filters
     if program_id:
@@ -1199,44 +1316,13 @@ def export_results_csv(request):
     if hasattr(user, 'dean_profile') and not user.is_superuser:
         qs = qs.filter(faculty=user.dean_profile.faculty)
 
-    # Prepare CSV
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-
-    header = [
-        'student_id', 'student_name', 'faculty', 'department', 'program',
-        'academic_year', 'semester', 'subject', 'result_type', 'score', 'total_score', 'grade',
-        'uploaded_by', 'uploaded_date', 'published_date'
-    ]
-    writer.writerow(header)
-
-    for r in qs.order_by('student__student_id', 'subject'):
-        student_name = r.student.user.get_full_name() if r.student and r.student.user else ''
-        uploaded_by = ''
-        if getattr(r, 'uploaded_by', None):
-            try:
-                uploaded_by = r.uploaded_by.user.get_full_name()
-            except Exception:
-                uploaded_by = str(r.uploaded_by)
-        writer.writerow([
-            r.student.student_id if r.student else '',
-            student_name,
-            r.faculty.name if r.faculty else '',
-            r.department.name if r.department else '',
-            r.program.name if r.program else '',
-            r.academic_year,
-            r.semester,
-            r.subject,
-            r.result_type,
-            float(r.score),
-            float(r.total_score),
-            r.grade,
-            uploaded_by,
-            r.uploaded_date.isoformat() if r.uploaded_date else '',
-            r.published_date.isoformat() if r.published_date else '',
-        ])
-
-    resp = HttpResponse(buffer.getvalue(), content_type='text/csv')
+    # Stream rows chunk by chunk so memory stays flat on faculty-wide exports
+    rows = _keyset_rows(qs, EXPORT_CHUNK_SIZE)
+    writer = csv.writer(_EchoBuffer())
+    resp = StreamingHttpResponse(
+        (writer.writerow(row) for row in itertools.chain([EXPORT_CSV_HEADER], map(_export_row, rows))),
+        content_type='text/csv',
+    )
     filename = 'results_export'
     if academic_year:
         filename += f"_{academic_year}"
@@ -1273,6 +1359,9 @@ def archive_program_results(request):
     if not program_id or not academic_year or not semester:
         messages.error(request, 'Missing required parameters for archiving.')
         return redirect(request.META.get('HTTP_REFERER', '/'))
+    if not program_id.isdigit() or not Program.objects.filter(pk=program_id).exists():
+        messages.error(request, 'Unknown program.')
+        return redirect(request.META.get('HTTP_REFERER', '/'))
 
     results_qs = Result.objects.filter(is_published=True, program_id=program_id, academic_year=academic_year, semester=semester)
 
@@ -1282,39 +1371,20 @@ def archive_program_results(request):
     if hasattr(user, 'dean_profile') and not user.is_superuser:
         results_qs = results_qs.filter(faculty=user.dean_profile.faculty)
 
-    student_ids = results_qs.values_list('student_id', flat=True).distinct()
-
-    created = 0
-    for sid in student_ids:
-        try:
-            student = Student.objects.get(id=sid)
-        except Student.DoesNotExist:
-            continue
-
-        folder, created_flag = StudentSemesterFolder.objects.get_or_create(
-            student=student,
-            academic_year=academic_year,
-            semester=semester,
-            defaults={
-                'program': Program.objects.filter(id=program_id).first(),
-                'department': student.department,
-                'faculty': student.faculty,
-            }
-        )
-        if created_flag:
-            created += 1
-
-        # Attach all matched results for this student to the folder
-        student_results = results_qs.filter(student=student)
-        for res in student_results:
-            if res.folder_id != folder.id:
-                res.folder = folder
-                try:
-                    res.save()
-                except Exception:
-                    pass
+    started = time.perf_counter()
+    stats = archive_results_into_folders(results_qs, academic_year, semester, program_id=program_id)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        'archive_program_results: program=%s %s S%s students=%d folders_created=%d results_attached=%d in %.0fms',
+        program_id, academic_year, semester,
+        stats['students'], stats['folders_created'], stats['results_attached'], elapsed_ms,
+    )
 
-    messages.success(request, f'Archiving complete. Created {created} new semester folders and attached results.')
+    messages.success(
+        request,
+        f"Archiving complete. Created {stats['folders_created']} new semester folders and attached "
+        f"{stats['results_attached']} results for {stats['students']} students in {elapsed_ms:.0f} ms.",
+    )
     return redirect(request.META.get('HTTP_REFERER', '/'))
 
 
@@ -1377,30 +1447,15 @@ def hod_create_overview(request):
                 is_published=True
             )
             
-            # Calculate statistics
-            total_results = results.count()
-            total_students = results.values('student').distinct().count()
-            total_modules = results.values('module').distinct().count()
-            
-            avg_score = results.aggregate(Avg('score'))['score__avg'] or 0
-            
-            # Grade distribution
-            grade_counts = {
-                'A': results.filter(grade='A').count(),
-                'B': results.filter(grade='B').count(),
-                'C': results.filter(grade='C').count(),
-                'D': results.filter(grade='D').count(),
-                'F': results.filter(grade='F').count(),
-            }
-            
-            # Calculate pass rate
-            passed = results.exclude(grade='F').count()
-            pass_rate = (passed / total_results * 100) if total_results > 0 else 0
-            
-            # Calculate GPA (assuming A=4.0, B=3.0, C=2.0, D=1.0, F=0.0)
-            grade_points = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
-            total_points = sum(grade_points.get(r.grade, 0) for r in results)
-            overall_gpa = (total_points / total_results) if total_results > 0 else 0.0
+            # Counts, pass rate, mean score and GPA in one aggregate
+            stats = grade_statistics(results)
+            total_results = stats['total']
+            total_students = stats['total_students']
+            total_modules = stats['total_modules']
+            avg_score = stats['average_score']
+            grade_counts = stats['grade_counts']
+            pass_rate = stats['pass_rate']
+            overall_gpa = stats['gpa']
             
             # Get or create overview
             overview, created = DepartmentResultOverview.objects.update_or_create(
@@ -1650,30 +1705,15 @@ def dean_create_overview(request):
                 is_published=True
             )
             
-            # Calculate statistics
-            total_results = results.count()
-            total_students = results.values('student').distinct().count()
-            total_modules = results.values('module').distinct().count()
-            
-            avg_score = results.aggregate(Avg('score'))['score__avg'] or 0
-            
-            # Grade distribution
-            grade_counts = {
-                'A': results.filter(grade='A').count(),
-                'B': results.filter(grade='B').count(),
-                'C': results.filter(grade='C').count(),
-                'D': results.filter(grade='D').count(),
-                'F': results.filter(grade='F').count(),
-            }
-            
-            # Calculate pass rate
-            passed = results.exclude(grade='F').count()
-            pass_rate = (passed / total_results * 100) if total_results > 0 else 0
-            
-            # Calculate GPA
-            grade_points = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
-            total_points = sum(grade_points.get(r.grade, 0) for r in results)
-            overall_gpa = (total_points / total_results) if total_results > 0 else 0.0
+            # Counts, pass rate, mean score and GPA in one aggregate
+            stats = grade_statistics(results)
+            total_results = stats['total']
+            total_students = stats['total_students']
+            total_modules = stats['total_modules']
+            avg_score = stats['average_score']
+            grade_counts = stats['grade_counts']
+            pass_rate = stats['pass_rate']
+            overall_gpa = stats['gpa']
             
             # Get or create overview
             overview, created = FacultyResultOverview.objects.update_or_create(
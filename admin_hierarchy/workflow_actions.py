@@ -0,0 +1,156 @@
+"""
+Set-based transitions for ResultApprovalWorkflow.
+
+The review views move one workflow at a time; the functions here move a whole
+queryset with a fixed number of statements per batch: UPDATEs for the status
+columns, bulk_create for ApprovalHistory and Notification rows, and one
+set-based recalculation for the affected semester folders.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from Etu_student_result.dashboard_counters import invalidate_dashboard_counters
+from student.models import Result, recalculate_folder_aggregates
+from student.results_cache import bump_results_version
+from student.tasks import mark_analytics_dirty
+from .models import ResultApprovalWorkflow, ApprovalHistory
+from .signals import (
+    bulk_notify, RESULTS_PUBLISHED_NOTIFICATIONS,
+    hod_approved_notification, hod_rejected_notification,
+    dean_approved_notification, dean_rejected_notification,
+)
+
+# Keep IN (...) lists well below backend parameter limits
+BATCH_SIZE = 500
+
+
+def _batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# (stage, action) -> status a workflow must be in, status it moves to,
+# notes/timestamp columns written and the notification sent
+REVIEW_TRANSITIONS = {
+    ('hod', 'approve'): ('lecturer_submitted', 'hod_approved', 'hod_notes', 'hod_reviewed_at', hod_approved_notification),
+    ('hod', 'reject'): ('lecturer_submitted', 'hod_rejected', 'hod_notes', 'hod_reviewed_at', hod_rejected_notification),
+    ('dean', 'approve'): ('hod_approved', 'dean_approved', 'dean_notes', 'dean_reviewed_at', dean_approved_notification),
+    ('dean', 'reject'): ('hod_approved', 'dean_rejected', 'dean_notes', 'dean_reviewed_at', dean_rejected_notification),
+}
+
+
+def review_workflows(workflows, stage, action, user, notes='', assign=None, batch_size=BATCH_SIZE):
+    """Approve or reject many workflows for the HOD or DEAN `stage` with one shared note.
+
+    Only workflows still in the stage's pending status are moved. Each batch
+    runs in its own transaction: the rows are locked and re-checked, moved
+    with one UPDATE (plus the `assign` columns, e.g. current_dean), and their
+    ApprovalHistory rows and notifications are bulk inserted. Returns the
+    number of workflows transitioned by each batch.
+    """
+    from_status, to_status, notes_field, reviewed_field, notification = REVIEW_TRANSITIONS[(stage, action)]
+    ids = list(workflows.filter(status=from_status).order_by('pk').values_list('pk', flat=True))
+
+    transitioned = []
+    for batch in _batches(ids, batch_size):
+        with transaction.atomic():
+            locked = list(
+                ResultApprovalWorkflow.objects.filter(pk__in=batch, status=from_status)
+                .select_for_update().values_list('pk', flat=True)
+            )
+            if locked:
+                ResultApprovalWorkflow.objects.filter(pk__in=locked).update(
+                    status=to_status,
+                    **{notes_field: notes, reviewed_field: timezone.now()},
+                    **(assign or {}),
+                )
+                rows = list(
+                    ResultApprovalWorkflow.objects.filter(pk__in=locked).select_related(
+                        'result', 'result__student', 'result__uploaded_by',
+                        'current_hod', 'current_dean', 'current_exam_officer',
+                    )
+                )
+                ApprovalHistory.objects.bulk_create([
+                    ApprovalHistory(workflow=wf, action=to_status, admin_user=user, notes=notes) for wf in rows
+                ])
+                bulk_notify(rows, notification)
+                invalidate_dashboard_counters(
+                    hods=[wf.current_hod_id for wf in rows], deans=[wf.current_dean_id for wf in rows],
+                )
+        transitioned.append(len(locked))
+    return transitioned
+
+
+def publishable_workflows(params):
+    """Workflows awaiting publication narrowed by the exam officer's filters.
+
+    `params` is a QueryDict/dict with any of program, department, faculty,
+    year_semester ("2024/2025-1"), academic_year, semester and course.
+    """
+    workflows = ResultApprovalWorkflow.objects.filter(status='dean_approved')
+
+    if params.get('program'):
+        workflows = workflows.filter(result__program_id=params['program'])
+    if params.get('department'):
+        workflows = workflows.filter(result__department_id=params['department'])
+    if params.get('faculty'):
+        workflows = workflows.filter(result__faculty_id=params['faculty'])
+
+    year, semester = params.get('academic_year'), params.get('semester')
+    if params.get('year_semester'):
+        try:
+            year, semester = params['year_semester'].rsplit('-', 1)
+        except ValueError:
+            pass
+    if year:
+        workflows = workflows.filter(result__academic_year=year)
+    if semester:
+        workflows = workflows.filter(result__semester=semester)
+
+    course = (params.get('course') or '').strip()
+    if course:
+        workflows = workflows.filter(result__subject__icontains=course)
+    return workflows
+
+
+def publish_workflows(workflows, user, notes=''):
+    """Publish every dean-approved workflow in `workflows` in one transaction.
+
+    Results are flagged published and stamped with published_date, the
+    workflows move to 'exam_published', and the ApprovalHistory rows and
+    student/HOD/DEAN notifications are bulk inserted. Each affected semester
+    folder is recalculated once and the affected analytics snapshot keys are
+    marked for refresh. Returns the number of workflows published.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            workflows.filter(status='dean_approved').select_for_update().order_by().values_list('pk', flat=True)
+        )
+        folder_ids = set()
+        for batch in _batches(ids):
+            rows = list(
+                ResultApprovalWorkflow.objects.filter(pk__in=batch)
+                .select_related('result', 'result__student', 'current_hod', 'current_dean')
+            )
+            result_ids = [wf.result_id for wf in rows]
+            Result.objects.filter(pk__in=result_ids).update(is_published=True, published_date=now, updated_date=now)
+            ResultApprovalWorkflow.objects.filter(pk__in=batch).update(
+                status='exam_published', exam_notes=notes, exam_reviewed_at=now,
+            )
+            ApprovalHistory.objects.bulk_create([
+                ApprovalHistory(workflow=wf, action='exam_published', admin_user=user, notes=notes)
+                for wf in rows
+            ])
+            bulk_notify(rows, *RESULTS_PUBLISHED_NOTIFICATIONS)
+            invalidate_dashboard_counters(
+                lecturers=[wf.result.uploaded_by_id for wf in rows], deans=[wf.current_dean_id for wf in rows],
+            )
+            mark_analytics_dirty(wf.result for wf in rows)
+            bump_results_version(wf.result.student_id for wf in rows)
+            folder_ids.update(wf.result.folder_id for wf in rows if wf.result.folder_id)
+
+        if folder_ids:
+            recalculate_folder_aggregates(folder_ids)
+    return len(ids)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Lecturer
+from .models import Lecturer, UploadJob
 
 @admin.register(Lecturer)
 class LecturerAdmin(admin.ModelAdmin):
@@ -21,3 +21,10 @@ class LecturerAdmin(admin.ModelAdmin):
         return obj.user.get_full_name()
     get_full_name.short_description = 'Name'
 
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'lecturer', 'kind', 'status', 'rows_processed', 'rows_failed', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'created_at')
+    search_fields = ('lecturer__lecturer_id', 'lecturer__email')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
@@ -0,0 +1,780 @@
+"""
+Set-based ingestion of lecturer result uploads.
+
+A CSV sheet is processed as a batch: every student ID, module code, HOD,
+semester folder, existing result and workflow referenced by the batch is
+resolved with a handful of IN queries, then results and workflows are written
+back with bulk_create/bulk_update inside one transaction. Per-row validation
+errors are reported with the same messages the row-by-row upload used.
+
+Large sheets are streamed: rows are pulled from the (temp-file-backed) upload
+in fixed-size chunks, each chunk is committed on its own, and errors go to a
+CompactErrorLog that keeps only the first few messages, so memory use does not
+grow with the size of the sheet.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from student.models import (
+    Student, Result, Module, Assessment, StudentSemesterFolder,
+    calculate_grade_from_percentage, recalculate_results_from_assessments,
+)
+from admin_hierarchy.models import ResultApprovalWorkflow, HeadOfDepartment
+from Etu_student_result.dashboard_counters import invalidate_dashboard_counters
+from student.results_cache import bump_results_version
+
+
+REQUIRED_CSV_HEADERS = {'Student_ID', 'Module_Code', 'Score'}
+
+
+class CompactErrorLog:
+    """Bounded error collector: keeps the first `limit` messages and counts the rest.
+
+    Behaves like the plain list the upload views used before for the operations
+    they need: append(), len() (total errors seen), truthiness, iteration and
+    slicing over the retained messages.
+    """
+
+    def __init__(self, limit=None):
+        if limit is None:
+            limit = getattr(settings, 'RESULT_CSV_MAX_LOGGED_ERRORS', 50)
+        self.limit = limit
+        self.total = 0
+        self._messages = []
+
+    def append(self, message):
+        self.total += 1
+        if len(self._messages) < self.limit:
+            self._messages.append(message)
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+
+def ensure_semester_folders(student_ids, academic_year, semester, defaults_by_student):
+    """Return {student_id: folder} for the given students, creating missing folders in bulk.
+
+    `defaults_by_student` maps a student id to a dict of program/department/faculty
+    ids used when the folder has to be created.
+    """
+    student_ids = set(student_ids)
+    if not student_ids:
+        return {}
+
+    existing = StudentSemesterFolder.objects.filter(
+        student_id__in=student_ids,
+        academic_year=academic_year,
+        semester=semester,
+    )
+    folders = {f.student_id: f for f in existing}
+
+    missing = [sid for sid in student_ids if sid not in folders]
+    if missing:
+        StudentSemesterFolder.objects.bulk_create(
+            [
+                StudentSemesterFolder(
+                    student_id=sid,
+                    academic_year=academic_year,
+                    semester=semester,
+                    **defaults_by_student.get(sid, {})
+                )
+                for sid in missing
+            ],
+            ignore_conflicts=True,
+        )
+        # Re-read so primary keys are available on every backend (MySQL does not
+        # return ids from bulk inserts).
+        for f in StudentSemesterFolder.objects.filter(
+            student_id__in=missing,
+            academic_year=academic_year,
+            semester=semester,
+        ):
+            folders[f.student_id] = f
+
+    return folders
+
+
+def submit_workflows_to_hod(results, hods_by_department, department_of=None):
+    """Create or reset the approval workflow of each result to `lecturer_submitted`.
+
+    `results` is an iterable of saved Result objects; results whose department
+    has no active HOD are skipped, mirroring the single-row upload behaviour.
+    `department_of(result)` picks the department whose HOD reviews the result
+    (the result's own department by default). Returns the number of workflows
+    written.
+    """
+    if department_of is None:
+        department_of = lambda result: result.department_id
+    pending = {}
+    for result in results:
+        hod = hods_by_department.get(department_of(result))
+        if hod:
+            pending[result.id] = hod
+    if not pending:
+        return 0
+
+    existing = {
+        w.result_id: w
+        for w in ResultApprovalWorkflow.objects.filter(result_id__in=pending.keys())
+    }
+    # Reviewers losing a workflow need their counters dropped as well
+    previous_hods = [w.current_hod_id for w in existing.values()]
+
+    to_update = []
+    to_create = []
+    for result_id, hod in pending.items():
+        workflow = existing.get(result_id)
+        if workflow:
+            workflow.status = 'lecturer_submitted'
+            workflow.current_hod = hod
+            to_update.append(workflow)
+        else:
+            to_create.append(ResultApprovalWorkflow(
+                result_id=result_id,
+                status='lecturer_submitted',
+                current_hod=hod,
+            ))
+
+    if to_update:
+        ResultApprovalWorkflow.objects.bulk_update(to_update, ['status', 'current_hod'])
+    if to_create:
+        ResultApprovalWorkflow.objects.bulk_create(to_create)
+    invalidate_dashboard_counters(
+        hods=[hod.id for hod in pending.values()] + previous_hods,
+        deans=[w.current_dean_id for w in existing.values()],
+    )
+    return len(to_update) + len(to_create)
+
+
+def active_hods_by_department(department_ids):
+    """Map department id -> active HeadOfDepartment for the given departments."""
+    department_ids = {d for d in department_ids if d}
+    if not department_ids:
+        return {}
+    return {
+        hod.department_id: hod
+        for hod in HeadOfDepartment.objects.filter(department_id__in=department_ids, is_active=True)
+    }
+
+
+class ResultCSVIngestor:
+    """Ingest rows of a lecturer result CSV for one program/result type/period.
+
+    Usage:
+        ingestor = ResultCSVIngestor(lecturer, program, 'exam', '2024/2025', '1')
+        ingestor.ingest(enumerate(reader, start=2))
+        ingestor.created_count, ingestor.updated_count, ingestor.errors
+
+    `ingest` may be called several times (e.g. once per chunk); counters and
+    errors accumulate across calls. `errors` may be any object supporting
+    `append` and `len`, such as a list or a CompactErrorLog. `ingest_stream`
+    does the chunking for an arbitrarily long reader.
+    """
+
+    def __init__(self, lecturer, program, result_type, academic_year, semester, errors=None):
+        self.lecturer = lecturer
+        self.program = program
+        self.result_type = result_type
+        self.academic_year = academic_year
+        self.semester = semester
+        self.created_count = 0
+        self.updated_count = 0
+        self.rows_processed = 0
+        self.errors = errors if errors is not None else []
+
+    def _parse_row(self, row_num, row):
+        """Validate a raw CSV row. Returns a tuple or None (after recording the error)."""
+        student_id = row.get('Student_ID', '').strip()
+        module_code = row.get('Module_Code', '').strip()
+        score_str = row.get('Score', '').strip()
+        total_score_str = row.get('Total_Score', '100').strip()
+
+        if not student_id:
+            self.errors.append(f'Row {row_num}: Student_ID is required')
+            return None
+
+        if not module_code:
+            self.errors.append(f'Row {row_num}: Module_Code is required')
+            return None
+
+        if not score_str:
+            self.errors.append(f'Row {row_num}: Score is required')
+            return None
+
+        try:
+            score = float(score_str)
+        except ValueError:
+            self.errors.append(f'Row {row_num}: Score "{score_str}" is not a valid number')
+            return None
+
+        try:
+            total_score = float(total_score_str) if total_score_str else 100
+        except ValueError:
+            self.errors.append(f'Row {row_num}: Total_Score "{total_score_str}" is not a valid number')
+            return None
+
+        return (row_num, student_id, module_code, score, total_score)
+
+    def ingest_stream(self, reader, chunk_size=None, start=2, on_chunk=None):
+        """Ingest a (possibly huge) row iterator in chunks of `chunk_size` rows.
+
+        Each chunk is resolved and committed in its own transaction; only one
+        chunk of rows is held in memory at a time. `on_chunk(self)` is called
+        after every chunk (used for job progress reporting).
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, 'RESULT_CSV_CHUNK_ROWS', 1000)
+        numbered = enumerate(reader, start=start)
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+            self.ingest(chunk)
+            if on_chunk:
+                on_chunk(self)
+
+    def ingest(self, numbered_rows):
+        """Ingest an iterable of (row_num, row_dict) pairs as a single batch."""
+        parsed = []
+        for row_num, row in numbered_rows:
+            self.rows_processed += 1
+            try:
+                item = self._parse_row(row_num, row)
+            except Exception as e:
+                self.errors.append(f'Row {row_num}: {str(e)}')
+                continue
+            if item:
+                parsed.append(item)
+
+        if not parsed:
+            return
+
+        # 1. Resolve students (one IN query)
+        students = {
+            s.student_id: s
+            for s in Student.objects.filter(student_id__in={p[1] for p in parsed})
+        }
+
+        accepted = []
+        for row_num, student_code, module_code, score, total_score in parsed:
+            student = students.get(student_code)
+            if student is None:
+                self.errors.append(f'Row {row_num}: Student with ID {student_code} not found')
+                continue
+            if student.program_id != self.program.id:
+                self.errors.append(f'Row {row_num}: Student {student_code} is not in program {self.program.name}')
+                continue
+            accepted.append((row_num, student, module_code, score, total_score))
+
+        if not accepted:
+            return
+
+        try:
+            with transaction.atomic():
+                self._write(accepted)
+        except Exception as e:
+            for row_num, *_ in accepted:
+                self.errors.append(f'Row {row_num}: Failed to create/update result: {str(e)}')
+
+    def _resolve_modules(self, accepted):
+        """Map module code -> Module, creating unknown codes in bulk."""
+        codes = {a[2] for a in accepted}
+        modules = {m.code: m for m in Module.objects.filter(code__in=codes)}
+
+        to_create = {}
+        for _, student, module_code, _, _ in accepted:
+            if module_code not in modules and module_code not in to_create:
+                to_create[module_code] = Module(
+                    code=module_code,
+                    name=module_code,
+                    program=self.program,
+                    department_id=student.department_id,
+                    faculty_id=student.faculty_id,
+                )
+        if to_create:
+            Module.objects.bulk_create(to_create.values())
+            for m in Module.objects.filter(code__in=to_create.keys()):
+                modules[m.code] = m
+        return modules
+
+    def _write(self, accepted):
+        modules = self._resolve_modules(accepted)
+        now = timezone.now()
+
+        # Last row wins for duplicate (student, subject) pairs, like repeated
+        # update_or_create calls; the earlier rows count as updates.
+        pending = {}
+        repeated = 0
+        for row_num, student, module_code, score, total_score in accepted:
+            subject = modules[module_code].name
+            percentage = (score / total_score) * 100 if total_score else 0
+            key = (student.id, subject)
+            if key in pending:
+                repeated += 1
+            pending[key] = (row_num, student, score, total_score, calculate_grade_from_percentage(percentage))
+
+        existing = {
+            (r.student_id, r.subject): r
+            for r in Result.objects.filter(
+                student_id__in={k[0] for k in pending},
+                subject__in={k[1] for k in pending},
+                result_type=self.result_type,
+                academic_year=self.academic_year,
+                semester=self.semester,
+            )
+        }
+
+        folders = ensure_semester_folders(
+            [k[0] for k in pending if k not in existing or not existing[k].folder_id],
+            self.academic_year,
+            self.semester,
+            {
+                student.id: {
+                    'program_id': self.program.id,
+                    'department_id': student.department_id,
+                    'faculty_id': student.faculty_id,
+                }
+                for _, student, _, _, _ in pending.values()
+            },
+        )
+
+        to_create = []
+        to_update = []
+        previous_uploaders = []  # re-uploads move results away from their previous lecturer
+        for key, (row_num, student, score, total_score, grade) in pending.items():
+            result = existing.get(key)
+            if result is None:
+                result = Result(
+                    student_id=student.id,
+                    subject=key[1],
+                    result_type=self.result_type,
+                    academic_year=self.academic_year,
+                    semester=self.semester,
+                )
+                to_create.append(result)
+            else:
+                to_update.append(result)
+                previous_uploaders.append(result.uploaded_by_id)
+            result.program_id = self.program.id
+            result.department_id = student.department_id
+            result.faculty_id = student.faculty_id
+            result.score = score
+            result.total_score = total_score
+            result.grade = grade
+            result.uploaded_by = self.lecturer
+            result.updated_date = now
+            if not result.folder_id and student.id in folders:
+                result.folder_id = folders[student.id].id
+
+        if to_update:
+            Result.objects.bulk_update(to_update, [
+                'program', 'department', 'faculty', 'score', 'total_score',
+                'grade', 'uploaded_by', 'updated_date', 'folder',
+            ])
+        if to_create:
+            Result.objects.bulk_create(to_create)
+        invalidate_dashboard_counters(
+            lecturers=[self.lecturer.id] + previous_uploaders,
+            faculties=[student.faculty_id for _, student, _, _, _ in pending.values()],
+        )
+        bump_results_version(k[0] for k in pending)
+
+        saved = Result.objects.filter(
+            student_id__in={k[0] for k in pending},
+            subject__in={k[1] for k in pending},
+            result_type=self.result_type,
+            academic_year=self.academic_year,
+            semester=self.semester,
+        ).only('id', 'student_id', 'subject', 'department_id')
+        saved = [r for r in saved if (r.student_id, r.subject) in pending]
+
+        hods = active_hods_by_department(r.department_id for r in saved)
+        submit_workflows_to_hod(saved, hods)
+
+        self.created_count += len(to_create)
+        self.updated_count += len(to_update) + repeated
+
+
+def _assessment_score_and_total(adata):
+    try:
+        score = float(adata.get('score', 0))
+    except Exception:
+        score = 0
+    try:
+        total = float(adata.get('total', adata.get('total_score', 100)))
+    except Exception:
+        total = 100
+    return score, total
+
+
+def _ids_in(values):
+    """Integer primary keys among `values` (anything else cannot match a row)."""
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _lookup(mapping, value):
+    try:
+        return mapping.get(int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry_period(entry):
+    """(academic_year, semester) of an assessment entry, as stored in the CharFields.
+
+    JSON payloads may send them as numbers (`"semester": 1`); keys are
+    compared against the stored strings, so they are normalised first.
+    """
+    return str(entry.get('academic_year')).strip(), str(entry.get('semester')).strip()
+
+
+def _existing_assessment_keys(candidates):
+    """Subset of (student_id, module_id, type, year, semester) keys already stored."""
+    if not candidates:
+        return set()
+    rows = Assessment.objects.filter(
+        student_id__in={c[0] for c in candidates},
+        module_id__in={c[1] for c in candidates},
+        academic_year__in={c[3] for c in candidates},
+        semester__in={c[4] for c in candidates},
+    ).values_list('student_id', 'module_id', 'assessment_type', 'academic_year', 'semester')
+    return set(rows) & set(candidates)
+
+
+def sync_assessment_results(lecturer, keys, modules, students):
+    """Refresh the module Result behind each (student_id, module_id, year, semester) key.
+
+    Does in bulk what Assessment.save and the per-entry recalculation used to
+    do row by row: ensure the semester folder and the 'exam' Result exist,
+    recompute score/grade for every key from one grouped aggregate
+    (recalculate_results_from_assessments) and submit the results to the HOD
+    of the student's department. `modules` and `students` map ids to objects.
+    Returns the list of results.
+    """
+    keys = set(keys)
+    if not keys:
+        return []
+
+    # Folders, per academic period
+    folders = {}
+    by_period = {}
+    for student_id, module_id, academic_year, semester in keys:
+        by_period.setdefault((academic_year, semester), {})[student_id] = modules[module_id]
+    for (academic_year, semester), module_by_student in by_period.items():
+        period_folders = ensure_semester_folders(
+            module_by_student.keys(), academic_year, semester,
+            {
+                sid: {
+                    'program_id': m.program_id,
+                    'department_id': m.department_id,
+                    'faculty_id': m.faculty_id,
+                }
+                for sid, m in module_by_student.items()
+            },
+        )
+        for sid, folder in period_folders.items():
+            folders[(sid, academic_year, semester)] = folder
+
+    def result_filter():
+        return Result.objects.filter(
+            student_id__in={k[0] for k in keys},
+            subject__in={modules[k[1]].name for k in keys},
+            result_type='exam',
+            academic_year__in={k[2] for k in keys},
+            semester__in={k[3] for k in keys},
+        )
+
+    existing = {(r.student_id, r.subject, r.academic_year, r.semester): r for r in result_filter()}
+
+    to_create = {}
+    to_update = []
+    previous_uploaders = []  # re-uploads move results away from their previous lecturer
+    now = timezone.now()
+    for key in keys:
+        student_id, module_id, academic_year, semester = key
+        module = modules[module_id]
+        rkey = (student_id, module.name, academic_year, semester)
+        result = existing.get(rkey)
+        if result is None:
+            if rkey in to_create:
+                continue
+            result = Result(
+                student_id=student_id,
+                subject=module.name,
+                result_type='exam',
+                academic_year=academic_year,
+                semester=semester,
+                score=0,
+                total_score=100,
+                grade='F',
+            )
+            to_create[rkey] = result
+        else:
+            to_update.append(result)
+            previous_uploaders.append(result.uploaded_by_id)
+        result.program_id = module.program_id
+        result.department_id = module.department_id
+        result.faculty_id = module.faculty_id
+        result.uploaded_by = lecturer
+        result.updated_date = now
+        folder = folders.get((student_id, academic_year, semester))
+        if folder:
+            result.folder_id = folder.id
+
+    if to_update:
+        Result.objects.bulk_update(
+            to_update, ['program', 'department', 'faculty', 'uploaded_by', 'updated_date', 'folder'], batch_size=500
+        )
+    if to_create:
+        Result.objects.bulk_create(to_create.values(), batch_size=500)
+        existing = {(r.student_id, r.subject, r.academic_year, r.semester): r for r in result_filter()}
+    invalidate_dashboard_counters(
+        lecturers=[lecturer.id] + previous_uploaders, faculties=[modules[k[1]].faculty_id for k in keys],
+    )
+    bump_results_version(k[0] for k in keys)
+
+    results_by_key = {}
+    for key in keys:
+        student_id, module_id, academic_year, semester = key
+        result = existing.get((student_id, modules[module_id].name, academic_year, semester))
+        if result:
+            results_by_key[key] = result
+    recalculate_results_from_assessments(results_by_key)
+
+    results = list({r.id: r for r in results_by_key.values()}.values())
+    hods = active_hods_by_department(students[r.student_id].department_id for r in results)
+    submit_workflows_to_hod(results, hods, department_of=lambda r: students[r.student_id].department_id)
+    return results
+
+
+def ingest_lecturer_assessment_entries(lecturer, entries, errors):
+    """Process entries of the lecturer upload form's `assessments_json` payload.
+
+    Students, modules and already stored assessments are resolved with IN
+    queries, new Assessment rows are bulk-created and the affected module
+    Results are recomputed and submitted in bulk by sync_assessment_results.
+    Error messages match the former row-by-row processing. Returns
+    (assessments created, number of entries with errors).
+    """
+    failed = set()
+
+    def fail(idx, message):
+        errors.append(message)
+        failed.add(idx)
+
+    students = {
+        s.id: s for s in Student.objects.filter(id__in=_ids_in(e.get('student_id') for e in entries))
+    }
+    modules = {
+        m.id: m for m in Module.objects.filter(id__in=_ids_in(e.get('module_id') for e in entries if e.get('module_id')))
+    }
+    modules_by_code = {
+        m.code: m
+        for m in Module.objects.filter(code__in={(e.get('module_code') or '').strip() for e in entries} - {''})
+    }
+
+    # Validate entries and resolve their module
+    valid = []
+    for idx, entry in enumerate(entries):
+        module_code = (entry.get('module_code') or '').strip()
+        assessments = entry.get('assessments', {})
+
+        # Validate that we have assessments with data
+        if not assessments or len(assessments) == 0:
+            fail(idx, f'No assessment scores provided for module {module_code}')
+            continue
+
+        # Accept either a module_code or a module_id; at least one must be present
+        module_id = entry.get('module_id')
+        if not module_code and not module_id:
+            fail(idx, 'Module code or module_id missing in entry')
+            continue
+
+        if not entry.get('academic_year') or not entry.get('semester'):
+            fail(idx, f'Academic year or semester missing for module {module_code}')
+            continue
+
+        student = _lookup(students, entry.get('student_id'))
+        if student is None:
+            fail(idx, f'Student ID {entry.get("student_id")} not found')
+            continue
+
+        # Resolve module: accept either module_id or module_code
+        module = None
+        if module_id:
+            module = _lookup(modules, module_id)
+            if module is None:
+                errors.append(f'Module id {module_id} not found; will try module code')
+
+        if not module and module_code:
+            module = modules_by_code.get(module_code)
+
+        if not module:
+            # Create module if we have a code or fallback to a generic name
+            created_code = module_code if module_code else f'MOD_{timezone.now().strftime("%Y%m%d%H%M%S")}'
+            module = Module.objects.create(
+                code=created_code,
+                name=module_code or created_code,
+                program=student.program,
+                department=student.department,
+                faculty=student.faculty,
+            )
+            modules_by_code[created_code] = module
+        modules[module.id] = module
+        valid.append((idx, entry, student, module))
+
+    # Create Assessment rows for each assessment type provided
+    candidates = {}
+    for idx, entry, student, module in valid:
+        for atype, adata in entry.get('assessments', {}).items():
+            akey = (student.id, module.id, atype, *_entry_period(entry))
+            if akey in candidates:
+                fail(idx, f'Assessment creation error for {student.student_id} / {atype}: duplicate entry in upload')
+                continue
+            candidates[akey] = (idx, student, adata)
+
+    already_stored = _existing_assessment_keys(candidates.keys())
+    to_create = []
+    for akey, (idx, student, adata) in candidates.items():
+        if akey in already_stored:
+            fail(idx, f'Assessment creation error for {student.student_id} / {akey[2]}: assessment already exists')
+            continue
+        score, total = _assessment_score_and_total(adata)
+        to_create.append(Assessment(
+            student_id=akey[0],
+            module_id=akey[1],
+            assessment_type=akey[2],
+            score=score,
+            total_score=total,
+            uploaded_by=lecturer,
+            academic_year=akey[3],
+            semester=akey[4],
+        ))
+
+    try:
+        with transaction.atomic():
+            Assessment.objects.bulk_create(to_create, batch_size=500)
+            # After creating assessments, recalculate every affected module Result at once
+            sync_assessment_results(
+                lecturer,
+                {(student.id, module.id, *_entry_period(entry)) for _, entry, student, module in valid},
+                modules,
+                students,
+            )
+    except Exception as e:
+        errors.append(f'Could not save assessments: {str(e)}')
+        return 0, len(entries)
+
+    return len(to_create), len(failed)
+
+
+def ingest_api_assessment_entries(lecturer, entries, errors, start=0):
+    """Process entries of a `ResultViewSet.bulk_upload` payload.
+
+    Same bulk pipeline as ingest_lecturer_assessment_entries, but entries must
+    reference existing students and modules by id, and an entry is rejected
+    as a whole when one of its assessments already exists. Errors are
+    prefixed with the entry index (offset by `start`). Returns
+    (assessments created, number of entries with errors).
+    """
+    failed = 0
+    students = {
+        s.id: s for s in Student.objects.filter(id__in=_ids_in(e.get('student_id') for e in entries))
+    }
+    modules = {
+        m.id: m for m in Module.objects.filter(id__in=_ids_in(e.get('module_id') for e in entries))
+    }
+
+    valid = []
+    candidates = {}
+    for offset, entry in enumerate(entries):
+        idx = start + offset
+        student_id = entry.get('student_id')
+        module_id = entry.get('module_id')
+        assessments = entry.get('assessments', {})
+
+        if not student_id or not module_id:
+            errors.append(f'Entry {idx}: missing student_id or module_id')
+            failed += 1
+            continue
+
+        if not entry.get('academic_year') or not entry.get('semester'):
+            errors.append(f'Entry {idx}: missing academic_year or semester')
+            failed += 1
+            continue
+
+        student = _lookup(students, student_id)
+        if student is None:
+            errors.append(f'Entry {idx}: Student {student_id} not found')
+            failed += 1
+            continue
+        module = _lookup(modules, module_id)
+        if module is None:
+            errors.append(f'Entry {idx}: Module {module_id} not found')
+            failed += 1
+            continue
+        if not isinstance(assessments, dict):
+            errors.append(f'Entry {idx}: assessments must be an object keyed by assessment type')
+            failed += 1
+            continue
+
+        entry_keys = {
+            (student.id, module.id, atype, *_entry_period(entry)): adata
+            for atype, adata in assessments.items()
+        }
+        clash = next((k for k in entry_keys if k in candidates), None)
+        if clash:
+            errors.append(f'Entry {idx}: duplicate {clash[2]} assessment for student {student_id} / module {module_id}')
+            failed += 1
+            continue
+        candidates.update(entry_keys)
+        valid.append((idx, entry, student, module, entry_keys))
+
+    already_stored = _existing_assessment_keys(candidates.keys())
+    to_create = []
+    keys = set()
+    for idx, entry, student, module, entry_keys in valid:
+        clash = next((k for k in entry_keys if k in already_stored), None)
+        if clash:
+            errors.append(f'Entry {idx}: {clash[2]} assessment already exists for student {student.id} / module {module.id}')
+            failed += 1
+            continue
+        for akey, adata in entry_keys.items():
+            score, total = _assessment_score_and_total(adata)
+            to_create.append(Assessment(
+                student_id=akey[0],
+                module_id=akey[1],
+                assessment_type=akey[2],
+                score=score,
+                total_score=total,
+                uploaded_by=lecturer,
+                academic_year=akey[3],
+                semester=akey[4],
+            ))
+        keys.add((student.id, module.id, *_entry_period(entry)))
+
+    try:
+        with transaction.atomic():
+            Assessment.objects.bulk_create(to_create, batch_size=500)
+            sync_assessment_results(lecturer, keys, modules, students)
+    except Exception as e:
+        errors.append(f'Entries {start}-{start + len(entries) - 1}: {str(e)}')
+        return 0, len(entries)
+
+    return len(to_create), failed
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Lecturer(models.Model):
     DEPARTMENT_CHOICES = [
@@ -34,3 +35,71 @@ class Lecturer(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.lecturer_id})"
 
+
+
+class UploadJob(models.Model):
+    """A result upload processed in the background, with progress counters for polling."""
+    KIND_CHOICES = [
+        ('csv', 'CSV Results'),
+        ('assessments_json', 'Assessment Form (JSON)'),
+        ('api_bulk', 'API Bulk Assessments'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    lecturer = models.ForeignKey(Lecturer, on_delete=models.CASCADE, related_name='upload_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    upload = models.FileField(upload_to='upload_jobs/')
+    params = models.JSONField(default=dict, blank=True)  # program_id, result_type, academic_year, semester
+
+    rows_processed = models.IntegerField(default=0)
+    rows_failed = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # first few error messages only
+    error_count = models.IntegerField(default=0)
+    message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Upload job #{self.pk} ({self.get_kind_display()}) - {self.get_status_display()}"
+
+    @property
+    def throughput(self):
+        """Rows processed per second since the job started."""
+        if not self.started_at:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return float(self.rows_processed)
+        return round(self.rows_processed / elapsed, 2)
+
+    def progress(self):
+        """Snapshot used by the progress endpoints."""
+        return {
+            'job_id': self.pk,
+            'kind': self.kind,
+            'status': self.status,
+            'rows_processed': self.rows_processed,
+            'rows_failed': self.rows_failed,
+            'created': self.created_count,
+            'updated': self.updated_count,
+            'throughput': self.throughput,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'message': self.message,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,149 @@
+"""
+Background processing of result uploads.
+
+Upload views create an UploadJob holding the uploaded file and hand it to
+`enqueue_upload_job`. With a Celery broker configured the job runs on a worker
+process; otherwise it runs inline once the surrounding transaction commits.
+Progress counters are written back to the job after every chunk so the
+progress endpoints can report rows processed, rows failed and throughput.
+"""
+
+import csv
+import json
+import logging
+from io import TextIOWrapper
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+try:
+    from celery import shared_task
+    HAS_CELERY = True
+except ImportError:  # pragma: no cover - celery not installed
+    HAS_CELERY = False
+
+from student.models import Program
+from .models import UploadJob
+from .ingestion import (
+    ResultCSVIngestor, CompactErrorLog, REQUIRED_CSV_HEADERS,
+    ingest_lecturer_assessment_entries, ingest_api_assessment_entries,
+)
+
+logger = logging.getLogger(__name__)
+
+# JSON uploads are ingested (and report progress) N entries at a time
+JSON_PROGRESS_EVERY = 100
+
+
+def background_uploads_enabled():
+    """True when upload views should enqueue jobs instead of processing inline."""
+    return getattr(settings, 'RESULT_UPLOADS_IN_BACKGROUND', False)
+
+
+def _save_progress(job, errors, final=False):
+    job.error_count = len(errors)
+    fields = ['rows_processed', 'rows_failed', 'created_count', 'updated_count', 'error_count']
+    if final:
+        job.errors = list(errors)
+        job.status = 'completed'
+        job.finished_at = timezone.now()
+        fields += ['errors', 'status', 'finished_at']
+    job.save(update_fields=fields)
+
+
+def _run_csv_job(job):
+    params = job.params
+    program = Program.objects.get(id=params['program_id'])
+    errors = CompactErrorLog()
+    ingestor = ResultCSVIngestor(
+        job.lecturer, program, params['result_type'], params['academic_year'], params['semester'],
+        errors=errors,
+    )
+
+    def report(ing):
+        job.rows_processed = ing.rows_processed
+        job.rows_failed = len(ing.errors)
+        job.created_count = ing.created_count
+        job.updated_count = ing.updated_count
+        _save_progress(job, errors)
+
+    with job.upload.open('rb') as fh:
+        reader = csv.DictReader(TextIOWrapper(fh, encoding='utf-8', newline=''))
+        if not reader.fieldnames:
+            raise ValueError('CSV file is empty.')
+        missing_headers = REQUIRED_CSV_HEADERS - set(reader.fieldnames)
+        if missing_headers:
+            raise ValueError(f'Missing required columns: {", ".join(missing_headers)}. Required: Student_ID, Module_Code, Score')
+        ingestor.ingest_stream(reader, on_chunk=report)
+
+    report(ingestor)
+    _save_progress(job, errors, final=True)
+
+
+def _run_json_job(job):
+    with job.upload.open('rb') as fh:
+        payload = json.load(fh)
+    if not isinstance(payload, list):
+        raise ValueError('Payload must be a list of entries')
+
+    errors = CompactErrorLog()
+    for start in range(0, len(payload), JSON_PROGRESS_EVERY):
+        chunk = payload[start:start + JSON_PROGRESS_EVERY]
+        if job.kind == 'api_bulk':
+            created, failed = ingest_api_assessment_entries(job.lecturer, chunk, errors, start=start)
+        else:
+            created, failed = ingest_lecturer_assessment_entries(job.lecturer, chunk, errors)
+        job.created_count += created
+        job.rows_failed += failed
+        job.rows_processed += len(chunk)
+        _save_progress(job, errors)
+
+    _save_progress(job, errors, final=True)
+
+
+def run_upload_job(job_id):
+    """Process an UploadJob to completion, recording progress and failures on the job."""
+    job = UploadJob.objects.select_related('lecturer').get(id=job_id)
+    if job.status not in ('pending', 'failed'):
+        return job.status
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.rows_processed = job.rows_failed = job.created_count = job.updated_count = 0
+    job.save(update_fields=['status', 'started_at', 'rows_processed', 'rows_failed', 'created_count', 'updated_count'])
+
+    try:
+        if job.kind == 'csv':
+            _run_csv_job(job)
+        else:
+            _run_json_job(job)
+    except Exception as e:
+        logger.exception('Upload job %s failed', job.pk)
+        job.status = 'failed'
+        job.message = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'message', 'finished_at'])
+    return job.status
+
+
+if HAS_CELERY:
+    process_upload_job = shared_task(name='lecturer.process_upload_job')(run_upload_job)
+else:
+    process_upload_job = None
+
+
+def enqueue_upload_job(job):
+    """Dispatch the job to a worker after the current transaction commits.
+
+    Falls back to running it inline when Celery is unavailable or no broker
+    is configured.
+    """
+    def dispatch():
+        if process_upload_job is not None and getattr(settings, 'CELERY_BROKER_URL', ''):
+            process_upload_job.delay(job.pk)
+        else:
+            run_upload_job(job.pk)
+
+    transaction.on_commit(dispatch)
+    return job
@@ -1,3 +1,380 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.messages import get_messages
+
+from student.models import Student, Faculty, Department, Program, Module, Result, StudentSemesterFolder, Assessment
+from rest_framework.test import APIClient
+from Etu_student_result.query_budget import QueryBudgetTestMixin
+from lecturer.models import Lecturer, UploadJob
+from admin_hierarchy.models import HeadOfDepartment, ResultApprovalWorkflow
+
+
+class LecturerTestDataMixin:
+    """Common faculty/department/program/student/lecturer/HOD fixtures."""
+
+    def setUp(self):
+        self.faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        self.department = Department.objects.create(name='Computer Science', code='CS', faculty=self.faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=self.department)
+        self.other_program = Program.objects.create(name='B.Sc Software Eng', code='BSSE', department=self.department)
+
+        self.module = Module.objects.create(
+            name='Data Structures', code='CS101', program=self.program,
+            department=self.department, faculty=self.faculty,
+        )
+
+        self.students = []
+        for i in range(1, 4):
+            user = User.objects.create_user(username=f's{i}@example.com', email=f's{i}@example.com', password='pass123')
+            self.students.append(Student.objects.create(
+                user=user, student_id=f'S00{i}', email=f's{i}@example.com',
+                faculty=self.faculty, department=self.department, program=self.program, is_active=True,
+            ))
+        user = User.objects.create_user(username='other@example.com', email='other@example.com', password='pass123')
+        self.other_student = Student.objects.create(
+            user=user, student_id='X001', email='other@example.com',
+            faculty=self.faculty, department=self.department, program=self.other_program, is_active=True,
+        )
+
+        hod_user = User.objects.create_user(username='hod@example.com', email='hod@example.com', password='hodpass')
+        self.hod = HeadOfDepartment.objects.create(
+            user=hod_user, hod_id='H001', department=self.department, email='hod@example.com', is_active=True,
+        )
+
+        lecturer_user = User.objects.create_user(username='lecturer@example.com', email='lecturer@example.com', password='lecpass')
+        self.lecturer = Lecturer.objects.create(
+            user=lecturer_user, lecturer_id='L001', email='lecturer@example.com',
+            faculty=self.faculty, department=self.department, is_active=True, is_verified=True,
+        )
+
+        self.client = Client(SERVER_NAME='127.0.0.1')
+        self.client.force_login(lecturer_user)
+
+
+class UploadResultsCSVTest(LecturerTestDataMixin, TestCase):
+    """CSV uploads are ingested set-based with the same per-row error messages."""
+
+    def _post_csv(self, content):
+        csv_file = SimpleUploadedFile('results.csv', content.encode('utf-8'), content_type='text/csv')
+        return self.client.post('/lecturer/upload-results-csv/', {
+            'csv_file': csv_file,
+            'program': self.program.id,
+            'result_type': 'exam',
+            'academic_year': '2024/2025',
+            'semester': '1',
+        })
+
+    def test_creates_results_folders_and_workflows(self):
+        content = (
+            'Student_ID,Module_Code,Score,Total_Score\n'
+            'S001,CS101,85,100\n'
+            'S002,CS101,45,100\n'
+            'S003,NEW201,30,50\n'
+        )
+        response = self._post_csv(content)
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(Result.objects.count(), 3)
+        r1 = Result.objects.get(student=self.students[0], subject='Data Structures')
+        self.assertEqual(r1.grade, 'A')
+        self.assertEqual(r1.uploaded_by, self.lecturer)
+        self.assertIsNotNone(r1.folder)
+        self.assertEqual(Result.objects.get(student=self.students[1]).grade, 'F')
+        # Unknown module codes are created on the fly
+        self.assertTrue(Module.objects.filter(code='NEW201').exists())
+        self.assertEqual(Result.objects.get(student=self.students[2]).grade, 'C')
+
+        self.assertEqual(StudentSemesterFolder.objects.filter(academic_year='2024/2025', semester='1').count(), 3)
+        self.assertEqual(
+            ResultApprovalWorkflow.objects.filter(status='lecturer_submitted', current_hod=self.hod).count(), 3
+        )
+
+        msgs = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn('Successfully uploaded 3 new results. Waiting for HOD approval.', msgs)
+
+    def test_updates_existing_and_reports_row_errors(self):
+        self._post_csv('Student_ID,Module_Code,Score\nS001,CS101,40\n')
+        workflow = ResultApprovalWorkflow.objects.get()
+        workflow.status = 'hod_rejected'
+        workflow.save()
+
+        content = (
+            'Student_ID,Module_Code,Score\n'
+            'S001,CS101,75\n'
+            'S404,CS101,50\n'
+            'X001,CS101,50\n'
+            'S002,CS101,abc\n'
+            ',CS101,50\n'
+        )
+        response = self._post_csv(content)
+
+        result = Result.objects.get(student=self.students[0])
+        self.assertEqual(result.grade, 'B')
+        self.assertEqual(Result.objects.count(), 1)
+        workflow.refresh_from_db()
+        self.assertEqual(workflow.status, 'lecturer_submitted')
+
+        msgs = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn('Successfully uploaded 0 new results and updated 1 existing results. Waiting for HOD approval.', msgs)
+        warning = next(m for m in msgs if m.startswith('Encountered 4 errors'))
+        self.assertIn('Row 3: Student with ID S404 not found', warning)
+        self.assertIn('Row 4: Student X001 is not in program B.Sc Computer Science', warning)
+        self.assertIn('Row 5: Score "abc" is not a valid number', warning)
+        self.assertIn('Row 6: Student_ID is required', warning)
+
+    @override_settings(RESULT_CSV_CHUNK_ROWS=2, RESULT_CSV_MAX_LOGGED_ERRORS=3)
+    def test_streams_in_chunks_with_bounded_error_log(self):
+        rows = ['S001,CS101,70', 'S002,CS101,60', 'S003,CS101,50']
+        rows += [f'MISSING{i},CS101,50' for i in range(20)]
+        response = self._post_csv('Student_ID,Module_Code,Score\n' + '\n'.join(rows) + '\n')
+
+        self.assertEqual(Result.objects.count(), 3)
+        msgs = [str(m) for m in get_messages(response.wsgi_request)]
+        warning = next(m for m in msgs if m.startswith('Encountered 20 errors'))
+        # Only the retained messages are listed; the rest are summarised
+        self.assertEqual(warning.count('not found'), 3)
+        self.assertIn('... and 10 more errors', warning)
+
+
+class CompactErrorLogTest(TestCase):
+    def test_keeps_first_messages_and_counts_all(self):
+        from lecturer.ingestion import CompactErrorLog
+        log = CompactErrorLog(limit=2)
+        for i in range(5):
+            log.append(f'error {i}')
+        self.assertEqual(len(log), 5)
+        self.assertEqual(list(log), ['error 0', 'error 1'])
+        self.assertEqual(log[:10], ['error 0', 'error 1'])
+
+
+@override_settings(RESULT_UPLOADS_IN_BACKGROUND=True, CELERY_BROKER_URL='', MEDIA_ROOT=tempfile.mkdtemp())
+class UploadJobTest(LecturerTestDataMixin, TestCase):
+    """With background uploads enabled the views enqueue an UploadJob and report progress."""
+
+    def test_csv_upload_is_queued_and_processed(self):
+        content = 'Student_ID,Module_Code,Score\nS001,CS101,85\nS404,CS101,50\n'
+        csv_file = SimpleUploadedFile('results.csv', content.encode('utf-8'), content_type='text/csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/lecturer/upload-results-csv/', {
+                'csv_file': csv_file,
+                'program': self.program.id,
+                'result_type': 'exam',
+                'academic_year': '2024/2025',
+                'semester': '1',
+            })
+        job = UploadJob.objects.get()
+        self.assertRedirects(response, f'/lecturer/upload-jobs/{job.id}/')
+
+        progress = self.client.get(f'/lecturer/upload-jobs/{job.id}/progress/').json()
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['rows_processed'], 2)
+        self.assertEqual(progress['rows_failed'], 1)
+        self.assertEqual(progress['created'], 1)
+        self.assertIn('Row 3: Student with ID S404 not found', progress['errors'])
+        self.assertIn('throughput', progress)
+        self.assertEqual(Result.objects.filter(student=self.students[0]).count(), 1)
+
+    def test_api_bulk_upload_returns_job_id(self):
+        api = APIClient()
+        api.force_authenticate(self.lecturer.user)
+        payload = [{
+            'student_id': self.students[0].id,
+            'module_id': self.module.id,
+            'academic_year': '2024/2025',
+            'semester': '1',
+            'assessments': {'exam': {'score': 40, 'total': 50}},
+        }]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api.post('/api/results/bulk_upload/', payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+
+        progress = api.get(response.json()['progress_url']).json()
+        self.assertEqual(progress['job_id'], job_id)
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['created'], 1)
+        self.assertEqual(progress['rows_processed'], 1)
+        self.assertTrue(Result.objects.filter(student=self.students[0], subject='Data Structures').exists())
+
+    def test_progress_is_private_to_owner(self):
+        job = UploadJob.objects.create(lecturer=self.lecturer, kind='csv', upload='upload_jobs/x.csv')
+        other_user = User.objects.create_user(username='l2@example.com', email='l2@example.com', password='x')
+        Lecturer.objects.create(user=other_user, lecturer_id='L002', email='l2@example.com', is_active=True)
+        self.client.force_login(other_user)
+        response = self.client.get(f'/lecturer/upload-jobs/{job.id}/progress/')
+        self.assertEqual(response.status_code, 404)
+
+
+class StudentPerformanceViewTest(QueryBudgetTestMixin, LecturerTestDataMixin, TestCase):
+    """The performance page costs the same number of queries for any class size."""
+
+    def setUp(self):
+        super().setUp()
+        self.module2 = Module.objects.create(
+            name='Algorithms', code='CS102', program=self.program,
+            department=self.department, faculty=self.faculty,
+        )
+        for student in self.students:
+            self._add_marks(student)
+
+    def _add_marks(self, student):
+        for module, score in ((self.module, 72), (self.module2, 45)):
+            Result.objects.create(
+                student=student, program=self.program, subject=module.name, result_type='exam',
+                score=score, grade='B' if score >= 70 else 'F', academic_year='2024/2025', semester='1',
+            )
+            Assessment.objects.bulk_create([
+                Assessment(student=student, module=module, assessment_type='exam', score=score,
+                           academic_year='2024/2025', semester='1'),
+                Assessment(student=student, module=module, assessment_type='test', score=15, total_score=20,
+                           academic_year='2024/2025', semester='1'),
+            ])
+
+    def _get(self):
+        return self.client.get('/lecturer/student-performance/', {
+            'program': self.program.id, 'academic_year': '2024/2025', 'semester': '1',
+        })
+
+    def test_groups_results_and_assessments_per_course(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        students_data = response.context['students_data']
+        self.assertEqual(len(students_data), 3)
+        courses = {c['subject']: c for c in students_data[0]['courses']}
+        self.assertEqual(courses['Data Structures']['exam_score']['score'], 72.0)
+        self.assertEqual(courses['Algorithms']['ca_components'][0]['percentage'], 75.0)
+        self.assertEqual(response.context['summary']['grade_distribution']['F'], 3)
+
+    def test_query_count_does_not_grow_with_students(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as small:
+            self._get()
+        for i in range(5):
+            user = User.objects.create_user(username=f'extra{i}@example.com', password='pass123')
+            self._add_marks(Student.objects.create(
+                user=user, student_id=f'E00{i}', email=f'extra{i}@example.com',
+                faculty=self.faculty, department=self.department, program=self.program,
+            ))
+        with CaptureQueriesContext(connection) as large:
+            response = self._get()
+        self.assertEqual(len(response.context['students_data']), 8)
+        self.assertEqual(len(small), len(large))
+
+    def test_within_query_budget(self):
+        self.assertWithinQueryBudget(self._get)
+
+
+class CourseManagementViewTest(QueryBudgetTestMixin, LecturerTestDataMixin, TestCase):
+    """Class lists for every module are built from a fixed number of queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.module2 = Module.objects.create(
+            name='Algorithms', code='CS102', program=self.program,
+            department=self.department, faculty=self.faculty,
+        )
+        self._result(self.students[0], self.module, 'B', '2024/2025')
+        self._result(self.students[1], self.module2, 'A', '2024/2025')
+        self._result(self.other_student, self.module, 'C', '2024/2025')
+        self._result(self.students[0], self.module, 'A', '2023/2024')
+        self._result(self.students[1], self.module, 'F', '2023/2024')
+
+    def _result(self, student, module, grade, academic_year):
+        Result.objects.create(
+            student=student, program=student.program, subject=module.name, result_type='exam',
+            score=70, grade=grade, academic_year=academic_year, semester='1',
+        )
+
+    def _get(self):
+        return self.client.get('/lecturer/course-management/', {
+            'program': self.program.id, 'academic_year': '2024/2025', 'semester': '1',
+        })
+
+    def test_class_lists_and_previous_year(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        courses = {c['code']: c for c in response.context['courses_info']}
+        self.assertEqual((courses['CS101']['submitted'], courses['CS101']['pending']), (1, 2))
+        rows = {row['student_id']: row for row in courses['CS101']['class_list']}
+        self.assertEqual((rows['S001']['grade'], rows['S002']['status']), ('B', 'Pending'))
+        self.assertNotIn('X001', rows)
+        self.assertEqual(courses['CS102']['submitted'], 1)
+        self.assertEqual(courses['CS101']['previous_year'], '2023/2024')
+        self.assertEqual(courses['CS101']['prev_year_results'], {'avg_score': 2, 'passed': 1})
+        self.assertEqual(courses['CS102']['prev_year_results'], {'avg_score': 0, 'passed': 0})
+
+    def test_query_count_does_not_grow_with_modules_or_students(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as small:
+            self._get()
+        for i in range(3):
+            module = Module.objects.create(
+                name=f'Elective {i}', code=f'EL{i}', program=self.program,
+                department=self.department, faculty=self.faculty,
+            )
+            user = User.objects.create_user(username=f'extra{i}@example.com', password='pass123')
+            student = Student.objects.create(
+                user=user, student_id=f'E00{i}', email=f'extra{i}@example.com',
+                faculty=self.faculty, department=self.department, program=self.program,
+            )
+            self._result(student, module, 'B', '2024/2025')
+        with CaptureQueriesContext(connection) as large:
+            response = self._get()
+        self.assertEqual(len(response.context['courses_info']), 5)
+        self.assertEqual(len(small), len(large))
+
+    def test_within_query_budget(self):
+        self.assertWithinQueryBudget(self._get)
+
+
+class StudentLookupTest(QueryBudgetTestMixin, LecturerTestDataMixin, TestCase):
+    """The upload page no longer embeds students; the lookup pages through them."""
+
+    def test_upload_page_does_not_embed_students(self):
+        response = self.client.get('/lecturer/upload-results/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['has_students'])
+        self.assertNotContains(response, 'S001')
+
+    def test_prefix_search_and_filters(self):
+        self.students[0].user.first_name, self.students[0].user.last_name = 'Ama', 'Mensah'
+        self.students[0].user.save()
+
+        data = self.client.get('/lecturer/students/lookup/', {'q': 'men'}).json()
+        self.assertEqual([r['label'] for r in data['results']], ['S001 — Ama Mensah'])
+
+        data = self.client.get('/lecturer/students/lookup/', {'q': 's00'}).json()
+        self.assertEqual([r['id'] for r in data['results']], [s.id for s in self.students])
+
+        # Names are only searched when no registration number matches
+        self.students[1].user.first_name = 'S00 Kofi'
+        self.students[1].user.save()
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get('/lecturer/students/lookup/', {'q': 's001'}).json()
+        self.assertEqual([r['id'] for r in data['results']], [self.students[0].id])
+        self.assertFalse(any('"first_name" LIKE' in q['sql'] for q in queries.captured_queries))
+        data = self.client.get('/lecturer/students/lookup/', {'q': 's00 k'}).json()
+        self.assertEqual([r['id'] for r in data['results']], [self.students[1].id])
+
+        data = self.client.get('/lecturer/students/lookup/', {'program': self.other_program.id}).json()
+        self.assertEqual([r['label'] for r in data['results']], ['X001'])
+
+    def test_pagination(self):
+        with mock.patch('lecturer.views.STUDENT_LOOKUP_PAGE_SIZE', 3):
+            first = self.client.get('/lecturer/students/lookup/').json()
+            second = self.client.get('/lecturer/students/lookup/', {'page': 2}).json()
+        self.assertEqual((len(first['results']), first['has_more']), (3, True))
+        self.assertEqual(([r['label'] for r in second['results']], second['has_more']), (['X001'], False))
+
+    def test_within_query_budget(self):
+        self.assertWithinQueryBudget(self.client.get, '/lecturer/students/lookup/', {'q': 's'})
@@ -8,6 +8,7 @@ urlpatterns = [
     path('dashboard/', views.lecturer_dashboard, name='lecturer_dashboard'),
     path('profile/edit/', views.lecturer_edit_profile, name='lecturer_edit_profile'),
     path('upload-results/', views.upload_results, name='upload_results'),
+    path('students/lookup/', views.student_lookup, name='lecturer_student_lookup'),
     path('uploads-by-program/', views.lecturer_uploads_by_program, name='lecturer_uploads_by_program'),
     path('uploads-by-program/<int:program_id>/', views.lecturer_program_results, name='lecturer_program_results'),
     path('results/', views.lecturer_results_list, name='lecturer_results_list'),
@@ -30,6 +31,8 @@ urlpatterns = [
     # CSV Bulk Upload
     path('upload-results-csv/', views.upload_results_csv, name='upload_results_csv'),
     path('download-csv-template/', views.download_csv_template, name='download_csv_template'),
+    path('upload-jobs/<int:job_id>/', views.upload_job_status, name='upload_job_status'),
+    path('upload-jobs/<int:job_id>/progress/', views.upload_job_progress, name='upload_job_progress'),
     
     # Student Performance and Course Management
     path('student-performance/', views.student_performance_view, name='student_performance_view'),
@@ -14,14 +14,19 @@ import json
 import csv
 from collections import defaultdict
 
-from .models import Lecturer
+from .models import Lecturer, UploadJob
 from .forms import LecturerProfileForm
-from student.models import Student, Result, Faculty, Department, Program, Module, Assessment
+from student.models import Student, Result, Faculty, Department, Program, Module, Assessment, PASSING_GRADES
 from student.models_enhanced import LecturerResultReport, ResultSubmissionDeadline
 from django.db.models import Q
 from admin_hierarchy.models import ResultApprovalWorkflow, HeadOfDepartment
+from Etu_student_result.dashboard_counters import lecturer_counters
+from Etu_student_result.query_budget import query_budget
 from student.models import StudentSemesterFolder
 from django.db.models import Count
+from .ingestion import ResultCSVIngestor, CompactErrorLog, REQUIRED_CSV_HEADERS, ingest_lecturer_assessment_entries
+from .tasks import background_uploads_enabled, enqueue_upload_job
+from django.core.files.base import ContentFile
 
 
 def lecturer_home(request):
@@ -157,19 +162,17 @@ def lecturer_dashboard(request):
     except:
         return redirect('lecturer_login')
     
-    # Get statistics
-    total_uploads = Result.objects.filter(uploaded_by=lecturer).count()
-    pending_uploads = Result.objects.filter(uploaded_by=lecturer, is_published=False).count()
-    published_uploads = Result.objects.filter(uploaded_by=lecturer, is_published=True).count()
+    # Get statistics (cached, invalidated on result writes)
+    counters = lecturer_counters(lecturer)
     
     # Recent uploads
     recent_uploads = Result.objects.filter(uploaded_by=lecturer).order_by('-uploaded_date')[:10]
     
     context = {
         'lecturer': lecturer,
-        'total_uploads': total_uploads,
-        'pending_uploads': pending_uploads,
-        'published_uploads': published_uploads,
+        'total_uploads': counters['total'],
+        'pending_uploads': counters['pending'],
+        'published_uploads': counters['published'],
         'recent_uploads': recent_uploads,
     }
     
@@ -239,125 +242,16 @@ def upload_results(request):
                 if not payload or len(payload) == 0:
                     messages.error(request, 'No assessment data provided. Please add at least one module with scores.')
                     return redirect('upload_results')
-                
-                for entry in payload:
-                    student_id = entry.get('student_id')
-                    module_code = entry.get('module_code', '').strip()
-                    academic_year = entry.get('academic_year')
-                    semester = entry.get('semester')
-                    assessments = entry.get('assessments', {})
-
-                    # Validate that we have assessments with data
-                    if not assessments or len(assessments) == 0:
-                        errors.append(f'No assessment scores provided for module {module_code}')
-                        continue
 
-                    # Accept either a module_code or a module_id; at least one must be present
-                    if not module_code and not entry.get('module_id'):
-                        errors.append('Module code or module_id missing in entry')
-                        continue
+                if background_uploads_enabled():
+                    job = UploadJob(lecturer=lecturer, kind='assessments_json')
+                    job.upload.save(f'assessments_{lecturer.pk}.json', ContentFile(assessments_json.encode('utf-8')), save=False)
+                    job.save()
+                    enqueue_upload_job(job)
+                    messages.info(request, f'Upload queued as job #{job.id}. You can follow its progress on this page.')
+                    return redirect('upload_job_status', job_id=job.id)
 
-                    try:
-                        student = Student.objects.get(id=student_id)
-                    except Student.DoesNotExist:
-                        errors.append(f'Student ID {student_id} not found')
-                        print(f'[DEBUG] student id {student_id} not found')
-                        continue
-
-                    # Resolve module: accept either module_id or module_code
-                    module = None
-                    module_id = entry.get('module_id')
-                    if module_id:
-                        try:
-                            module = Module.objects.get(id=module_id)
-                        except Module.DoesNotExist:
-                            errors.append(f'Module id {module_id} not found; will try module code')
-
-                    if not module:
-                        # Try module_code next
-                        try:
-                            if module_code:
-                                module = Module.objects.filter(code=module_code).first()
-                        except Exception:
-                            module = None
-
-                    if not module:
-                        # Create module if we have a code or fallback to a generic name
-                        created_code = module_code if module_code else f'MOD_{datetime.now().strftime("%Y%m%d%H%M%S")}'
-                        module = Module.objects.create(
-                            code=created_code,
-                            name=module_code or created_code,
-                            program=student.program,
-                            department=student.department,
-                            faculty=student.faculty,
-                        )
-                    # resolved module
-
-                    # Create Assessment rows for each assessment type provided
-                    for atype, adata in assessments.items():
-                        try:
-                            score = float(adata.get('score', 0))
-                        except Exception:
-                            score = 0
-                        try:
-                            total = float(adata.get('total', adata.get('total_score', 100)))
-                        except Exception:
-                            total = 100
-
-                        try:
-                            Assessment.objects.create(
-                                student=student,
-                                module=module,
-                                assessment_type=atype,
-                                score=score,
-                                total_score=total,
-                                uploaded_by=lecturer,
-                                academic_year=academic_year,
-                                semester=semester,
-                            )
-                            created_count += 1
-                        except Exception as e:
-                            errors.append(f'Assessment creation error for {student.student_id} / {atype}: {str(e)}')
-
-                    # After creating assessments for this student+module, recalculate module Result
-                    try:
-                        result, created = Result.objects.get_or_create(
-                            student=student,
-                            subject=module.name,
-                            result_type='exam',
-                            academic_year=academic_year,
-                            semester=semester,
-                            defaults={
-                                'program': student.program,
-                                'department': student.department,
-                                'faculty': student.faculty,
-                                'score': 0,
-                                'total_score': 100,
-                                'grade': 'F',
-                                'uploaded_by': lecturer,
-                            }
-                        )
-                        
-                        try:
-                            result.recalculate_from_assessments()
-                        except Exception as e:
-                            errors.append(f'Grade recalculation error for {student.student_id}: {str(e)}')
-                    except Exception as e:
-                        errors.append(f'Could not create/update result for {student.student_id} / {module_code}: {str(e)}')
-
-                    # Ensure a workflow exists and is set to lecturer_submitted -> HOD
-                    try:
-                        hod = HeadOfDepartment.objects.filter(department=student.department, is_active=True).first()
-                        if hod and result:
-                            ResultApprovalWorkflow.objects.update_or_create(
-                                result=result,
-                                defaults={
-                                    'status': 'lecturer_submitted',
-                                    'current_hod': hod,
-                                }
-                            )
-                    except Exception as e:
-                        errors.append(f'Workflow error: {e}')
+                created_count, _ = ingest_lecturer_assessment_entries(lecturer, payload, errors)
 
                 if created_count == 0 and len(errors) > 0:
                     messages.error(request, f'Failed to upload results. Errors: ' + '; '.join(errors[:5]))
@@ -471,54 +365,24 @@ def upload_results(request):
         except Exception as e:
             messages.error(request, f'Upload failed: {str(e)}')
     
-    # Get programs, modules and students. Show ALL departments/programs for upload page
+    # Show ALL departments/programs for upload page. Students are not embedded:
+    # the student pickers fetch them page by page from lecturer_student_lookup.
     programs = Program.objects.all()
-    modules = Module.objects.all()
 
     faculties = Faculty.objects.all()
     departments = Department.objects.all()
-    
-    # Build students queryset.
-    # Previously we limited students to the lecturer's faculty/department/program.
-    # Per request, list all active students in the system so lecturers can select
-    # any student that the DEAN has added.
-    students_qs = Student.objects.filter(is_active=True).select_related('user', 'faculty', 'department', 'program')
-
-    # Convert students to JSON for JavaScript
-    students_list = []
-    for s in students_qs:
-        students_list.append({
-            'id': s.id,
-            'label': f"{s.student_id} — {s.user.get_full_name()}"
-        })
-    students_json = json.dumps(students_list)
-
-    # modules JSON for frontend
-    modules_list = []
-    for m in modules:
-        modules_list.append({'id': m.id, 'code': m.code or '', 'name': m.name})
-    modules_json = json.dumps(modules_list)
 
     # departments and programs JSON for frontend filtering
-    departments_list = []
-    for d in departments:
-        departments_list.append({'id': d.id, 'name': d.name, 'faculty_id': d.faculty.id if d.faculty else None})
-    departments_json = json.dumps(departments_list)
-
-    programs_list = []
-    for p in programs:
-        programs_list.append({'id': p.id, 'name': p.name, 'department_id': p.department.id if p.department else None})
-    programs_json = json.dumps(programs_list)
+    departments_json = json.dumps(list(departments.values('id', 'name', 'faculty_id')))
+    programs_json = json.dumps(list(programs.values('id', 'name', 'department_id')))
 
     context = {
         'programs': programs,
         'result_types': [('exam', 'Exam'), ('test', 'Test'), ('assignment', 'Assignment'),
                          ('presentation', 'Presentation'), ('attendance', 'Attendance')],
         'current_year': datetime.now().year,
-        'students': students_qs,
-        'students_json': students_json,
-        'modules': modules,
-        'modules_json': modules_json,
+        'has_students': Student.objects.filter(is_active=True).exists(),
+        'modules': Module.objects.all(),
         'departments_json': departments_json,
         'programs_json': programs_json,
         'faculties': faculties,
@@ -1065,9 +929,26 @@ def upload_results_csv(request):
             messages.error(request, 'Invalid program selected.')
             return redirect('upload_results_csv')
         
+        if background_uploads_enabled():
+            job = UploadJob.objects.create(
+                lecturer=lecturer,
+                kind='csv',
+                upload=csv_file,
+                params={
+                    'program_id': program.id,
+                    'result_type': result_type,
+                    'academic_year': academic_year,
+                    'semester': semester,
+                },
+            )
+            enqueue_upload_job(job)
+            messages.info(request, f'Upload queued as job #{job.id}. You can follow its progress on this page.')
+            return redirect('upload_job_status', job_id=job.id)
+        
         # Parse CSV
         try:
-            csv_text = TextIOWrapper(csv_file.file, encoding='utf-8')
+            # Read the upload as a stream (large sheets are spooled to a temp file)
+            csv_text = TextIOWrapper(csv_file.file, encoding='utf-8', newline='')
             reader = csv.DictReader(csv_text)
             
             if not reader.fieldnames:
@@ -1075,132 +956,17 @@ def upload_results_csv(request):
                 return redirect('upload_results_csv')
             
             # Validate headers
-            required_headers = {'Student_ID', 'Module_Code', 'Score'}
-            missing_headers = required_headers - set(reader.fieldnames or [])
+            missing_headers = REQUIRED_CSV_HEADERS - set(reader.fieldnames or [])
             if missing_headers:
                 messages.error(request, f'Missing required columns: {", ".join(missing_headers)}. Required: Student_ID, Module_Code, Score')
                 return redirect('upload_results_csv')
             
-            created_count = 0
-            updated_count = 0
-            errors = []
-            
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is header
-                try:
-                    student_id = row.get('Student_ID', '').strip()
-                    module_code = row.get('Module_Code', '').strip()
-                    score_str = row.get('Score', '').strip()
-                    total_score_str = row.get('Total_Score', '100').strip()
-                    
-                    # Validate fields
-                    if not student_id:
-                        errors.append(f'Row {row_num}: Student_ID is required')
-                        continue
-                    
-                    if not module_code:
-                        errors.append(f'Row {row_num}: Module_Code is required')
-                        continue
-                    
-                    if not score_str:
-                        errors.append(f'Row {row_num}: Score is required')
-                        continue
-                    
-                    # Convert to numbers
-                    try:
-                        score = float(score_str)
-                    except ValueError:
-                        errors.append(f'Row {row_num}: Score "{score_str}" is not a valid number')
-                        continue
-                    
-                    try:
-                        total_score = float(total_score_str) if total_score_str else 100
-                    except ValueError:
-                        errors.append(f'Row {row_num}: Total_Score "{total_score_str}" is not a valid number')
-                        continue
-                    
-                    # Find student by student_id (not Django user ID)
-                    try:
-                        student = Student.objects.get(student_id=student_id)
-                    except Student.DoesNotExist:
-                        errors.append(f'Row {row_num}: Student with ID {student_id} not found')
-                        continue
-                    
-                    # Verify student belongs to selected program
-                    if student.program.id != program.id:
-                        errors.append(f'Row {row_num}: Student {student_id} is not in program {program.name}')
-                        continue
-                    
-                    # Find or create module
-                    module = Module.objects.filter(code=module_code).first()
-                    if not module:
-                        # Create module if it doesn't exist
-                        module = Module.objects.create(
-                            code=module_code,
-                            name=module_code,
-                            program=program,
-                            department=student.department,
-                            faculty=student.faculty,
-                        )
-                    
-                    # Calculate grade
-                    percentage = (score / total_score) * 100 if total_score else 0
-                    if percentage >= 80:
-                        grade = 'A'
-                    elif percentage >= 70:
-                        grade = 'B'
-                    elif percentage >= 60:
-                        grade = 'C'
-                    elif percentage >= 50:
-                        grade = 'D'
-                    else:
-                        grade = 'F'
-                    
-                    # Create or update result
-                    try:
-                        result, created = Result.objects.update_or_create(
-                            student=student,
-                            subject=module.name,
-                            result_type=result_type,
-                            academic_year=academic_year,
-                            semester=semester,
-                            defaults={
-                                'program': program,
-                                'department': student.department,
-                                'faculty': student.faculty,
-                                'score': score,
-                                'total_score': total_score,
-                                'grade': grade,
-                                'uploaded_by': lecturer,
-                            }
-                        )
-                        
-                        if created:
-                            created_count += 1
-                        else:
-                            updated_count += 1
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: Failed to create/update result: {str(e)}')
-                        continue
-                    
-                    # Create workflow if needed
-                    try:
-                        hod = HeadOfDepartment.objects.filter(
-                            department=student.department,
-                            is_active=True
-                        ).first()
-                        if hod:
-                            ResultApprovalWorkflow.objects.update_or_create(
-                                result=result,
-                                defaults={
-                                    'status': 'lecturer_submitted',
-                                    'current_hod': hod,
-                                }
-                            )
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: Workflow error: {str(e)}')
-                
-                except Exception as e:
-                    errors.append(f'Row {row_num}: {str(e)}')
+            # Resolve and write the sheet set-based, one committed chunk of rows at a time
+            ingestor = ResultCSVIngestor(lecturer, program, result_type, academic_year, semester, errors=CompactErrorLog())
+            ingestor.ingest_stream(reader)  # Row numbers start at 2 because row 1 is header
+            created_count = ingestor.created_count
+            updated_count = ingestor.updated_count
+            errors = ingestor.errors
             
             # Show summary
             if created_count > 0 or updated_count > 0:
@@ -1235,6 +1001,76 @@ def upload_results_csv(request):
     return render(request, 'lecturer/upload_results_csv.html', context)
 
 
+@require_profile('lecturer_profile', login_url='lecturer_login')
+def upload_job_status(request, job_id):
+    """Status page for a background upload job; polls upload_job_progress."""
+    lecturer = request.user.lecturer_profile
+    job = get_object_or_404(UploadJob, id=job_id, lecturer=lecturer)
+    return render(request, 'lecturer/upload_job_status.html', {'lecturer': lecturer, 'job': job})
+
+
+@require_profile('lecturer_profile', login_url='lecturer_login')
+def upload_job_progress(request, job_id):
+    """JSON progress of a background upload job: rows processed/failed and throughput."""
+    job = get_object_or_404(UploadJob, id=job_id, lecturer=request.user.lecturer_profile)
+    return JsonResponse(job.progress())
+
+
+# Rows per page returned by lecturer_student_lookup
+STUDENT_LOOKUP_PAGE_SIZE = 20
+
+
+@query_budget(8)
+@require_profile('lecturer_profile', login_url='lecturer_login')
+def student_lookup(request):
+    """Typeahead search over active students for the upload page.
+
+    `q` matches the start of the registration number; only when no
+    registration number matches is it matched against the start of the
+    first/last name. The auth_user name columns are not indexed, so the name
+    search scans the active students and runs only on a registration-number
+    miss instead of on every keystroke. Faculty, department and program
+    narrow the search. Rows are ordered by the unique (indexed) student_id and
+    one extra row is read to tell whether another page exists, so no
+    COUNT(*) is run.
+    """
+    students = Student.objects.filter(is_active=True)
+    for field in ('faculty', 'department', 'program'):
+        value = request.GET.get(field)
+        if value and value.isdigit():
+            students = students.filter(**{f'{field}_id': value})
+
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    offset = (page - 1) * STUDENT_LOOKUP_PAGE_SIZE
+
+    def page_of(queryset):
+        return list(
+            queryset.order_by('student_id')
+            .values('id', 'student_id', 'user__first_name', 'user__last_name')[offset:offset + STUDENT_LOOKUP_PAGE_SIZE + 1]
+        )
+
+    q = (request.GET.get('q') or '').strip()
+    if q:
+        by_number = students.filter(student_id__istartswith=q)
+        rows = page_of(by_number)
+        if not rows and (page == 1 or not by_number.exists()):
+            rows = page_of(students.filter(Q(user__last_name__istartswith=q) | Q(user__first_name__istartswith=q)))
+    else:
+        rows = page_of(students)
+    results = []
+    for row in rows[:STUDENT_LOOKUP_PAGE_SIZE]:
+        name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        results.append({'id': row['id'], 'label': f"{row['student_id']} — {name}" if name else row['student_id']})
+    return JsonResponse({
+        'results': results,
+        'page': page,
+        'has_more': len(rows) > STUDENT_LOOKUP_PAGE_SIZE,
+    })
+
+
 @login_required(login_url='lecturer_login')
 def download_csv_template(request):
     """Download a CSV template for result upload"""
@@ -1263,6 +1099,7 @@ def download_csv_template(request):
 
 # ==================== STUDENT PERFORMANCE VIEW ====================
 
+@query_budget(13)
 @login_required(login_url='lecturer_login')
 def student_performance_view(request):
     """
@@ -1309,22 +1146,36 @@ def student_performance_view(request):
             context['selected_year'] = academic_year
             context['selected_semester'] = semester
             
-            # Get all students in the program
-            students = Student.objects.filter(program=program, is_active=True).select_related('user', 'program')
-            
-            if students.exists():
-                summary_data['total_students'] = students.count()
+            # Get all students in the program, then every result and assessment
+            # of the period in one query each, grouped in memory
+            students = list(Student.objects.filter(program=program, is_active=True).select_related('user'))
+
+            if students:
+                summary_data['total_students'] = len(students)
                 total_score_sum = 0
-                
+
+                results_by_student = defaultdict(list)
+                for result in Result.objects.filter(
+                    student__program=program,
+                    student__is_active=True,
+                    academic_year=academic_year,
+                    semester=semester,
+                ):
+                    results_by_student[result.student_id].append(result)
+
+                assessments_by_course = defaultdict(list)
+                for assessment in Assessment.objects.filter(
+                    student__program=program,
+                    student__is_active=True,
+                    academic_year=academic_year,
+                    semester=semester,
+                ).select_related('module').order_by('assessment_type'):
+                    assessments_by_course[(assessment.student_id, assessment.module.name)].append(assessment)
+
                 for student in students:
-                    # Get all results for this student in the selected period
-                    results = Result.objects.filter(
-                        student=student,
-                        academic_year=academic_year,
-                        semester=semester,
-                    ).select_related('uploaded_by')
-                    
-                    if results.exists():
+                    results = results_by_student.get(student.id)
+
+                    if results:
                         student_info = {
                             'id': student.id,
                             'student_id': student.student_id,
@@ -1338,18 +1189,10 @@ def student_performance_view(request):
                         
                         course_scores = []
                         for result in results:
-                            # Get assessments for this result
-                            assessments = Assessment.objects.filter(
-                                student=student,
-                                module__name=result.subject,
-                                academic_year=academic_year,
-                                semester=semester,
-                            ).order_by('assessment_type')
-                            
                             ca_data = []
                             exam_score = None
                             
-                            for assessment in assessments:
+                            for assessment in assessments_by_course.get((student.id, result.subject), []):
                                 if assessment.assessment_type == 'exam':
                                     exam_score = {
                                         'score': float(assessment.score),
@@ -1384,7 +1227,7 @@ def student_performance_view(request):
                             total_score_sum += student_info['avg_score']
                         
                         students_data.append(student_info)
-                
+
                 # Calculate summary statistics
                 if students_data:
                     summary_data['average_score'] = total_score_sum / len(students_data)
@@ -1407,6 +1250,93 @@ def student_performance_view(request):
     return render(request, 'lecturer/student_performance_view.html', context)
 
 
+def _previous_academic_year(academic_year):
+    parts = academic_year.split('/')
+    if len(parts) != 2:
+        return None
+    try:
+        return f'{int(parts[0]) - 1}/{int(parts[1]) - 1}'
+    except ValueError:
+        return None
+
+
+def build_class_lists(program, modules, academic_year, semester):
+    """Class list and previous-year comparison for every module of `program`.
+
+    Students and the period's results are fetched once and indexed by
+    (subject, student); the previous year's totals for all modules come from
+    one aggregate grouped by subject.
+    """
+    modules = list(modules)
+    subjects = [module.name for module in modules]
+    students = list(
+        Student.objects.filter(program=program, is_active=True).select_related('user', 'program', 'department')
+    )
+
+    # Results are newest first; keep the first one seen like `.first()` did
+    results = {}
+    for result in Result.objects.filter(
+        subject__in=subjects,
+        student__program=program,
+        student__is_active=True,
+        academic_year=academic_year,
+        semester=semester,
+    ):
+        results.setdefault((result.subject, result.student_id), result)
+
+    prev_year = _previous_academic_year(academic_year)
+    prev_year_stats = {}
+    if prev_year:
+        prev_year_stats = {
+            row['subject']: row
+            for row in Result.objects.filter(
+                subject__in=subjects, academic_year=prev_year, semester=semester,
+            ).order_by().values('subject').annotate(
+                avg_score=Count('id'),
+                passed=Count('id', filter=Q(grade__in=PASSING_GRADES)),
+            )
+        }
+
+    courses_info = []
+    for module in modules:
+        class_list = []
+        for student in students:
+            result = results.get((module.name, student.id))
+            class_list.append({
+                'student_id': student.student_id,
+                'name': student.user.get_full_name(),
+                'email': student.email,
+                'current_year': student.current_year,
+                'score': result.score if result else '-',
+                'grade': result.grade if result else '-',
+                'status': 'Submitted' if result else 'Pending',
+            })
+
+        submitted = sum(1 for c in class_list if c['status'] == 'Submitted')
+        prev_year_results = None
+        if prev_year:
+            stats = prev_year_stats.get(module.name, {})
+            prev_year_results = {'avg_score': stats.get('avg_score', 0), 'passed': stats.get('passed', 0)}
+
+        courses_info.append({
+            'id': module.id,
+            'code': module.code,
+            'name': module.name,
+            'credits': module.credits,
+            'program': program.name,
+            'department': module.department.name if module.department else '-',
+            'level': getattr(program, 'level', 'N/A'),
+            'class_list': class_list,
+            'total_students': len(class_list),
+            'submitted': submitted,
+            'pending': len(class_list) - submitted,
+            'previous_year': prev_year,
+            'prev_year_results': prev_year_results,
+        })
+    return courses_info
+
+
+@query_budget(14)
 @login_required(login_url='lecturer_login')
 def course_management(request):
     """
@@ -1446,70 +1376,7 @@ def course_management(request):
             
             # Get all modules/courses for this program
             modules = Module.objects.filter(program=program).select_related('program', 'department', 'faculty')
-            
-            for module in modules:
-                # Get all students taking this course
-                students_in_course = Student.objects.filter(
-                    program=program,
-                    is_active=True,
-                ).select_related('user', 'program', 'department')
-                
-                # Get results for this course
-                course_results = Result.objects.filter(
-                    subject=module.name,
-                    academic_year=academic_year,
-                    semester=semester,
-                ).select_related('student')
-                
-                # Build class list
-                class_list = []
-                for student in students_in_course:
-                    result = course_results.filter(student=student).first()
-                    class_list.append({
-                        'student_id': student.student_id,
-                        'name': student.user.get_full_name(),
-                        'email': student.email,
-                        'current_year': student.current_year,
-                        'score': result.score if result else '-',
-                        'grade': result.grade if result else '-',
-                        'status': 'Submitted' if result else 'Pending',
-                    })
-                
-                # Get previous year performance if available
-                prev_year_parts = academic_year.split('/')
-                if len(prev_year_parts) == 2:
-                    prev_year = f'{int(prev_year_parts[0]) - 1}/{int(prev_year_parts[1]) - 1}'
-                else:
-                    prev_year = None
-                
-                prev_year_results = None
-                if prev_year:
-                    prev_year_results = Result.objects.filter(
-                        subject=module.name,
-                        academic_year=prev_year,
-                        semester=semester,
-                    ).aggregate(
-                        avg_score=Count('id'),
-                        passed=Count('id', filter=Q(grade__in=['A', 'B', 'C', 'D'])),
-                    )
-                
-                course_info = {
-                    'id': module.id,
-                    'code': module.code,
-                    'name': module.name,
-                    'credits': module.credits,
-                    'program': program.name,
-                    'department': module.department.name if module.department else '-',
-                    'level': getattr(program, 'level', 'N/A'),
-                    'class_list': class_list,
-                    'total_students': len(class_list),
-                    'submitted': len([c for c in class_list if c['status'] == 'Submitted']),
-                    'pending': len([c for c in class_list if c['status'] == 'Pending']),
-                    'previous_year': prev_year,
-                    'prev_year_results': prev_year_results,
-                }
-                
-                courses_info.append(course_info)
+            courses_info = build_class_lists(program, modules, academic_year, semester)
         
         except Program.DoesNotExist:
             messages.error(request, 'Selected program not found.')
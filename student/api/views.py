@@ -4,11 +4,16 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from student.models import Student, Result, Module, Assessment
+from student.models import Student, Result
 from .serializers import StudentSerializer, ResultSerializer
 from rest_framework.authtoken.models import Token
 from admin_hierarchy.models import ResultApprovalWorkflow, HeadOfDepartment
 import json
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from lecturer.models import UploadJob
+from lecturer.ingestion import ingest_api_assessment_entries
+from lecturer.tasks import background_uploads_enabled, enqueue_upload_job
 
 class StudentViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Student.objects.filter(is_active=True).select_related('user', 'faculty', 'department', 'program')
@@ -71,94 +76,20 @@ class ResultViewSet(viewsets.ModelViewSet):
         if not lecturer:
             return Response({'error': 'User must be a lecturer'}, status=status.HTTP_403_FORBIDDEN)
 
-        created_count = 0
-        errors = []
+        if background_uploads_enabled():
+            job = UploadJob(lecturer=lecturer, kind='api_bulk')
+            job.upload.save(f'api_bulk_{lecturer.pk}.json', ContentFile(json.dumps(payload).encode('utf-8')), save=False)
+            job.save()
+            enqueue_upload_job(job)
+            return Response({
+                'job_id': job.id,
+                'status': job.status,
+                'total_entries': len(payload),
+                'progress_url': reverse('api-results-upload-job', kwargs={'job_id': job.id}),
+            }, status=status.HTTP_202_ACCEPTED)
 
-        for idx, entry in enumerate(payload):
-            try:
-                student_id = entry.get('student_id')
-                module_id = entry.get('module_id')
-                academic_year = entry.get('academic_year')
-                semester = entry.get('semester')
-                assessments = entry.get('assessments', {})
-
-                if not student_id or not module_id:
-                    errors.append(f'Entry {idx}: missing student_id or module_id')
-                    continue
-
-                student = Student.objects.get(id=student_id)
-                module = Module.objects.get(id=module_id)
-
-                # Create Assessment rows
-                for atype, adata in assessments.items():
-                    try:
-                        score = float(adata.get('score', 0))
-                    except Exception:
-                        score = 0
-                    try:
-                        total = float(adata.get('total', adata.get('total_score', 100)))
-                    except Exception:
-                        total = 100
-
-                    Assessment.objects.create(
-                        student=student,
-                        module=module,
-                        assessment_type=atype,
-                        score=score,
-                        total_score=total,
-                        uploaded_by=lecturer,
-                        academic_year=academic_year,
-                        semester=semester,
-                    )
-                    created_count += 1
-
-                # Recalculate or create module-level Result
-                result = Result.objects.filter(
-                    student=student,
-                    subject=module.name,
-                    academic_year=academic_year,
-                    semester=semester
-                ).first()
-
-                if not result:
-                    result = Result.objects.create(
-                        student=student,
-                        subject=module.name,
-                        program=module.program,
-                        department=module.department,
-                        faculty=module.faculty,
-                        result_type='module',
-                        academic_year=academic_year,
-                        semester=semester,
-                        score=0,
-                        total_score=100,
-                        grade='F',
-                        uploaded_by=lecturer,
-                    )
-
-                # Try to recalculate from assessments
-                try:
-                    result.recalculate_from_assessments()
-                except Exception as e:
-                    pass  # If recalculate fails, result remains as-is
-
-                # Create/update workflow
-                hod = HeadOfDepartment.objects.filter(
-                    department=student.department,
-                    is_active=True
-                ).first()
-                if hod:
-                    ResultApprovalWorkflow.objects.update_or_create(
-                        result=result,
-                        defaults={'status': 'lecturer_submitted', 'current_hod': hod}
-                    )
-
-            except Student.DoesNotExist:
-                errors.append(f'Entry {idx}: Student {student_id} not found')
-            except Module.DoesNotExist:
-                errors.append(f'Entry {idx}: Module {module_id} not found')
-            except Exception as e:
-                errors.append(f'Entry {idx}: {str(e)}')
+        errors = []
+        created_count, _ = ingest_api_assessment_entries(lecturer, payload, errors)
 
         return Response({
             'created_assessments': created_count,
@@ -166,6 +97,17 @@ class ResultViewSet(viewsets.ModelViewSet):
             'errors': errors
         }, status=status.HTTP_201_CREATED if not errors else status.HTTP_207_MULTI_STATUS)
 
+    @action(detail=False, methods=['get'], url_path=r'upload-jobs/(?P<job_id>[0-9]+)', url_name='upload-job')
+    def upload_job(self, request, job_id=None):
+        """Progress of a background bulk upload job owned by the requesting lecturer."""
+        lecturer = getattr(request.user, 'lecturer_profile', None)
+        if not lecturer:
+            return Response({'error': 'User must be a lecturer'}, status=status.HTTP_403_FORBIDDEN)
+        job = UploadJob.objects.filter(id=job_id, lecturer=lecturer).first()
+        if not job:
+            return Response({'error': 'Upload job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.progress())
+
 
 class TokenRotateView(APIView):
     """Rotate (recreate) token for the authenticated user and return the new token."""
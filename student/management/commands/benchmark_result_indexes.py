@@ -0,0 +1,164 @@
+import random
+import time
+from statistics import median
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from lecturer.models import Lecturer
+from student.models import Faculty, Department, Program, Student, Result
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic Result table inside a transaction, print the query plan and timing of the '
+        'hot Result filters, then roll everything back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1_000_000,
+            help='Number of Result rows to seed (default: 1000000)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert (default: 5000)',
+        )
+        parser.add_argument(
+            '--without-indexes',
+            action='store_true',
+            help='Drop the Result composite indexes first to show the "before" plans '
+                 '(needs a backend with transactional DDL, e.g. SQLite or PostgreSQL)',
+        )
+
+    def handle(self, *args, **options):
+        rows, batch_size = options['rows'], options['batch_size']
+        if rows < 1 or batch_size < 1:
+            raise CommandError('--rows and --batch-size must be at least 1')
+        if options['without_indexes'] and not connection.features.can_rollback_ddl:
+            raise CommandError(
+                f'{connection.vendor} cannot roll back DDL; compare against a database migrated '
+                'to student 0008 instead of using --without-indexes'
+            )
+
+        try:
+            with transaction.atomic():
+                if options['without_indexes']:
+                    self._drop_indexes()
+                started = time.perf_counter()
+                sample = self._seed(rows, batch_size)
+                self.stdout.write(f'Seeded {rows} results in {time.perf_counter() - started:.1f}s')
+                if connection.vendor == 'sqlite':
+                    connection.cursor().execute('ANALYZE')
+                for label, queryset in self._queries(sample):
+                    self._report(label, queryset)
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS('✓ Benchmark data rolled back.'))
+
+    def _drop_indexes(self):
+        editor = connection.schema_editor(collect_sql=True)
+        with connection.cursor() as cursor:
+            for index in Result._meta.indexes:
+                if index.condition is not None and not connection.features.supports_partial_indexes:
+                    continue
+                cursor.execute(str(index.remove_sql(Result, editor)))
+                self.stdout.write(f'Dropped {index.name}')
+
+    def _seed(self, rows, batch_size):
+        faculties = [Faculty.objects.create(name=f'Bench Faculty {i}', code=f'BF{i}') for i in range(4)]
+        departments = [
+            Department.objects.create(name=f'Bench Dept {i}', code=f'BD{i}', faculty=faculties[i % 4])
+            for i in range(16)
+        ]
+        programs = [
+            Program.objects.create(name=f'Bench Program {i}', code=f'BP{i}', department=departments[i % 16])
+            for i in range(48)
+        ]
+        lecturers = [
+            Lecturer.objects.create(
+                user=User.objects.create_user(username=f'bench-lecturer-{i}'),
+                lecturer_id=f'BL{i}', email=f'bench-lecturer-{i}@example.com',
+            )
+            for i in range(200)
+        ]
+
+        # ~20 results per student spread over four semesters
+        student_count = max(rows // 20, 1)
+        users = User.objects.bulk_create(
+            [User(username=f'bench-student-{i}') for i in range(student_count)], batch_size=batch_size,
+        )
+        if not users[0].pk:  # backends without RETURNING
+            users = list(User.objects.filter(username__startswith='bench-student-').order_by('pk'))
+        students = []
+        for i, user in enumerate(users):
+            program = programs[i % len(programs)]
+            students.append(Student(
+                user=user, student_id=f'BS{i}', email=f'bench-student-{i}@example.com',
+                program=program, department=program.department, faculty=program.department.faculty,
+            ))
+        Student.objects.bulk_create(students, batch_size=batch_size)
+        students = list(
+            Student.objects.filter(student_id__startswith='BS').select_related('program', 'department')
+            .order_by('pk')
+        )
+
+        rng = random.Random(0)
+        periods = [(year, semester) for year in ('2023/2024', '2024/2025') for semester in ('1', '2')]
+        batch = []
+        for n in range(rows):
+            student = students[n // 20 % len(students)]
+            year, semester = periods[n % 4]
+            published = rng.random() < 0.7
+            batch.append(Result(
+                student=student, program=student.program, department=student.department,
+                faculty_id=student.department.faculty_id, subject=f'Subject {n // 4 % 40}',
+                result_type='exam', score=rng.randint(0, 100), grade=rng.choice('ABCDF'),
+                academic_year=year, semester=semester, uploaded_by=lecturers[n % len(lecturers)],
+                is_published=published,
+            ))
+            if len(batch) >= batch_size:
+                Result.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        Result.objects.bulk_create(batch, batch_size=batch_size)
+        return students[0], lecturers[0]
+
+    def _queries(self, sample):
+        student, lecturer = sample
+        period = {'academic_year': '2024/2025', 'semester': '1'}
+        return [
+            ('program period, published',
+             Result.objects.filter(program=student.program, is_published=True, **period)),
+            ('department period, published',
+             Result.objects.filter(department=student.department, is_published=True, **period)),
+            ('faculty period, published',
+             Result.objects.filter(faculty_id=student.department.faculty_id, is_published=True, **period)),
+            ('program period, unpublished',
+             Result.objects.filter(program=student.program, is_published=False, **period)),
+            ('course statistics',
+             Result.objects.filter(subject='Subject 3', is_published=True, **period)),
+            ('lecturer recent uploads',
+             Result.objects.filter(uploaded_by=lecturer).order_by('-uploaded_date')[:10]),
+            ('lecturer published uploads',
+             Result.objects.filter(uploaded_by=lecturer, is_published=True)),
+            ('student transcript',
+             Result.objects.filter(student=student, is_published=True).order_by('-published_date')),
+        ]
+
+    def _report(self, label, queryset):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            count = len(list(queryset.values_list('pk', flat=True)))
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label}: {count} rows, median {median(timings) * 1000:.1f}ms'))
+        self.stdout.write(queryset.explain())
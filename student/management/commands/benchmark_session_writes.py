@@ -0,0 +1,117 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from Etu_student_result.sessions import REFRESHED_AT_KEY
+from student.models import Faculty, Department, Program, Student
+
+SLIDING_MIDDLEWARE = 'Etu_student_result.sessions.SlidingSessionMiddleware'
+RATE_LIMIT_MIDDLEWARE = 'Etu_student_result.security_middleware.RateLimitingMiddleware'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a logged-in student browsing session against the old (save every request) and new '
+        '(sliding refresh) session policies and print the session writes per request, then roll back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=120,
+            help='Requests replayed per policy (default: 120)',
+        )
+        parser.add_argument(
+            '--seconds-between',
+            type=float,
+            default=5.0,
+            help='Simulated think time between requests (default: 5)',
+        )
+        parser.add_argument(
+            '--engines',
+            default='db,cached_db,signed_cookies',
+            help='Comma-separated session stores to compare (default: db,cached_db,signed_cookies)',
+        )
+
+    def handle(self, *args, **options):
+        requests, gap = options['requests'], options['seconds_between']
+        if requests < 1 or gap < 0:
+            raise CommandError('--requests must be at least 1 and --seconds-between not negative')
+        engines = [engine.strip() for engine in options['engines'].split(',') if engine.strip()]
+        unknown = set(engines) - {'db', 'cached_db', 'signed_cookies'}
+        if unknown:
+            raise CommandError(f"Unknown session store(s): {', '.join(sorted(unknown))}")
+
+        # The replay is far faster than a real user, so the rate limiter is left out
+        base_middleware = [m for m in settings.MIDDLEWARE if m not in (SLIDING_MIDDLEWARE, RATE_LIMIT_MIDDLEWARE)]
+        session_index = base_middleware.index('django.contrib.sessions.middleware.SessionMiddleware') + 1
+        policies = {
+            'before': {'SESSION_SAVE_EVERY_REQUEST': True, 'MIDDLEWARE': base_middleware},
+            'after': {
+                'SESSION_SAVE_EVERY_REQUEST': False,
+                'MIDDLEWARE': base_middleware[:session_index] + [SLIDING_MIDDLEWARE] + base_middleware[session_index:],
+            },
+        }
+
+        self.stdout.write(
+            f'{requests} requests, {gap:g}s apart, SESSION_REFRESH_INTERVAL={settings.SESSION_REFRESH_INTERVAL}s'
+        )
+        try:
+            with transaction.atomic():
+                user = self._student_user()
+                for engine in engines:
+                    for policy, overrides in policies.items():
+                        with override_settings(SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}', **overrides):
+                            db_writes, cookies = self._replay(user, requests, gap)
+                        self.stdout.write(
+                            f'{engine:>15} {policy:>6}: {db_writes / requests:.3f} session DB writes/request, '
+                            f'{cookies / requests:.3f} session cookies issued/request'
+                        )
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS('✓ Benchmark data rolled back.'))
+
+    def _student_user(self):
+        faculty = Faculty.objects.create(name='Bench Faculty', code='BSF')
+        department = Department.objects.create(name='Bench Dept', code='BSD', faculty=faculty)
+        program = Program.objects.create(name='Bench Program', code='BSP', department=department)
+        user = User.objects.create_user(username='bench-session-student')
+        Student.objects.create(
+            user=user, student_id='BSS1', email='bench-session@example.com',
+            faculty=faculty, department=department, program=program,
+        )
+        return user
+
+    def _replay(self, user, requests, gap):
+        """Log in, then count session writes over `requests` requests `gap` seconds apart."""
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(user)
+        logged_in_at = client.session.get(REFRESHED_AT_KEY, int(time.time()))
+        url = reverse('student_dashboard')
+        cookies = 0
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch('Etu_student_result.sessions.time') as clock:
+            for i in range(requests):
+                clock.time.return_value = logged_in_at + (i + 1) * gap
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{url} returned {response.status_code}')
+                cookies += settings.SESSION_COOKIE_NAME in response.cookies
+
+        db_writes = sum(
+            1 for query in queries.captured_queries
+            if 'django_session' in query['sql'] and query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+        )
+        return db_writes, cookies
@@ -1,5 +1,33 @@
-from django.core.management.base import BaseCommand
-from student.models import StudentSemesterFolder
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+
+from student.models import StudentSemesterFolder, recalculate_folder_aggregates
+
+
+def _init_worker():
+    """Process pool initializer: make sure Django is ready in spawned workers."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Etu_student_result.settings')
+    django.setup()
+
+
+def _recalculate_pk_range(bounds):
+    """Recalculate every folder with lo <= pk <= hi; runs in a pool worker."""
+    lo, hi = bounds
+    try:
+        return recalculate_folder_aggregates(StudentSemesterFolder.objects.filter(pk__gte=lo, pk__lte=hi))
+    finally:
+        connections.close_all()
+
+
+def pk_ranges(lo, hi, chunk_size):
+    """Split the inclusive primary-key range [lo, hi] into chunk_size wide ranges."""
+    return [(start, min(start + chunk_size - 1, hi)) for start in range(lo, hi + 1, chunk_size)]
 
 
 class Command(BaseCommand):
@@ -16,6 +44,18 @@ class Command(BaseCommand):
             type=int,
             help='Calculate GPA for a specific semester folder ID',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes for a full recompute (default: 1, no pool)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Width of the folder primary-key range each worker updates at once (default: 5000)',
+        )
 
     def handle(self, *args, **options):
         student_id = options.get('student_id')
@@ -23,7 +63,7 @@ class Command(BaseCommand):
 
         if folder_id:
             try:
-                folder = StudentSemesterFolder.objects.get(id=folder_id)
+                folder = StudentSemesterFolder.objects.select_related('student').get(id=folder_id)
                 folder.recalculate_all()
                 self.stdout.write(
                     self.style.SUCCESS(
@@ -39,33 +79,54 @@ class Command(BaseCommand):
         elif student_id:
             # Calculate for all semesters of a specific student
             folders = StudentSemesterFolder.objects.filter(student__student_id=student_id)
-            if not folders.exists():
+            if not recalculate_folder_aggregates(folders):
                 self.stdout.write(
                     self.style.ERROR(f'No folders found for student {student_id}')
                 )
                 return
-            
-            for folder in folders:
-                folder.recalculate_all()
+
+            for folder in folders.order_by('academic_year', 'semester'):
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f'✓ {folder.student.student_id} ({folder.academic_year} S{folder.semester}): '
+                        f'✓ {student_id} ({folder.academic_year} S{folder.semester}): '
                         f'Total Score: {folder.total_score}, GPA: {folder.gpa}'
                     )
                 )
         else:
-            # Calculate for all folders
-            folders = StudentSemesterFolder.objects.all()
-            total = folders.count()
-            for i, folder in enumerate(folders, 1):
-                folder.recalculate_all()
-                self.stdout.write(
-                    f'[{i}/{total}] {folder.student.student_id} ({folder.academic_year} S{folder.semester}): '
-                    f'Total Score: {folder.total_score}, GPA: {folder.gpa}'
-                )
-            
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'\n✓ Completed! Calculated GPA and total scores for {total} semester folders.'
+            self.recalculate_everything(options['workers'], options['chunk_size'])
+
+    def recalculate_everything(self, workers, chunk_size):
+        """Recompute all folders chunk by chunk, optionally across a process pool."""
+        if workers < 1 or chunk_size < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1')
+
+        bounds = StudentSemesterFolder.objects.aggregate(lo=Min('pk'), hi=Max('pk'))
+        if bounds['lo'] is None:
+            self.stdout.write(self.style.WARNING('No semester folders to calculate.'))
+            return
+        ranges = pk_ranges(bounds['lo'], bounds['hi'], chunk_size)
+
+        started = time.monotonic()
+        total = 0
+        if workers == 1:
+            for i, pk_range in enumerate(ranges, 1):
+                total += recalculate_folder_aggregates(
+                    StudentSemesterFolder.objects.filter(pk__gte=pk_range[0], pk__lte=pk_range[1])
                 )
+                self.stdout.write(f'[{i}/{len(ranges)}] folders {pk_range[0]}-{pk_range[1]}: {total} updated so far')
+        else:
+            # Workers open their own connections; don't hand them the parent's socket
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                for i, updated in enumerate(pool.map(_recalculate_pk_range, ranges), 1):
+                    total += updated
+                    self.stdout.write(f'[{i}/{len(ranges)}] {total} folders updated so far')
+        elapsed = time.monotonic() - started
+
+        rate = total / elapsed if elapsed else float(total)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✓ Completed! Calculated GPA and total scores for {total} semester folders '
+                f'in {elapsed:.1f}s ({rate:.0f} folders/s, {len(ranges)} chunks, {workers} worker(s)).'
             )
+        )
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from student.models_enhanced import CumulativeGPA, refresh_cumulative_gpa_standing
+
+
+class Command(BaseCommand):
+    help = 'Check the incrementally maintained cumulative GPA sums against the semester folders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite drifted rows from the semester folders',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of students checked per query (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                CumulativeGPA.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'student_id', 'gpa_sum', 'semester_count')[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1].pk
+            checked += len(rows)
+
+            totals = CumulativeGPA.semester_totals([row.student_id for row in rows])
+            stale = []
+            for row in rows:
+                gpa_sum, semester_count = totals.get(row.student_id, (0, 0))
+                if row.gpa_sum != gpa_sum or row.semester_count != semester_count:
+                    self.stdout.write(
+                        f'Drift for student #{row.student_id}: stored {row.gpa_sum}/{row.semester_count}, '
+                        f'folders {gpa_sum}/{semester_count}'
+                    )
+                    row.gpa_sum, row.semester_count = gpa_sum, semester_count
+                    stale.append(row)
+            drifted += len(stale)
+
+            if fix and stale:
+                CumulativeGPA.objects.bulk_update(stale, ['gpa_sum', 'semester_count'])
+                refresh_cumulative_gpa_standing([row.student_id for row in stale])
+
+        summary = f'Checked {checked} cumulative GPA records, {drifted} drifted'
+        if drifted and fix:
+            self.stdout.write(self.style.SUCCESS(f'✓ {summary}; all repaired.'))
+        elif drifted:
+            self.stdout.write(self.style.WARNING(f'{summary}. Run with --fix to repair them.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ {summary}.'))
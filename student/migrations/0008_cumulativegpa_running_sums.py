@@ -0,0 +1,44 @@
+# Generated by Django 4.2.13 on 2026-10-17 17:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def seed_running_sums(apps, schema_editor):
+    CumulativeGPA = apps.get_model('student', 'CumulativeGPA')
+    StudentSemesterFolder = apps.get_model('student', 'StudentSemesterFolder')
+    totals = {
+        row['student_id']: row
+        for row in StudentSemesterFolder.objects.filter(is_gpa_calculated=True)
+        .values('student_id')
+        .annotate(total=Sum('gpa'), count=Count('id'))
+        .order_by()
+    }
+    rows = list(CumulativeGPA.objects.all())
+    for row in rows:
+        total = totals.get(row.student_id)
+        if total:
+            row.gpa_sum = total['total'] or 0
+            row.semester_count = total['count']
+    CumulativeGPA.objects.bulk_update(rows, ['gpa_sum', 'semester_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0007_academiccalendar_academicprobation_apiintegration_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cumulativegpa',
+            name='gpa_sum',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='cumulativegpa',
+            name='semester_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(seed_running_sums, migrations.RunPython.noop),
+    ]
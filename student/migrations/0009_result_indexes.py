@@ -0,0 +1,37 @@
+# Generated by Django 4.2.13 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0008_cumulativegpa_running_sums'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['program', 'academic_year', 'semester', 'is_published'], name='result_prog_period_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['department', 'academic_year', 'semester', 'is_published'], name='result_dept_period_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['faculty', 'academic_year', 'semester', 'is_published'], name='result_fac_period_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['subject', 'academic_year', 'semester'], name='result_subject_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['uploaded_by', 'is_published', '-uploaded_date'], name='result_uploader_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['student', '-published_date'], name='result_student_published_idx'),
+        ),
+    ]
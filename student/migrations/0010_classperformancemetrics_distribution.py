@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0009_result_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classperformancemetrics',
+            name='median_score',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='classperformancemetrics',
+            name='lower_quartile',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='classperformancemetrics',
+            name='upper_quartile',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='classperformancemetrics',
+            name='score_histogram',
+            field=models.JSONField(blank=True, default=list, help_text='Result counts per 10-mark band, 0-10 to 90-100'),
+        ),
+    ]
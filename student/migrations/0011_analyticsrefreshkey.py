@@ -0,0 +1,28 @@
+# Generated by Django 4.2.13 on 2026-10-17 19:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0010_classperformancemetrics_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRefreshKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('program', 'Program grade distribution'), ('subject', 'Subject class metrics')], max_length=10)),
+                ('key', models.CharField(help_text='Program id or subject name', max_length=100)),
+                ('academic_year', models.CharField(max_length=20)),
+                ('semester', models.CharField(max_length=10)),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('kind', 'key', 'academic_year', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-17 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0011_analyticsrefreshkey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticsrefreshkey',
+            name='generation',
+            field=models.PositiveIntegerField(default=0, help_text='Incremented every time the key is marked'),
+        ),
+    ]
@@ -1,5 +1,15 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import (
+    Avg, Case, Count, Exists, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, Round
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .results_cache import bump_results_version
 
 class Faculty(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -77,6 +87,49 @@ class Student(models.Model):
         return f"{self.user.get_full_name()} ({self.student_id})"
 
 
+# Grade points on the standard 4.0 scale; blank or unknown grades count as F
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
+PASSING_GRADES = ('A', 'B', 'C', 'D')
+
+
+def grade_points_expression(field='grade'):
+    """SQL CASE mapping a letter grade column to its grade point."""
+    return Case(
+        *[When(**{field: grade}, then=Value(points)) for grade, points in GRADE_POINTS.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def grade_statistics(results):
+    """Grade counts, pass rate, mean score and mean grade points of `results`.
+
+    Everything comes from one aggregate() using filtered COUNTs, so callers
+    no longer run a query per grade. Averages are 0 when there are no rows.
+    """
+    totals = results.aggregate(
+        total=Count('id'),
+        passed=Count('id', filter=Q(grade__in=PASSING_GRADES)),
+        average_score=Avg('score'),
+        average_points=Avg(grade_points_expression()),
+        total_students=Count('student', distinct=True),
+        total_modules=Count('subject', distinct=True),
+        **{f'grade_{grade}': Count('id', filter=Q(grade=grade)) for grade in GRADE_POINTS},
+    )
+    total = totals['total']
+    return {
+        'total': total,
+        'grade_counts': {grade: totals[f'grade_{grade}'] for grade in GRADE_POINTS},
+        'passed': totals['passed'],
+        'failed': total - totals['passed'],
+        'pass_rate': (totals['passed'] / total * 100) if total else 0,
+        'average_score': totals['average_score'] or 0,
+        'gpa': totals['average_points'] or 0.0,
+        'total_students': totals['total_students'],
+        'total_modules': totals['total_modules'],
+    }
+
+
 class StudentSemesterFolder(models.Model):
     """Represents a container/folder for all a student's results for a specific
     academic year and semester. This allows grouping results for display and
@@ -102,18 +155,29 @@ class StudentSemesterFolder(models.Model):
     def __str__(self):
         return f"{self.student.student_id} - {self.academic_year} S{self.semester}"
 
-    def calculate_total_score(self):
+    def published_aggregates(self):
+        """Average score and average grade point of the published results, in one query.
+
+        Returns a dict with `count`, `avg_score` and `avg_points` (None when
+        there are no published results).
+        """
+        return self.results.filter(is_published=True).aggregate(
+            count=Count('id'),
+            avg_score=Avg('score'),
+            avg_points=Avg(grade_points_expression()),
+        )
+
+    def calculate_total_score(self, aggregates=None):
         """Calculate the total score for this semester folder (average of all results)."""
-        results = self.results.filter(is_published=True)
-        if not results.exists():
+        aggregates = aggregates or self.published_aggregates()
+        if not aggregates['count']:
             self.total_score = 0
             return 0
-        
-        avg_score = sum([float(r.score) for r in results]) / results.count()
-        self.total_score = round(avg_score, 2)
+
+        self.total_score = round(float(aggregates['avg_score']), 2)
         return self.total_score
 
-    def calculate_gpa(self, scale=4.0):
+    def calculate_gpa(self, scale=4.0, aggregates=None):
         """
         Calculate GPA from semester results using a standard 4.0 scale.
         Grade mappings:
@@ -123,41 +187,27 @@ class StudentSemesterFolder(models.Model):
         - D (50-59):  1.0
         - F (<50):    0.0
         """
-        results = self.results.filter(is_published=True)
-        if not results.exists():
+        aggregates = aggregates or self.published_aggregates()
+        if not aggregates['count']:
             self.gpa = 0
             return 0
-        
-        # Map grades to GPA points
-        grade_to_gpa = {
-            'A': 4.0,
-            'B': 3.0,
-            'C': 2.0,
-            'D': 1.0,
-            'F': 0.0,
-        }
-        
-        total_gpa = 0
-        count = 0
-        for result in results:
-            grade = result.grade or 'F'
-            gpa_point = grade_to_gpa.get(grade, 0.0)
-            total_gpa += gpa_point
-            count += 1
-        
-        if count > 0:
-            self.gpa = round(total_gpa / count, 2)
-        else:
-            self.gpa = 0
-        
+
+        self.gpa = round(float(aggregates['avg_points']), 2)
         self.is_gpa_calculated = True
         return self.gpa
 
     def recalculate_all(self):
-        """Recalculate both total score and GPA for this semester folder."""
-        self.calculate_total_score()
-        self.calculate_gpa()
+        """Recalculate both total score and GPA for this semester folder.
+
+        The change in this folder's GPA is passed on to the student's
+        CumulativeGPA as an O(1) delta.
+        """
+        before = (self.gpa, self.is_gpa_calculated)
+        aggregates = self.published_aggregates()
+        self.calculate_total_score(aggregates)
+        self.calculate_gpa(aggregates=aggregates)
         self.save()
+        apply_folder_gpa_changes([(self.student_id, before, (self.gpa, self.is_gpa_calculated))])
 
 
 
@@ -196,6 +246,22 @@ class Result(models.Model):
     class Meta:
         ordering = ['-uploaded_date']
         unique_together = ('student', 'subject', 'result_type', 'academic_year', 'semester')
+        # Shaped after the hot filters: program/department/faculty period
+        # reports (with or without is_published), per-course statistics,
+        # lecturer upload lists and the student's published transcript.
+        indexes = [
+            models.Index(fields=['program', 'academic_year', 'semester', 'is_published'], name='result_prog_period_pub_idx'),
+            models.Index(fields=['department', 'academic_year', 'semester', 'is_published'], name='result_dept_period_pub_idx'),
+            models.Index(fields=['faculty', 'academic_year', 'semester', 'is_published'], name='result_fac_period_pub_idx'),
+            models.Index(fields=['subject', 'academic_year', 'semester'], name='result_subject_period_idx'),
+            models.Index(fields=['uploaded_by', 'is_published', '-uploaded_date'], name='result_uploader_pub_idx'),
+            # Partial where supported (PostgreSQL/SQLite); MySQL skips it and
+            # keeps using the student FK index.
+            models.Index(
+                fields=['student', '-published_date'], name='result_student_published_idx',
+                condition=models.Q(is_published=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.subject} ({self.result_type})"
@@ -219,6 +285,127 @@ class Result(models.Model):
             pass
         super().save(*args, **kwargs)
 
+def _gpa_contribution(gpa, calculated):
+    """What a folder adds to the cumulative (gpa_sum, semester_count)."""
+    return (Decimal(str(gpa)), 1) if calculated else (Decimal('0'), 0)
+
+
+def apply_folder_gpa_changes(changes):
+    """Pass folder GPA changes on to CumulativeGPA.
+
+    `changes` holds (student_id, (old_gpa, old_calculated), (new_gpa, new_calculated))
+    tuples; the per-student differences are applied with F() updates.
+    """
+    from student.models_enhanced import apply_cumulative_gpa_deltas
+
+    deltas = defaultdict(lambda: (Decimal('0'), 0))
+    for student_id, before, after in changes:
+        old_gpa, old_count = _gpa_contribution(*before)
+        new_gpa, new_count = _gpa_contribution(*after)
+        gpa_delta, count_delta = deltas[student_id]
+        deltas[student_id] = (gpa_delta + new_gpa - old_gpa, count_delta + new_count - old_count)
+    return apply_cumulative_gpa_deltas(deltas)
+
+
+def recalculate_folder_aggregates(folders, update_cumulative=True):
+    """Set-based StudentSemesterFolder.recalculate_all for many folders.
+
+    `folders` may be a queryset, or an iterable of folders or folder ids.
+    total_score, gpa and is_gpa_calculated are recomputed for every folder in
+    a single UPDATE ... SET col = (SELECT aggregate ...) statement. With
+    `update_cumulative` the GPA changes are also applied to the students'
+    CumulativeGPA (one read before and one after the UPDATE, plus the batched
+    delta updates). Returns the number of folders updated.
+    """
+    if isinstance(folders, models.QuerySet):
+        target = folders
+    else:
+        ids = {getattr(f, 'pk', f) for f in folders}
+        if not ids:
+            return 0
+        target = StudentSemesterFolder.objects.filter(pk__in=ids)
+
+    published = Result.objects.filter(folder=OuterRef('pk'), is_published=True).order_by().values('folder')
+    avg_score = published.annotate(value=Avg('score')).values('value')
+    avg_points = published.annotate(value=Avg(grade_points_expression())).values('value')
+
+    values = dict(
+        total_score=Coalesce(Round(Subquery(avg_score, output_field=FloatField()), 2), Value(0.0)),
+        gpa=Coalesce(Round(Subquery(avg_points, output_field=FloatField()), 2), Value(0.0)),
+        is_gpa_calculated=Case(When(Exists(published), then=Value(True)), default=F('is_gpa_calculated')),
+        updated_at=timezone.now(),
+    )
+    if not update_cumulative:
+        return target.update(**values)
+
+    with transaction.atomic():
+        before = {
+            pk: (student_id, gpa, calculated)
+            for pk, student_id, gpa, calculated in target.select_for_update().values_list(
+                'pk', 'student_id', 'gpa', 'is_gpa_calculated'
+            )
+        }
+        if not before:
+            return 0
+        updated = StudentSemesterFolder.objects.filter(pk__in=list(before)).update(**values)
+        after = StudentSemesterFolder.objects.filter(pk__in=list(before)).values_list('pk', 'gpa', 'is_gpa_calculated')
+        apply_folder_gpa_changes(
+            (before[pk][0], before[pk][1:], (gpa, calculated)) for pk, gpa, calculated in after
+        )
+        bump_results_version(student_id for student_id, _, _ in before.values())
+    return updated
+
+
+def archive_results_into_folders(results, academic_year, semester, program_id=None):
+    """Attach every result in `results` for the period to its student's semester folder.
+
+    Missing folders are created with one bulk_create(ignore_conflicts=True),
+    taking program `program_id` and the student's department/faculty. Results
+    not yet in their folder are moved with one UPDATE ... SET folder_id =
+    (SELECT ...) rather than Result.save() per row, and the folders they left
+    and joined are recalculated once. The query count does not depend on the
+    number of students. Returns {'students', 'folders_created',
+    'results_attached'}.
+    """
+    results = results.filter(academic_year=academic_year, semester=semester).order_by()
+    students = list(
+        results.values_list('student_id', 'student__department_id', 'student__faculty_id').distinct()
+    )
+    stats = {'students': len(students), 'folders_created': 0, 'results_attached': 0}
+    if not students:
+        return stats
+
+    folders = StudentSemesterFolder.objects.filter(
+        student_id__in=[student_id for student_id, _, _ in students],
+        academic_year=academic_year, semester=semester,
+    )
+    with transaction.atomic():
+        existing = set(folders.values_list('student_id', flat=True))
+        missing = [
+            StudentSemesterFolder(
+                student_id=student_id, academic_year=academic_year, semester=semester,
+                program_id=program_id, department_id=department_id, faculty_id=faculty_id,
+            )
+            for student_id, department_id, faculty_id in students if student_id not in existing
+        ]
+        StudentSemesterFolder.objects.bulk_create(missing, ignore_conflicts=True, batch_size=500)
+        stats['folders_created'] = len(missing)
+
+        stale = results.exclude(
+            folder__student_id=F('student_id'), folder__academic_year=academic_year, folder__semester=semester,
+        )
+        previous = set(stale.exclude(folder=None).values_list('folder_id', flat=True).distinct())
+        folder_of_student = StudentSemesterFolder.objects.filter(
+            student_id=OuterRef('student_id'), academic_year=academic_year, semester=semester,
+        ).values('pk')[:1]
+        stats['results_attached'] = stale.update(folder_id=Subquery(folder_of_student))
+        bump_results_version(student_id for student_id, _, _ in students)
+
+        if stats['results_attached']:
+            recalculate_folder_aggregates(previous | set(folders.values_list('pk', flat=True)))
+    return stats
+
+
 class Module(models.Model):
     """A course/module offered by a Program/Department/Faculty"""
     code = models.CharField(max_length=20, unique=True)
@@ -311,42 +498,104 @@ def calculate_grade_from_percentage(percentage: float) -> str:
         return 'D'
     return 'F'
 
+# Fixed assessment weights; missing types have their weight redistributed
+ASSESSMENT_WEIGHTS = {'exam': 0.5, 'test': 0.2, 'assignment': 0.2, 'attendance': 0.1}
+
+
+def _assessment_percentage_expression():
+    """SQL expression for Assessment.percentage (0 when total_score is 0)."""
+    return Case(
+        When(total_score=0, then=Value(0.0)),
+        default=ExpressionWrapper(F('score') * 100.0 / F('total_score'), output_field=FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def weighted_assessment_percentage(type_averages):
+    """Combine {assessment_type: average percentage} into one weighted percentage."""
+    total_weight_present = sum(ASSESSMENT_WEIGHTS[t] for t in type_averages if t in ASSESSMENT_WEIGHTS)
+    if total_weight_present == 0:
+        total_weight_present = 1
+    return sum(
+        avg_pct * ASSESSMENT_WEIGHTS.get(a_type, 0) / total_weight_present
+        for a_type, avg_pct in type_averages.items()
+    )
+
+
+def aggregate_assessment_percentages(keys):
+    """Weighted percentage for many (student_id, module_id, academic_year, semester) keys.
+
+    Per-type averages for every key come from a single grouped query; keys
+    without assessments are left out of the returned {key: percentage} dict.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    rows = (
+        Assessment.objects.filter(
+            student_id__in={k[0] for k in keys},
+            module_id__in={k[1] for k in keys},
+            academic_year__in={k[2] for k in keys},
+            semester__in={k[3] for k in keys},
+        )
+        .values('student_id', 'module_id', 'academic_year', 'semester', 'assessment_type')
+        .annotate(avg_pct=Avg(_assessment_percentage_expression()))
+        .order_by()
+    )
+
+    by_key = defaultdict(dict)
+    for row in rows:
+        key = (row['student_id'], row['module_id'], row['academic_year'], row['semester'])
+        if key in keys:
+            by_key[key][row['assessment_type']] = float(row['avg_pct'] or 0)
+
+    return {key: weighted_assessment_percentage(types) for key, types in by_key.items()}
+
+
+def recalculate_results_from_assessments(results_by_key):
+    """Batch version of Result.recalculate_from_assessments.
+
+    `results_by_key` maps (student_id, module_id, academic_year, semester) to
+    the Result holding that module's mark. Scores and grades for all keys are
+    computed in one grouped query and written back with one bulk_update.
+    Returns the list of updated results.
+    """
+    percentages = aggregate_assessment_percentages(results_by_key.keys())
+    now = timezone.now()
+    updated = []
+    for key, total_percentage in percentages.items():
+        result = results_by_key[key]
+        result.score = round(total_percentage, 2)
+        result.total_score = 100
+        result.grade = calculate_grade_from_percentage(total_percentage)
+        result.updated_date = now
+        updated.append(result)
+    if updated:
+        Result.objects.bulk_update(updated, ['score', 'total_score', 'grade', 'updated_date'], batch_size=500)
+    return updated
+
+
 # Attach aggregation helper to Result via monkey-patch-like addition
 def result_recalculate_from_assessments(self):
     """Recalculate this Result's score and grade from related Assessment objects.
     We use fixed weights: exam 50%, test 20%, assignment 20%, attendance 10%.
     If an assessment type is missing, its weight is redistributed proportionally among present types.
     """
-    weights = {'exam': 0.5, 'test': 0.2, 'assignment': 0.2, 'attendance': 0.1}
-    # fetch assessments for this student/module/year/semester
-    assessments = Assessment.objects.filter(
-        student=self.student,
-        module__name__iexact=self.subject,
-        academic_year=self.academic_year,
-        semester=self.semester
-    )
-    if not assessments.exists():
+    # average percentage per type for this student/module/year/semester, in one query
+    type_averages = {
+        row['assessment_type']: float(row['avg_pct'] or 0)
+        for row in Assessment.objects.filter(
+            student=self.student,
+            module__name__iexact=self.subject,
+            academic_year=self.academic_year,
+            semester=self.semester
+        ).values('assessment_type').annotate(avg_pct=Avg(_assessment_percentage_expression())).order_by()
+    }
+    if not type_averages:
         return
 
-    # group available types
-    types_present = {a.assessment_type for a in assessments}
-    total_weight_present = sum(weights[t] for t in types_present if t in weights)
-    if total_weight_present == 0:
-        total_weight_present = 1
-
-    # compute weighted percentage
-    total_percentage = 0.0
-    for a_type in types_present:
-        type_assessments = assessments.filter(assessment_type=a_type)
-        # average percentage for this type
-        avg_pct = 0.0
-        count = type_assessments.count()
-        if count:
-            avg_pct = sum([float(x.percentage) for x in type_assessments]) / count
-        # redistributed weight
-        weight = weights.get(a_type, 0) / total_weight_present
-        total_percentage += avg_pct * weight
-
+    total_percentage = weighted_assessment_percentage(type_averages)
     grade = calculate_grade_from_percentage(total_percentage)
     # update Result model fields
     try:
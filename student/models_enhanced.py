@@ -17,7 +17,12 @@ Enhanced Models for Advanced Features:
 - Student Progression Tracking
 """
 
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.db.models.functions import Round
+from django.db.models.lookups import GreaterThanOrEqual
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -68,6 +73,10 @@ class ClassPerformanceMetrics(models.Model):
     lowest_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     std_deviation = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     pass_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    median_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    lower_quartile = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    upper_quartile = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    score_histogram = models.JSONField(default=list, blank=True, help_text="Result counts per 10-mark band, 0-10 to 90-100")
     
     total_students_enrolled = models.IntegerField(default=0)
     total_students_passed = models.IntegerField(default=0)
@@ -79,6 +88,31 @@ class ClassPerformanceMetrics(models.Model):
         return f"{self.module.code} - {self.academic_year} S{self.semester}"
 
 
+class AnalyticsRefreshKey(models.Model):
+    """A GradeDistributionSnapshot or ClassPerformanceMetrics key awaiting recomputation.
+
+    Publishing marks (program, year, semester) and (subject, year, semester)
+    keys here; student.tasks.refresh_dirty_analytics recomputes just those.
+    """
+    KIND_CHOICES = [
+        ('program', 'Program grade distribution'),
+        ('subject', 'Subject class metrics'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=100, help_text="Program id or subject name")
+    academic_year = models.CharField(max_length=20)
+    semester = models.CharField(max_length=10)
+    marked_at = models.DateTimeField(default=timezone.now)
+    generation = models.PositiveIntegerField(default=0, help_text="Incremented every time the key is marked")
+
+    class Meta:
+        unique_together = ('kind', 'key', 'academic_year', 'semester')
+
+    def __str__(self):
+        return f"{self.kind} {self.key} - {self.academic_year} S{self.semester}"
+
+
 class AnalyticsReport(models.Model):
     """Generated analytics reports for export"""
     REPORT_TYPE_CHOICES = [
@@ -143,13 +177,23 @@ class GradingScale(models.Model):
 
 
 class CumulativeGPA(models.Model):
-    """Cumulative GPA tracking across multiple semesters"""
+    """Cumulative GPA tracking across multiple semesters.
+
+    overall_gpa is the average of the student's calculated semester GPAs. The
+    running gpa_sum/semester_count pair is kept up to date with F() deltas
+    whenever a semester folder's GPA changes (see apply_cumulative_gpa_deltas),
+    so no history rescan is needed; `reconcile_cumulative_gpa` checks for drift.
+    """
     student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='cumulative_gpa')
     grading_scale = models.ForeignKey(GradingScale, on_delete=models.SET_NULL, null=True)
     
     overall_gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0)
     total_credits = models.IntegerField(default=0)
     total_credit_points = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    # Running sums over folders with is_gpa_calculated
+    gpa_sum = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    semester_count = models.IntegerField(default=0)
     
     # Academic standing
     STANDING_CHOICES = [
@@ -159,6 +203,9 @@ class CumulativeGPA(models.Model):
         ('probation', 'Academic Probation (1.0-1.99)'),
         ('poor', 'Poor Standing (<1.0)'),
     ]
+    # (lower bound, standing), checked top-down
+    STANDING_THRESHOLDS = [(3.5, 'excellent'), (3.0, 'good'), (2.0, 'satisfactory'), (1.0, 'probation')]
+    DEANS_LIST_GPA = 3.5
     academic_standing = models.CharField(max_length=20, choices=STANDING_CHOICES, default='good')
     
     # Dean's list tracking
@@ -169,29 +216,32 @@ class CumulativeGPA(models.Model):
     
     def __str__(self):
         return f"{self.student.student_id} - GPA: {self.overall_gpa}"
+
+    @staticmethod
+    def semester_totals(student_ids):
+        """{student_id: (gpa_sum, semester_count)} read from the semester folders in one query."""
+        from student.models import StudentSemesterFolder
+
+        rows = (
+            StudentSemesterFolder.objects.filter(student_id__in=student_ids, is_gpa_calculated=True)
+            .values('student_id')
+            .annotate(total=Sum('gpa'), count=Count('id'))
+            .order_by()
+        )
+        return {
+            row['student_id']: (Decimal(str(row['total'] or 0)).quantize(Decimal('0.01')), row['count'])
+            for row in rows
+        }
     
     def recalculate(self):
-        """Recalculate cumulative GPA from all semester GPAs"""
-        from student.models import StudentSemesterFolder
-        
-        folders = StudentSemesterFolder.objects.filter(student=self.student).order_by('academic_year', 'semester')
-        
-        if not folders.exists():
-            self.overall_gpa = 0
+        """Recalculate cumulative GPA from all semester GPAs (full rescan, used for reconciliation)."""
+        self.gpa_sum, self.semester_count = self.semester_totals([self.student_id]).get(
+            self.student_id, (Decimal('0'), 0)
+        )
+        self.overall_gpa = round(self.gpa_sum / self.semester_count, 2) if self.semester_count else 0
+        if not self.semester_count:
             self.total_credits = 0
             self.total_credit_points = 0
-            self.save()
-            return
-        
-        total_gpa = 0
-        count = 0
-        for folder in folders:
-            if folder.is_gpa_calculated:
-                total_gpa += float(folder.gpa)
-                count += 1
-        
-        if count > 0:
-            self.overall_gpa = round(total_gpa / count, 2)
         
         # Update academic standing
         self._update_standing()
@@ -199,17 +249,91 @@ class CumulativeGPA(models.Model):
     
     def _update_standing(self):
         """Update academic standing based on GPA"""
-        if self.overall_gpa >= 3.5:
-            self.academic_standing = 'excellent'
+        self.academic_standing = 'poor'
+        for lower_bound, standing in self.STANDING_THRESHOLDS:
+            if self.overall_gpa >= lower_bound:
+                self.academic_standing = standing
+                break
+        if self.overall_gpa >= self.DEANS_LIST_GPA:
             self.on_deans_list = True
-        elif self.overall_gpa >= 3.0:
-            self.academic_standing = 'good'
-        elif self.overall_gpa >= 2.0:
-            self.academic_standing = 'satisfactory'
-        elif self.overall_gpa >= 1.0:
-            self.academic_standing = 'probation'
-        else:
-            self.academic_standing = 'poor'
+
+
+def _overall_gpa_expression():
+    """SQL for round(gpa_sum / semester_count, 2), 0 without calculated semesters."""
+    return Case(
+        When(semester_count__gt=0, then=Round(
+            ExpressionWrapper(F('gpa_sum') * 1.0 / F('semester_count'), output_field=FloatField()), 2
+        )),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def refresh_cumulative_gpa_standing(student_ids):
+    """Recompute overall_gpa, academic_standing and the dean's list flag from the stored sums."""
+    overall = _overall_gpa_expression()
+    return CumulativeGPA.objects.filter(student_id__in=student_ids).update(
+        overall_gpa=overall,
+        academic_standing=Case(
+            *[When(GreaterThanOrEqual(overall, lower_bound), then=Value(standing))
+              for lower_bound, standing in CumulativeGPA.STANDING_THRESHOLDS],
+            default=Value('poor'),
+        ),
+        on_deans_list=Case(
+            When(GreaterThanOrEqual(overall, CumulativeGPA.DEANS_LIST_GPA), then=Value(True)),
+            default=F('on_deans_list'),
+        ),
+        last_recalculated=timezone.now(),
+    )
+
+
+def apply_cumulative_gpa_deltas(deltas, batch_size=500):
+    """Apply {student_id: (gpa_delta, count_delta)} to the students' CumulativeGPA rows.
+
+    Existing rows get an atomic `gpa_sum = gpa_sum + delta` update, one
+    statement per batch whatever the number of students. Students without a
+    row yet are seeded with their semester folder totals minus the delta
+    (the folders already hold the new GPAs), and the delta is then added with
+    the same update. If another transaction seeds the same row first, the
+    seed is dropped as a conflict but the delta still lands on its row.
+    """
+    deltas = {sid: d for sid, d in deltas.items() if d[0] or d[1]}
+
+    def add_deltas(ids):
+        return CumulativeGPA.objects.filter(student_id__in=ids).update(
+            gpa_sum=F('gpa_sum') + Case(
+                *[When(student_id=sid, then=Value(Decimal(str(deltas[sid][0])))) for sid in ids],
+                default=Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=8, decimal_places=2),
+            ),
+            semester_count=F('semester_count') + Case(
+                *[When(student_id=sid, then=Value(deltas[sid][1])) for sid in ids],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            ),
+        )
+
+    student_ids = list(deltas)
+    for start in range(0, len(student_ids), batch_size):
+        batch = student_ids[start:start + batch_size]
+        if add_deltas(batch) < len(batch):
+            existing = set(CumulativeGPA.objects.filter(student_id__in=batch).values_list('student_id', flat=True))
+            missing = [sid for sid in batch if sid not in existing]
+            totals = CumulativeGPA.semester_totals(missing)
+            CumulativeGPA.objects.bulk_create(
+                [
+                    CumulativeGPA(
+                        student_id=sid,
+                        gpa_sum=totals.get(sid, (Decimal('0'), 0))[0] - Decimal(str(deltas[sid][0])),
+                        semester_count=totals.get(sid, (Decimal('0'), 0))[1] - deltas[sid][1],
+                    )
+                    for sid in missing
+                ],
+                ignore_conflicts=True,
+            )
+            add_deltas(missing)
+        refresh_cumulative_gpa_standing(batch)
+    return len(student_ids)
 
 
 # ==================== 3. TRANSCRIPT GENERATION ====================
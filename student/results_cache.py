@@ -0,0 +1,76 @@
+"""
+Results-day read cache for students' published results.
+
+Published results only change when a result is published, edited or
+withdrawn, so what a student reads about their own results (the dashboard
+result list, the rendered results folder) is served from the 'results' cache
+alias (RESULTS_CACHE_BACKEND: local memory, file-based or Redis).
+
+Every entry key embeds the student's current results version.
+bump_results_version stores a new version in a single cache write, which
+atomically orphans all of the student's entries; the orphans expire after
+RESULTS_CACHE_TTL. Versions are bumped by the receivers in
+admin_hierarchy.signals for single-row Result, Student and
+StudentSemesterFolder writes, and by the bulk paths (publishing,
+CSV/assessment ingestion, archiving and folder recalculation).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+RESULTS_CACHE_ALIAS = 'results'
+
+
+def _cache():
+    return caches[RESULTS_CACHE_ALIAS]
+
+
+def _version_key(student_pk):
+    return f'student-results-version:{student_pk}'
+
+
+def results_version(student_pk):
+    """The student's current results version; a new one is started if none is stored."""
+    return _cache().get_or_set(_version_key(student_pk), time.time_ns, timeout=None)
+
+
+def cached_student_results(student_pk, name, compute):
+    """`compute()` cached as `name` under the student's current results version."""
+    cache = _cache()
+    key = f'student-results:{student_pk}:{name}:{results_version(student_pk)}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'RESULTS_CACHE_TTL', 900))
+    return value
+
+
+def published_results(student):
+    """List of the student's published results, newest first."""
+    from student.models import Result
+
+    return cached_student_results(student.pk, 'published', lambda: list(
+        Result.objects.filter(student=student, is_published=True).order_by('-published_date')
+    ))
+
+
+def bump_results_version(students):
+    """Invalidate everything cached for the given students (ids); None ids are ignored.
+
+    The versions are bumped immediately and again once the surrounding
+    transaction commits, so a page read mid-transaction cannot stay cached
+    under the new version.
+    """
+    pks = {pk for pk in students if pk is not None}
+    if not pks:
+        return
+
+    def bump():
+        version = time.time_ns()
+        _cache().set_many({_version_key(pk): version for pk in pks}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
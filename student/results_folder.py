@@ -0,0 +1,62 @@
+"""
+Rendering of the student results folder page.
+
+The page body (summary cards and one card per semester folder) is built from
+three queries: the folders with their published results prefetched, and one
+aggregate over the student's published results for the summary cards. The
+rendered HTML is kept in the results-day read cache (student.results_cache),
+so it is rebuilt only after one of the student's results changes.
+"""
+
+from django.db.models import Avg, Count, F, FloatField, Prefetch, Q
+from django.db.models.functions import Cast
+from django.template.loader import render_to_string
+
+from .results_cache import cached_student_results
+
+
+def results_folder_context(student):
+    """Template context for the results folder body of `student`."""
+    from student.models import Result, StudentSemesterFolder
+
+    folders = list(
+        StudentSemesterFolder.objects.filter(student=student)
+        .select_related('program', 'department', 'faculty')
+        .prefetch_related(Prefetch(
+            'results',
+            queryset=Result.objects.filter(is_published=True).order_by('subject'),
+            to_attr='published_results',
+        ))
+        .order_by('-academic_year', '-semester')
+    )
+    summary = Result.objects.filter(student=student, is_published=True).aggregate(
+        total_modules=Count('id'),
+        avg_percentage=Avg(
+            Cast(F('score'), FloatField()) * 100 / Cast(F('total_score'), FloatField()),
+            filter=Q(score__gt=0, total_score__gt=0),
+        ),
+    )
+
+    gpa_values = [folder.gpa for folder in folders if folder.gpa > 0]
+    return {
+        'student': student,
+        'folders_data': [
+            {
+                'folder': folder,
+                'results': folder.published_results,
+                'total_score': folder.total_score,
+                'gpa': folder.gpa,
+            }
+            for folder in folders
+        ],
+        'total_modules': summary['total_modules'],
+        'avg_grade': f"{summary['avg_percentage']:.2f}%" if summary['avg_percentage'] is not None else 'N/A',
+        'overall_gpa': round(sum(gpa_values) / len(gpa_values), 2) if gpa_values else 'N/A',
+    }
+
+
+def render_results_folder(student):
+    """The rendered results folder body of `student`, from the cache when possible."""
+    return cached_student_results(student.pk, 'folder-html', lambda: render_to_string(
+        'student/results_folder_body.html', results_folder_context(student),
+    ))
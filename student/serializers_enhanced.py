@@ -144,7 +144,8 @@ class ClassPerformanceMetricsSerializer(serializers.ModelSerializer):
         model = ClassPerformanceMetrics
         fields = [
             'id', 'module_code', 'academic_year', 'semester',
-            'class_average', 'highest_score', 'lowest_score', 'std_deviation', 'pass_rate'
+            'class_average', 'highest_score', 'lowest_score', 'std_deviation', 'pass_rate',
+            'median_score', 'lower_quartile', 'upper_quartile', 'score_histogram'
         ]
 
 
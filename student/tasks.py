@@ -0,0 +1,151 @@
+"""
+Incremental refresh of the analytics snapshot tables.
+
+Publishing results calls `mark_analytics_dirty`, which records the affected
+(program, year, semester) GradeDistributionSnapshot keys and (subject, year,
+semester) ClassPerformanceMetrics keys as AnalyticsRefreshKey rows and asks
+for a refresh. With a Celery broker configured the refresh runs on a worker;
+otherwise it runs inline once the surrounding transaction commits.
+`refresh_dirty_analytics` recomputes only the marked keys.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+try:
+    from celery import shared_task
+    HAS_CELERY = True
+except ImportError:  # pragma: no cover - celery not installed
+    HAS_CELERY = False
+
+from student.models import Program
+from student.models_enhanced import AnalyticsRefreshKey, GradeDistributionSnapshot
+from student.utilities_enhanced import (
+    calculate_grade_distribution, calculate_semester_class_metrics, invalidate_performance_trends,
+)
+
+logger = logging.getLogger(__name__)
+
+# Keys recomputed per refresh round
+REFRESH_BATCH_SIZE = 500
+
+
+def mark_analytics_dirty(results):
+    """Mark the snapshot keys touched by `results` for recomputation.
+
+    `results` is any iterable of Result rows (only program_id, subject,
+    academic_year and semester are read). Every mark increments the key's
+    generation, so a refresh that read the key before this mark committed
+    does not drop it. The cached performance trends of the results' scopes
+    are dropped as well.
+    """
+    results = list(results)
+    if results:
+        invalidate_performance_trends(results)
+
+    now = timezone.now()
+    keys = {}
+    for result in results:
+        period = (result.academic_year, result.semester)
+        if result.program_id:
+            keys[('program', str(result.program_id)) + period] = None
+        keys[('subject', result.subject) + period] = None
+    if not keys:
+        return 0
+
+    AnalyticsRefreshKey.objects.bulk_create(
+        [
+            AnalyticsRefreshKey(kind=kind, key=key, academic_year=year, semester=semester, marked_at=now)
+            for kind, key, year, semester in keys
+        ],
+        ignore_conflicts=True, batch_size=500,
+    )
+    # Then bump new and pending keys alike, one UPDATE per kind and period
+    keys_by_group = defaultdict(set)
+    for kind, key, year, semester in keys:
+        keys_by_group[(kind, year, semester)].add(key)
+    for (kind, year, semester), group_keys in keys_by_group.items():
+        AnalyticsRefreshKey.objects.filter(
+            kind=kind, academic_year=year, semester=semester, key__in=group_keys,
+        ).update(generation=F('generation') + 1, marked_at=now)
+    enqueue_analytics_refresh()
+    return len(keys)
+
+
+def _refresh_program_keys(keys):
+    programs = Program.objects.in_bulk([int(key.key) for key in keys])
+    for key in keys:
+        program = programs.get(int(key.key))
+        snapshot = calculate_grade_distribution(program, key.academic_year, key.semester) if program else None
+        if snapshot is None:
+            GradeDistributionSnapshot.objects.filter(
+                program_id=key.key, academic_year=key.academic_year, semester=key.semester,
+            ).delete()
+
+
+def _refresh_subject_keys(keys):
+    subjects_by_period = defaultdict(set)
+    for key in keys:
+        subjects_by_period[(key.academic_year, key.semester)].add(key.key)
+    for (academic_year, semester), subjects in subjects_by_period.items():
+        calculate_semester_class_metrics(academic_year, semester, subjects=subjects)
+
+
+def refresh_dirty_analytics(batch_size=REFRESH_BATCH_SIZE):
+    """Recompute every marked snapshot key; returns the number of keys refreshed.
+
+    Subject keys are recomputed with one grouped query per semester. A key
+    is removed only if its generation is still the one that was read, i.e.
+    no mark committed since (the DELETE waits for a marking transaction
+    holding the row and then sees its new generation).
+    """
+    refreshed = 0
+    while True:
+        started = timezone.now()
+        keys = list(AnalyticsRefreshKey.objects.filter(marked_at__lte=started).order_by('marked_at')[:batch_size])
+        if not keys:
+            return refreshed
+
+        with transaction.atomic():
+            _refresh_program_keys([key for key in keys if key.kind == 'program'])
+            _refresh_subject_keys([key for key in keys if key.kind == 'subject'])
+            pks_by_generation = defaultdict(list)
+            for key in keys:
+                pks_by_generation[key.generation].append(key.pk)
+            for generation, pks in pks_by_generation.items():
+                AnalyticsRefreshKey.objects.filter(pk__in=pks, generation=generation).delete()
+        refreshed += len(keys)
+
+
+def run_analytics_refresh():
+    """Refresh the marked keys; failures are logged and the keys stay queued."""
+    try:
+        return refresh_dirty_analytics()
+    except Exception:
+        logger.exception('Analytics snapshot refresh failed')
+        return 0
+
+
+if HAS_CELERY:
+    refresh_analytics_task = shared_task(name='student.refresh_dirty_analytics')(run_analytics_refresh)
+else:
+    refresh_analytics_task = None
+
+
+def enqueue_analytics_refresh():
+    """Run refresh_dirty_analytics after the current transaction commits.
+
+    Uses a Celery worker when a broker is configured, otherwise runs inline.
+    """
+    def dispatch():
+        if refresh_analytics_task is not None and getattr(settings, 'CELERY_BROKER_URL', ''):
+            refresh_analytics_task.delay()
+        else:
+            run_analytics_refresh()
+
+    transaction.on_commit(dispatch)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from admin_hierarchy.models import ResultApprovalWorkflow
+from admin_hierarchy.workflow_actions import publish_workflows
+from student.models import Faculty, Department, Program, Module, Student, Result
+from student.models_enhanced import AnalyticsRefreshKey, GradeDistributionSnapshot, ClassPerformanceMetrics
+from student import tasks
+from student.tasks import mark_analytics_dirty, refresh_dirty_analytics
+
+
+class AnalyticsRefreshTest(TestCase):
+    """Publishing marks snapshot keys dirty and the refresh recomputes only those."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Law', code='LAW')
+        department = Department.objects.create(name='Public Law', code='PL', faculty=faculty)
+        self.program = Program.objects.create(name='LLB', code='LLB', department=department)
+        self.other_program = Program.objects.create(name='LLM', code='LLM', department=department)
+        self.module = Module.objects.create(
+            name='Torts', code='LAW101', program=self.program, department=department, faculty=faculty,
+        )
+        self.results = []
+        for i, (score, grade) in enumerate(((80, 'A'), (45, 'F'))):
+            user = User.objects.create_user(username=f'ar{i}@example.com', password='pass123')
+            student = Student.objects.create(
+                user=user, student_id=f'AR{i}', email=f'ar{i}@example.com',
+                faculty=faculty, department=department, program=self.program,
+            )
+            self.results.append(Result.objects.create(
+                student=student, program=self.program, department=department, faculty=faculty,
+                subject='Torts', result_type='exam', score=score, grade=grade,
+                academic_year='2024/2025', semester='1',
+            ))
+
+    def test_publish_refreshes_affected_snapshots(self):
+        workflows = ResultApprovalWorkflow.objects.bulk_create([
+            ResultApprovalWorkflow(result=result, status='dean_approved') for result in self.results
+        ])
+        untouched = GradeDistributionSnapshot.objects.create(
+            program=self.other_program, academic_year='2024/2025', semester='1', total_students=99,
+        )
+        admin = User.objects.create_user(username='publisher', password='pass')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_workflows(ResultApprovalWorkflow.objects.filter(pk__in=[wf.pk for wf in workflows]), admin)
+
+        snapshot = GradeDistributionSnapshot.objects.get(program=self.program)
+        self.assertEqual((snapshot.total_students, snapshot.grade_a_count, float(snapshot.pass_rate)), (2, 1, 50.0))
+        metrics = ClassPerformanceMetrics.objects.get(module=self.module)
+        self.assertEqual((metrics.total_students_enrolled, float(metrics.class_average)), (2, 62.5))
+        self.assertFalse(AnalyticsRefreshKey.objects.exists())
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.total_students, 99)
+
+    def test_unpublish_removes_stale_snapshots(self):
+        Result.objects.filter(pk__in=[r.pk for r in self.results]).update(is_published=True, published_date=timezone.now())
+        mark_analytics_dirty(self.results)
+        self.assertEqual(AnalyticsRefreshKey.objects.count(), 2)  # one program key, one subject key
+        self.assertEqual(refresh_dirty_analytics(), 2)
+        self.assertTrue(GradeDistributionSnapshot.objects.filter(program=self.program).exists())
+
+        for result in Result.objects.filter(pk__in=[r.pk for r in self.results]):
+            result.is_published = False
+            result.save()  # marks through the post_save receiver
+        refresh_dirty_analytics()
+        self.assertFalse(GradeDistributionSnapshot.objects.filter(program=self.program).exists())
+        self.assertFalse(ClassPerformanceMetrics.objects.filter(module=self.module).exists())
+
+    def test_remarking_moves_marked_at_forward(self):
+        mark_analytics_dirty(self.results[:1])
+        first = AnalyticsRefreshKey.objects.get(kind='program')
+        mark_analytics_dirty(self.results[:1])
+        self.assertEqual(AnalyticsRefreshKey.objects.count(), 2)
+        second = AnalyticsRefreshKey.objects.get(kind='program')
+        self.assertGreater(second.marked_at, first.marked_at)
+        self.assertEqual((first.generation, second.generation), (1, 2))
+
+    def test_key_marked_during_refresh_is_kept(self):
+        mark_analytics_dirty(self.results)
+        real_refresh = tasks._refresh_program_keys
+        rounds = []
+
+        def refresh_then_commit_publish(keys):
+            real_refresh(keys)
+            rounds.append(len(keys))
+            if len(rounds) == 1:
+                # A publish stamped before the refresh started commits its mark now
+                AnalyticsRefreshKey.objects.filter(kind='program').update(generation=F('generation') + 1)
+
+        with mock.patch.object(tasks, '_refresh_program_keys', refresh_then_commit_publish):
+            self.assertEqual(refresh_dirty_analytics(), 3)
+        self.assertEqual(rounds, [1, 1])  # the re-marked key is recomputed again
+        self.assertFalse(AnalyticsRefreshKey.objects.exists())
@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from student.models import (
+    Student, Faculty, Department, Program, Module, Assessment, Result,
+    aggregate_assessment_percentages,
+)
+from lecturer.models import Lecturer
+from admin_hierarchy.models import HeadOfDepartment, ResultApprovalWorkflow
+
+
+class BatchAssessmentAggregationTest(TestCase):
+    """Weighted module scores are computed for many keys with one grouped query."""
+
+    def setUp(self):
+        self.faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        self.department = Department.objects.create(name='Computer Science', code='CS', faculty=self.faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=self.department)
+        self.module = Module.objects.create(
+            name='Data Structures', code='CS101', program=self.program,
+            department=self.department, faculty=self.faculty,
+        )
+        self.students = []
+        for i in range(12):
+            user = User.objects.create_user(username=f'agg{i}@example.com', password='pass123')
+            self.students.append(Student.objects.create(
+                user=user, student_id=f'AGG{i:03d}', email=f'agg{i}@example.com',
+                faculty=self.faculty, department=self.department, program=self.program,
+            ))
+        hod_user = User.objects.create_user(username='hod@example.com', password='hodpass')
+        HeadOfDepartment.objects.create(user=hod_user, hod_id='H001', department=self.department, email='hod@example.com')
+        lecturer_user = User.objects.create_user(username='lecturer@example.com', password='lecpass')
+        self.lecturer = Lecturer.objects.create(
+            user=lecturer_user, lecturer_id='L001', email='lecturer@example.com',
+            faculty=self.faculty, department=self.department, is_verified=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(lecturer_user)
+
+    def _payload(self, students):
+        return [
+            {
+                'student_id': s.id,
+                'module_id': self.module.id,
+                'academic_year': '2024/2025',
+                'semester': '1',
+                'assessments': {
+                    'exam': {'score': 40 + i, 'total': 50},
+                    'test': {'score': 15, 'total': 20},
+                    'attendance': {'score': 9, 'total': 10},
+                },
+            }
+            for i, s in enumerate(students)
+        ]
+
+    def test_batch_matches_single_result_recalculation(self):
+        response = self.client.post('/api/results/bulk_upload/', self._payload(self.students[:3]), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_assessments'], 9)
+
+        keys = [(s.id, self.module.id, '2024/2025', '1') for s in self.students[:3]]
+        percentages = aggregate_assessment_percentages(keys)
+        for student in self.students[:3]:
+            result = Result.objects.get(student=student, subject='Data Structures', result_type='exam')
+            batch_score = result.score
+            result.recalculate_from_assessments()
+            result.refresh_from_db()
+            self.assertEqual(result.score, batch_score)
+            self.assertAlmostEqual(float(batch_score), percentages[(student.id, self.module.id, '2024/2025', '1')], places=2)
+            self.assertIsNotNone(result.folder)
+
+        # exam 80% * 0.5/0.8 + test 75% * 0.2/0.8 + attendance 90% * 0.1/0.8
+        first = Result.objects.get(student=self.students[0])
+        self.assertEqual(float(first.score), 80.0)
+        self.assertEqual(first.grade, 'A')
+        self.assertEqual(ResultApprovalWorkflow.objects.filter(status='lecturer_submitted').count(), 3)
+
+    def test_query_count_does_not_grow_with_entries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.post('/api/results/bulk_upload/', self._payload(self.students[:2]), format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post('/api/results/bulk_upload/', self._payload(self.students[2:]), format='json')
+        self.assertEqual(Assessment.objects.count(), 36)
+        self.assertEqual(len(large), len(small))
+
+    def test_existing_assessment_rejects_entry(self):
+        self.client.post('/api/results/bulk_upload/', self._payload(self.students[:1]), format='json')
+        response = self.client.post('/api/results/bulk_upload/', self._payload(self.students[:2]), format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created_assessments'], 3)
+        self.assertIn('Entry 0:', response.data['errors'][0])
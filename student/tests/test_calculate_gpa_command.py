@@ -0,0 +1,52 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from student.management.commands.calculate_gpa import pk_ranges
+from student.models import Student, Faculty, Department, Program, Result, StudentSemesterFolder
+
+
+class CalculateGpaCommandTest(TestCase):
+    """Full recompute runs set-based over primary-key chunks."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        for i, (score, grade) in enumerate([(85, 'A'), (72, 'B'), (55, 'D')]):
+            user = User.objects.create_user(username=f'cg{i}@example.com', password='pass123')
+            student = Student.objects.create(
+                user=user, student_id=f'CG{i}', email=f'cg{i}@example.com',
+                faculty=faculty, department=department, program=program,
+            )
+            Result.objects.create(
+                student=student, program=program, subject='Algorithms', result_type='exam',
+                score=score, grade=grade, academic_year='2024/2025', semester='1', is_published=True,
+            )
+
+    def test_pk_ranges_cover_the_whole_range(self):
+        self.assertEqual(pk_ranges(1, 7, 3), [(1, 3), (4, 6), (7, 7)])
+        self.assertEqual(pk_ranges(5, 5, 100), [(5, 5)])
+
+    def test_chunked_recompute_updates_every_folder(self):
+        out = StringIO()
+        call_command('calculate_gpa', '--chunk-size', '1', stdout=out)
+
+        gpas = dict(StudentSemesterFolder.objects.values_list('student__student_id', 'gpa'))
+        self.assertEqual(gpas, {'CG0': Decimal('4.00'), 'CG1': Decimal('3.00'), 'CG2': Decimal('1.00')})
+        self.assertIn('3 semester folders', out.getvalue())
+        self.assertIn('folders/s', out.getvalue())
+
+    def test_student_option(self):
+        out = StringIO()
+        call_command('calculate_gpa', '--student-id', 'CG1', stdout=out)
+        self.assertIn('GPA: 3.00', out.getvalue())
+        self.assertFalse(StudentSemesterFolder.objects.get(student__student_id='CG0').is_gpa_calculated)
+
+    def test_rejects_invalid_chunk_size(self):
+        with self.assertRaises(CommandError):
+            call_command('calculate_gpa', '--chunk-size', '0', stdout=StringIO())
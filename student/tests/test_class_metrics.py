@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from student.models import Faculty, Department, Program, Module, Student, Result
+from student.models_enhanced import ClassPerformanceMetrics
+from student.utilities_enhanced import calculate_class_performance_metrics, calculate_semester_class_metrics
+
+
+class ClassPerformanceMetricsTest(TestCase):
+    """Class statistics are computed from columnar score arrays."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Arts', code='ART')
+        department = Department.objects.create(name='History', code='HIS', faculty=faculty)
+        program = Program.objects.create(name='B.A History', code='BAH', department=department)
+        self.ancient = Module.objects.create(name='Ancient', code='HIS101', program=program, department=department, faculty=faculty)
+        self.modern = Module.objects.create(name='Modern', code='HIS102', program=program, department=department, faculty=faculty)
+        scores = {'Ancient': [(40, 'F'), (55, 'D'), (70, 'B'), (85, 'A')], 'Modern': [(62, 'C'), (91, 'A')]}
+        for i in range(4):
+            user = User.objects.create_user(username=f'cm{i}@example.com', password='pass123')
+            student = Student.objects.create(
+                user=user, student_id=f'CM{i}', email=f'cm{i}@example.com',
+                faculty=faculty, department=department, program=program,
+            )
+            for subject, marks in scores.items():
+                if i < len(marks):
+                    Result.objects.create(
+                        student=student, program=program, subject=subject, result_type='exam',
+                        score=marks[i][0], grade=marks[i][1], academic_year='2024/2025', semester='1',
+                        is_published=True,
+                    )
+
+    def test_single_module(self):
+        with self.assertNumQueries(3):  # columnar fetch, existing metrics, insert
+            calculate_class_performance_metrics(self.ancient, '2024/2025', '1')
+        metrics = ClassPerformanceMetrics.objects.get(module=self.ancient)
+        self.assertEqual(metrics.class_average, Decimal('62.50'))
+        self.assertEqual((metrics.lowest_score, metrics.highest_score), (Decimal('40.00'), Decimal('85.00')))
+        self.assertEqual(metrics.std_deviation, Decimal('16.77'))
+        self.assertEqual(
+            (metrics.lower_quartile, metrics.median_score, metrics.upper_quartile),
+            (Decimal('51.25'), Decimal('62.50'), Decimal('73.75')),
+        )
+        self.assertEqual(metrics.score_histogram, [0, 0, 0, 0, 1, 1, 0, 1, 1, 0])
+        self.assertEqual((metrics.total_students_passed, metrics.total_students_failed), (3, 1))
+        self.assertEqual(metrics.pass_rate, Decimal('75.00'))
+
+        self.assertIsNone(calculate_class_performance_metrics(self.ancient, '2023/2024', '1'))
+
+    def test_semester_batch_matches_single_module(self):
+        calculate_class_performance_metrics(self.ancient, '2024/2025', '1')
+        single = ClassPerformanceMetrics.objects.values().get(module=self.ancient)
+
+        with self.assertNumQueries(5):  # modules, results, existing metrics, insert new, update existing
+            saved = calculate_semester_class_metrics('2024/2025', '1')
+        self.assertEqual(len(saved), 2)
+        batch = ClassPerformanceMetrics.objects.values().get(module=self.ancient)
+        single.pop('last_updated'), batch.pop('last_updated')
+        self.assertEqual(single, batch)
+
+        modern = ClassPerformanceMetrics.objects.get(module=self.modern)
+        self.assertEqual((modern.total_students_enrolled, modern.median_score), (2, Decimal('76.50')))
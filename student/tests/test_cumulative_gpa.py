@@ -0,0 +1,132 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from student.models import (
+    Student, Faculty, Department, Program, Result, StudentSemesterFolder,
+    recalculate_folder_aggregates,
+)
+from student.models_enhanced import CumulativeGPA, apply_cumulative_gpa_deltas
+
+
+class IncrementalCumulativeGPATest(TestCase):
+    """CumulativeGPA follows folder GPA changes through running sums."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        self.students = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'cu{i}@example.com', password='pass123')
+            self.students.append(Student.objects.create(
+                user=user, student_id=f'CU{i}', email=f'cu{i}@example.com',
+                faculty=faculty, department=department, program=self.program,
+            ))
+
+    def _result(self, student, subject, grade, semester='1', published=True):
+        return Result.objects.create(
+            student=student, program=self.program, subject=subject, result_type='exam',
+            score=75, grade=grade, academic_year='2024/2025', semester=semester, is_published=published,
+        )
+
+    def test_folder_recalculation_applies_deltas(self):
+        student = self.students[0]
+        self._result(student, 'S1', 'A', semester='1')
+        self._result(student, 'S2', 'C', semester='2')
+        first, second = StudentSemesterFolder.objects.filter(student=student).order_by('semester')
+
+        first.recalculate_all()  # seeds the row from the folders
+        second.recalculate_all()
+        cumulative = CumulativeGPA.objects.get(student=student)
+        self.assertEqual((cumulative.gpa_sum, cumulative.semester_count), (Decimal('6.00'), 2))
+        self.assertEqual(cumulative.overall_gpa, Decimal('3.00'))
+        self.assertEqual(cumulative.academic_standing, 'good')
+
+        # A changed grade moves the sum by the difference only
+        Result.objects.filter(subject='S2').update(grade='A')
+        second.recalculate_all()
+        cumulative.refresh_from_db()
+        self.assertEqual((cumulative.gpa_sum, cumulative.semester_count), (Decimal('8.00'), 2))
+        self.assertEqual(cumulative.overall_gpa, Decimal('4.00'))
+        self.assertEqual(cumulative.academic_standing, 'excellent')
+        self.assertTrue(cumulative.on_deans_list)
+
+    def test_unchanged_gpa_touches_nothing(self):
+        self._result(self.students[0], 'S1', 'B')
+        folder = StudentSemesterFolder.objects.get(student=self.students[0])
+        folder.recalculate_all()
+        with self.assertNumQueries(2):  # aggregate + save
+            folder.recalculate_all()
+
+    def test_set_based_recalculation_matches_full_rescan(self):
+        self._result(self.students[0], 'S1', 'A', semester='1')
+        self._result(self.students[0], 'S2', 'D', semester='2')
+        self._result(self.students[1], 'S3', 'B')
+        CumulativeGPA.objects.create(student=self.students[1])
+
+        recalculate_folder_aggregates(StudentSemesterFolder.objects.all())
+        incremental = {
+            c.student_id: (c.gpa_sum, c.semester_count, c.overall_gpa, c.academic_standing)
+            for c in CumulativeGPA.objects.all()
+        }
+        self.assertEqual(len(incremental), 2)
+
+        for cumulative in CumulativeGPA.objects.all():
+            cumulative.recalculate()
+            self.assertEqual(
+                incremental[cumulative.student_id],
+                (cumulative.gpa_sum, cumulative.semester_count, cumulative.overall_gpa, cumulative.academic_standing),
+            )
+        self.assertEqual(incremental[self.students[0].pk][2], Decimal('2.50'))
+
+    def test_delta_survives_a_concurrent_seed(self):
+        student = self.students[0]
+        self._result(student, 'S1', 'A', semester='1')
+        self._result(student, 'S2', 'C', semester='2')
+        for folder in StudentSemesterFolder.objects.filter(student=student):
+            folder.recalculate_all()
+        CumulativeGPA.objects.all().delete()
+        real_totals = CumulativeGPA.semester_totals
+
+        def seeded_concurrently(student_ids):
+            # Another transaction, which did not see semester 2 yet, seeds the row first
+            CumulativeGPA.objects.create(student=student, gpa_sum=Decimal('4.00'), semester_count=1)
+            return real_totals(student_ids)
+
+        with mock.patch.object(CumulativeGPA, 'semester_totals', side_effect=seeded_concurrently):
+            apply_cumulative_gpa_deltas({student.pk: (2.0, 1)})  # semester 2 being calculated
+        cumulative = CumulativeGPA.objects.get(student=student)
+        self.assertEqual((cumulative.gpa_sum, cumulative.semester_count), (Decimal('6.00'), 2))
+        self.assertEqual(cumulative.overall_gpa, Decimal('3.00'))
+
+    def test_seed_is_not_double_counted(self):
+        student = self.students[0]
+        self._result(student, 'S1', 'A', semester='1')
+        self._result(student, 'S2', 'C', semester='2')
+        for folder in StudentSemesterFolder.objects.filter(student=student):
+            folder.recalculate_all()
+        CumulativeGPA.objects.all().delete()
+
+        apply_cumulative_gpa_deltas({student.pk: (2.0, 1)})
+        cumulative = CumulativeGPA.objects.get(student=student)
+        self.assertEqual((cumulative.gpa_sum, cumulative.semester_count), (Decimal('6.00'), 2))
+
+    def test_reconcile_command_repairs_drift(self):
+        self._result(self.students[0], 'S1', 'B')
+        StudentSemesterFolder.objects.get(student=self.students[0]).recalculate_all()
+        CumulativeGPA.objects.filter(student=self.students[0]).update(gpa_sum=9, semester_count=5)
+
+        out = StringIO()
+        call_command('reconcile_cumulative_gpa', stdout=out)
+        self.assertIn('1 drifted', out.getvalue())
+        self.assertEqual(CumulativeGPA.objects.get(student=self.students[0]).semester_count, 5)
+
+        call_command('reconcile_cumulative_gpa', '--fix', stdout=StringIO())
+        cumulative = CumulativeGPA.objects.get(student=self.students[0])
+        self.assertEqual((cumulative.gpa_sum, cumulative.semester_count), (Decimal('3.00'), 1))
+        self.assertEqual(cumulative.overall_gpa, Decimal('3.00'))
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from student.models import (
+    Student, Faculty, Department, Program, Result, StudentSemesterFolder,
+    recalculate_folder_aggregates,
+)
+from student.models_enhanced import CumulativeGPA
+
+
+class FolderAggregatesTest(TestCase):
+    """Folder total_score/GPA come from database aggregates."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        self.students = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'fa{i}@example.com', password='pass123')
+            self.students.append(Student.objects.create(
+                user=user, student_id=f'FA{i}', email=f'fa{i}@example.com',
+                faculty=faculty, department=department, program=self.program,
+            ))
+
+    def _result(self, student, subject, score, grade, published=True):
+        return Result.objects.create(
+            student=student, program=self.program, subject=subject, result_type='exam',
+            score=score, grade=grade, academic_year='2024/2025', semester='1', is_published=published,
+        )
+
+    def test_recalculate_all_uses_published_results_only(self):
+        student = self.students[0]
+        self._result(student, 'A1', 85, 'A')
+        self._result(student, 'B1', 72, 'B')
+        self._result(student, 'F1', 30, '')          # blank grade counts as F
+        self._result(student, 'X1', 99, 'A', published=False)
+        folder = StudentSemesterFolder.objects.get(student=student)
+
+        CumulativeGPA.objects.create(student=student)
+        # aggregate, save, cumulative sums delta, cumulative overall/standing
+        with self.assertNumQueries(4):
+            folder.recalculate_all()
+        folder.refresh_from_db()
+        self.assertEqual(folder.total_score, Decimal('62.33'))
+        self.assertEqual(folder.gpa, Decimal('2.33'))
+        self.assertTrue(folder.is_gpa_calculated)
+
+    def test_set_based_update_matches_per_folder_calculation(self):
+        self._result(self.students[0], 'A1', 85, 'A')
+        self._result(self.students[0], 'C1', 61, 'C')
+        self._result(self.students[1], 'D1', 55, 'D')
+        self._result(self.students[2], 'Z1', 90, 'A', published=False)
+        folders = list(StudentSemesterFolder.objects.order_by('student_id'))
+
+        with self.assertNumQueries(1):
+            updated = recalculate_folder_aggregates(StudentSemesterFolder.objects.all(), update_cumulative=False)
+        self.assertEqual(updated, 3)
+        set_based = {f.pk: (f.total_score, f.gpa, f.is_gpa_calculated) for f in StudentSemesterFolder.objects.all()}
+
+        for folder in folders:
+            folder.recalculate_all()
+            folder.refresh_from_db()
+            self.assertEqual(set_based[folder.pk], (folder.total_score, folder.gpa, folder.is_gpa_calculated))
+        self.assertEqual(set_based[folders[0].pk][:2], (Decimal('73.00'), Decimal('3.00')))
+        self.assertEqual(set_based[folders[2].pk], (Decimal('0.00'), Decimal('0.00'), False))
+
+    def test_accepts_ids(self):
+        self._result(self.students[0], 'A1', 80, 'A')
+        folder = StudentSemesterFolder.objects.get(student=self.students[0])
+        self.assertEqual(recalculate_folder_aggregates([folder.pk]), 1)
+        self.assertEqual(recalculate_folder_aggregates([]), 0)
+        folder.refresh_from_db()
+        self.assertEqual(folder.gpa, Decimal('4.00'))
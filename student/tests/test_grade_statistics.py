@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from student.models import Faculty, Department, Program, Student, Result, grade_statistics
+from student.utilities_enhanced import calculate_grade_distribution
+
+
+class GradeStatisticsTest(TestCase):
+    """Grade counts, pass rate and averages come from a single aggregate."""
+
+    def setUp(self):
+        faculty = Faculty.objects.create(name='Science', code='SCI')
+        department = Department.objects.create(name='Physics', code='PHY', faculty=faculty)
+        self.program = Program.objects.create(name='B.Sc Physics', code='BSPH', department=department)
+        students = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'gs{i}@example.com', password='pass123')
+            students.append(Student.objects.create(
+                user=user, student_id=f'GS{i}', email=f'gs{i}@example.com',
+                faculty=faculty, department=department, program=self.program,
+            ))
+        for student, subject, score, grade in (
+            (students[0], 'Optics', 85, 'A'), (students[0], 'Mechanics', 65, 'C'),
+            (students[1], 'Optics', 40, 'F'), (students[1], 'Mechanics', 72, 'B'),
+        ):
+            Result.objects.create(
+                student=student, program=self.program, subject=subject, result_type='exam',
+                score=score, grade=grade, academic_year='2024/2025', semester='1', is_published=True,
+            )
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            stats = grade_statistics(Result.objects.filter(program=self.program))
+        self.assertEqual(stats['grade_counts'], {'A': 1, 'B': 1, 'C': 1, 'D': 0, 'F': 1})
+        self.assertEqual((stats['total'], stats['passed'], stats['failed']), (4, 3, 1))
+        self.assertEqual(stats['pass_rate'], 75.0)
+        self.assertAlmostEqual(float(stats['average_score']), 65.5)
+        self.assertAlmostEqual(stats['gpa'], 2.25)
+        self.assertEqual((stats['total_students'], stats['total_modules']), (2, 2))
+
+    def test_empty_queryset(self):
+        stats = grade_statistics(Result.objects.none())
+        self.assertEqual((stats['total'], stats['pass_rate'], stats['average_score'], stats['gpa']), (0, 0, 0, 0.0))
+
+    def test_snapshot_builder(self):
+        snapshot = calculate_grade_distribution(self.program, '2024/2025', '1')
+        self.assertEqual((snapshot.grade_a_count, snapshot.grade_f_count, snapshot.total_students), (1, 1, 4))
+        self.assertEqual(float(snapshot.pass_rate), 75.0)
+        self.assertIsNone(calculate_grade_distribution(self.program, '2023/2024', '1'))
@@ -339,6 +339,33 @@ class MultiModuleUploadAPITest(TestCase):
         )
         self.assertEqual(assessments.count(), 2)
 
+    def test_bulk_upload_numeric_semester(self):
+        """A numeric semester is matched against the stored string semester."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        def upload(assessments):
+            return self.client.post('/api/results/bulk_upload/', [{
+                'student_id': self.student1.id,
+                'module_id': self.module1.id,
+                'academic_year': '2024/2025',
+                'semester': 1,
+                'assessments': assessments,
+            }], format='json')
+
+        self.assertEqual(upload({'exam': {'score': 90, 'total': 100}}).status_code, 201)
+        result = Result.objects.get(student=self.student1, subject=self.module1.name)
+        self.assertEqual(result.semester, '1')
+        self.assertEqual(float(result.score), 90.0)
+        self.assertEqual(result.grade, 'A')
+        self.assertEqual(ResultApprovalWorkflow.objects.filter(result=result).count(), 1)
+
+        # Adding another assessment type later updates the same Result
+        response = upload({'test': {'score': 16, 'total': 20}})
+        self.assertEqual(response.status_code, 201)
+        result.refresh_from_db()
+        self.assertEqual(float(result.score), 87.14)  # (exam 90% * 50 + test 80% * 20) / 70
+        self.assertEqual(Result.objects.filter(student=self.student1).count(), 1)
+
     def test_bulk_upload_invalid_student(self):
         """Test bulk upload with invalid student ID."""
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
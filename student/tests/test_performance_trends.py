@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+
+from student.models import Faculty, Department, Program, Student, Result
+from student.tasks import mark_analytics_dirty
+from student.utilities_enhanced import performance_trends
+
+
+class PerformanceTrendsTest(TestCase):
+    """Trends come from one grouped query and are cached until a publish."""
+
+    def setUp(self):
+        cache.clear()
+        self.faculty = Faculty.objects.create(name='Business', code='BUS')
+        department = Department.objects.create(name='Accounting', code='ACC', faculty=self.faculty)
+        self.program = Program.objects.create(name='B.Sc Accounting', code='BSA', department=department)
+        self.other = Program.objects.create(name='B.Sc Finance', code='BSF', department=department)
+        user = User.objects.create_user(username='tr@example.com', password='pass123')
+        self.student = Student.objects.create(
+            user=user, student_id='TR1', email='tr@example.com',
+            faculty=self.faculty, department=department, program=self.program,
+        )
+        for i, (year, semester, score, grade) in enumerate((
+            ('2022/2023', '1', 80, 'A'), ('2022/2023', '1', 40, 'F'), ('2022/2023', '2', 60, 'C'),
+            ('2023/2024', '1', 70, 'B'), ('2024/2025', '1', 30, 'F'),
+        )):
+            self._result(f'Course {i}', year, semester, score, grade)
+
+    def _result(self, subject, year, semester, score, grade, published=True):
+        return Result.objects.create(
+            student=self.student, program=self.program, department=self.student.department, faculty=self.faculty,
+            subject=subject, result_type='exam', score=score, grade=grade, academic_year=year,
+            semester=semester, is_published=published,
+        )
+
+    def test_grouped_per_year_and_semester(self):
+        with self.assertNumQueries(1):
+            trends = performance_trends(program=self.program, start_year=2022, end_year=2023)
+        self.assertEqual([t['year'] for t in trends], ['2022/2023', '2023/2024'])
+        first = trends[0]
+        self.assertEqual((first['total'], first['passed'], first['avg_pass_rate']), (3, 2, 66.67))
+        self.assertEqual(first['avg_score'], 60.0)
+        self.assertEqual(
+            [(s['semester'], s['pass_rate'], s['avg_score']) for s in first['semesters']],
+            [('1', 50.0, 60.0), ('2', 100.0, 60.0)],
+        )
+        self.assertEqual(performance_trends(program=self.other), [])
+        self.assertEqual(len(performance_trends(faculty=self.faculty)), 3)
+
+    def test_cached_until_publish(self):
+        performance_trends(program=self.program)
+        with self.assertNumQueries(0):
+            performance_trends(program=self.program)
+
+        result = self._result('Late', '2024/2025', '1', 90, 'A', published=False)
+        with self.assertNumQueries(0):
+            self.assertEqual(performance_trends(program=self.program)[-1]['total'], 1)
+
+        Result.objects.filter(pk=result.pk).update(is_published=True)
+        mark_analytics_dirty([result])
+        self.assertEqual(performance_trends(program=self.program)[-1]['total'], 2)
+
+    def test_json_endpoint(self):
+        client = Client(SERVER_NAME='127.0.0.1')
+        client.force_login(self.student.user)
+        data = client.get('/student/enhanced/analytics/trends/', {'program': self.program.pk, 'start_year': 2024}).json()
+        self.assertEqual([t['year'] for t in data['trends']], ['2024/2025'])
+        self.assertEqual(client.get('/student/enhanced/analytics/trends/', {'end_year': 'x'}).status_code, 400)
+        response = client.get('/student/enhanced/analytics/trends/', {'program': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'program must be a numeric id'})
+        self.assertEqual(client.get('/student/enhanced/analytics/trends/', {'faculty': 99999}).status_code, 404)
@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from student.models import Result
+
+
+class ResultIndexBenchmarkTest(TestCase):
+    """The benchmark command reports plans for the hot filters and leaves no data behind."""
+
+    def test_plans_use_composite_indexes(self):
+        out = StringIO()
+        call_command('benchmark_result_indexes', '--rows', '400', '--batch-size', '100', stdout=out)
+        output = out.getvalue()
+        self.assertIn('result_prog_period_pub_idx', output)
+        self.assertIn('result_subject_period_idx', output)
+        self.assertIn('rolled back', output)
+        self.assertFalse(Result.objects.exists())
+
+    def test_without_indexes_shows_before_plans(self):
+        out = StringIO()
+        call_command('benchmark_result_indexes', '--rows', '400', '--without-indexes', stdout=out)
+        plans = out.getvalue().split('Seeded', 1)[1]
+        self.assertNotIn('result_prog_period_pub_idx', plans)
+        self.assertIn('Dropped result_prog_period_pub_idx', out.getvalue())
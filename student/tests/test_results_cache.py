@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from student.models import Student, Faculty, Department, Program, Result
+from student.results_cache import (
+    bump_results_version, cached_student_results, published_results, results_version,
+)
+
+
+class ResultsCacheTest(TestCase):
+    """A student's published results are read from the cache until their version is bumped."""
+
+    def setUp(self):
+        caches['results'].clear()
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        self.students = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'rc{i}@example.com', password='pass123')
+            self.students.append(Student.objects.create(
+                user=user, student_id=f'RC{i}', email=f'rc{i}@example.com',
+                faculty=faculty, department=department, program=self.program,
+            ))
+
+    def _result(self, student, subject, published=True):
+        return Result.objects.create(
+            student=student, program=self.program, subject=subject, result_type='exam',
+            score=70, grade='B', academic_year='2024/2025', semester='1', is_published=published,
+        )
+
+    def test_versions_are_per_student(self):
+        first, second = (results_version(s.pk) for s in self.students)
+        self.assertEqual(results_version(self.students[0].pk), first)
+
+        bump_results_version([self.students[0].pk, None])
+        self.assertNotEqual(results_version(self.students[0].pk), first)
+        self.assertEqual(results_version(self.students[1].pk), second)
+
+    def test_bump_orphans_cached_values(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(cached_student_results(self.students[0].pk, 'n', compute), 1)
+        self.assertEqual(cached_student_results(self.students[0].pk, 'n', compute), 1)
+        bump_results_version([self.students[0].pk])
+        self.assertEqual(cached_student_results(self.students[0].pk, 'n', compute), 2)
+
+    def test_published_results_follow_publish_and_edit(self):
+        student = self.students[0]
+        self._result(student, 'Algorithms')
+        pending = self._result(student, 'Calculus', published=False)
+        self.assertEqual([r.subject for r in published_results(student)], ['Algorithms'])
+        with self.assertNumQueries(0):
+            published_results(student)
+
+        pending.is_published = True
+        pending.save()
+        self.assertEqual({r.subject for r in published_results(student)}, {'Algorithms', 'Calculus'})
+
+        # Bumped again on commit, so nothing read mid-transaction survives it
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_results_version([student.pk])
+            during = results_version(student.pk)
+        self.assertNotEqual(results_version(student.pk), during)
+
+    def test_dashboard_reads_cache(self):
+        student = self.students[0]
+        self._result(student, 'Algorithms')
+        self.client.force_login(student.user)
+        self.assertContains(self.client.get('/student/dashboard/'), 'Algorithms')
+        with self.assertNumQueries(0):
+            published_results(student)
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from admin_hierarchy.models import ResultApprovalWorkflow
+from admin_hierarchy.workflow_actions import publish_workflows
+from student.models import Student, Faculty, Department, Program, Result
+from student.results_folder import render_results_folder, results_folder_context
+
+
+class ResultsFolderPageTest(TestCase):
+    """The results folder is built from a fixed number of queries and cached per student."""
+
+    def setUp(self):
+        caches['results'].clear()
+        faculty = Faculty.objects.create(name='Engineering', code='ENG')
+        department = Department.objects.create(name='Computer Science', code='CS', faculty=faculty)
+        self.program = Program.objects.create(name='B.Sc Computer Science', code='BSCS', department=department)
+        self.user = User.objects.create_user(username='rf@example.com', password='pass123')
+        self.student = Student.objects.create(
+            user=self.user, student_id='RF1', email='rf@example.com',
+            faculty=faculty, department=department, program=self.program,
+        )
+        self.client.force_login(self.user)
+
+    def _result(self, subject, score, grade, semester='1', published=True):
+        return Result.objects.create(
+            student=self.student, program=self.program, subject=subject, result_type='exam',
+            score=score, grade=grade, academic_year='2024/2025', semester=semester, is_published=published,
+        )
+
+    def test_context(self):
+        self._result('Algorithms', 80, 'A')
+        self._result('Calculus', 60, 'C')
+        self._result('Hidden', 99, 'A', published=False)
+        self._result('Physics', 0, 'F', semester='2')
+
+        with self.assertNumQueries(3):  # folders, prefetched results, summary aggregate
+            context = results_folder_context(self.student)
+        self.assertEqual([item['folder'].semester for item in context['folders_data']], ['2', '1'])
+        self.assertEqual([r.subject for r in context['folders_data'][1]['results']], ['Algorithms', 'Calculus'])
+        self.assertEqual(context['total_modules'], 3)
+        self.assertEqual(context['avg_grade'], '70.00%')  # zero scores are left out, as before
+        self.assertEqual(context['overall_gpa'], 'N/A')  # folder GPAs are only set on recalculation
+
+    def test_page_is_cached_until_results_change(self):
+        self._result('Algorithms', 80, 'A')
+        response = self.client.get('/student/results-folder/')
+        self.assertContains(response, 'Algorithms')
+        self.assertContains(response, '1 Subject')
+
+        with self.assertNumQueries(0):
+            render_results_folder(self.student)
+
+        result = self._result('Calculus', 65, 'C', published=False)
+        workflow = ResultApprovalWorkflow.objects.create(result=result, status='dean_approved')
+        self.assertNotIn('Calculus', render_results_folder(self.student))
+        publish_workflows(ResultApprovalWorkflow.objects.filter(pk=workflow.pk), self.user)
+        response = self.client.get('/student/results-folder/')
+        self.assertContains(response, 'Calculus')
+        self.assertContains(response, '2 Subjects')
+
+        result.refresh_from_db()
+        result.grade = 'B'
+        result.save()
+        self.assertContains(self.client.get('/student/results-folder/'), 'bg-success">B<')
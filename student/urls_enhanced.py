@@ -9,6 +9,7 @@ urlpatterns = [
     # ==================== 1. ANALYTICS & REPORTING ====================
     path('analytics/dashboard/', views_enhanced.analytics_dashboard, name='analytics_dashboard'),
     path('analytics/class-performance/', views_enhanced.class_performance_view, name='class_performance'),
+    path('analytics/trends/', views_enhanced.performance_trends_api, name='performance_trends_api'),
     path('analytics/generate-report/', views_enhanced.generate_analytics_report, name='generate_analytics_report'),
     path('analytics/report/<int:report_id>/', views_enhanced.view_analytics_report, name='view_analytics_report'),
     path('analytics/report/<int:report_id>/export-csv/', views_enhanced.export_analytics_csv, name='export_analytics_csv'),
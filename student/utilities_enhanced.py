@@ -2,11 +2,18 @@
 Utility functions for analytics, reporting, notifications, and calculations
 """
 
+import time
+from collections import defaultdict
 from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Avg, Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
-from student.models import Result, Assessment, Student, Module
+from student.models import Result, Assessment, Student, Module, PASSING_GRADES, grade_statistics
 from student.models_enhanced import (
     GradeDistributionSnapshot,
     ClassPerformanceMetrics,
@@ -29,21 +36,14 @@ def calculate_grade_distribution(program, academic_year, semester):
         is_published=True
     )
     
-    if not results.exists():
+    stats = grade_statistics(results)
+    if not stats['total']:
         return None
     
-    grade_counts = {
-        'A': results.filter(grade='A').count(),
-        'B': results.filter(grade='B').count(),
-        'C': results.filter(grade='C').count(),
-        'D': results.filter(grade='D').count(),
-        'F': results.filter(grade='F').count(),
-    }
-    
-    total_students = results.count()
-    average_score = results.aggregate(avg=Avg('score'))['avg'] or 0
-    pass_count = results.filter(grade__in=['A', 'B', 'C', 'D']).count()
-    pass_rate = (pass_count / total_students * 100) if total_students > 0 else 0
+    grade_counts = stats['grade_counts']
+    total_students = stats['total']
+    average_score = stats['average_score']
+    pass_rate = stats['pass_rate']
     
     snapshot, created = GradeDistributionSnapshot.objects.get_or_create(
         academic_year=academic_year,
@@ -75,91 +75,225 @@ def calculate_grade_distribution(program, academic_year, semester):
     return snapshot
 
 
+# Ten 10-mark bands for ClassPerformanceMetrics.score_histogram
+SCORE_HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+
+CLASS_METRIC_FIELDS = [
+    'class_average', 'highest_score', 'lowest_score', 'std_deviation', 'pass_rate',
+    'median_score', 'lower_quartile', 'upper_quartile', 'score_histogram',
+    'total_students_enrolled', 'total_students_passed', 'total_students_failed',
+]
+
+
+def _score_columns(rows):
+    """Split (score, grade) rows into a float score array and a pass mask."""
+    columns = np.array(rows, dtype=object).reshape(-1, 2)
+    return columns[:, 0].astype(float), np.isin(columns[:, 1].astype(str), PASSING_GRADES)
+
+
+def class_metrics_from_scores(scores, passed):
+    """ClassPerformanceMetrics field values from a score array and pass mask."""
+    total = int(scores.size)
+    pass_count = int(passed.sum())
+    lower_quartile, median, upper_quartile = np.percentile(scores, [25, 50, 75])
+    histogram, _ = np.histogram(np.clip(scores, 0, 100), bins=SCORE_HISTOGRAM_EDGES)
+    return {
+        'class_average': round(float(scores.mean()), 2),
+        'highest_score': float(scores.max()),
+        'lowest_score': float(scores.min()),
+        'std_deviation': round(float(scores.std()), 2),
+        'pass_rate': round(pass_count / total * 100, 2),
+        'median_score': round(float(median), 2),
+        'lower_quartile': round(float(lower_quartile), 2),
+        'upper_quartile': round(float(upper_quartile), 2),
+        'score_histogram': histogram.tolist(),
+        'total_students_enrolled': total,
+        'total_students_passed': pass_count,
+        'total_students_failed': total - pass_count,
+    }
+
+
+def _save_class_metrics(values_by_module, academic_year, semester):
+    """Upsert one ClassPerformanceMetrics row per module with bulk writes."""
+    existing = {
+        metrics.module_id: metrics
+        for metrics in ClassPerformanceMetrics.objects.filter(module__in=[m.pk for m in values_by_module])
+    }
+    now = timezone.now()
+    created, updated = [], []
+    for module, values in values_by_module.items():
+        metrics = existing.get(module.pk)
+        if metrics is None:
+            metrics = ClassPerformanceMetrics(module=module)
+            created.append(metrics)
+        else:
+            updated.append(metrics)
+        metrics.academic_year, metrics.semester, metrics.last_updated = academic_year, semester, now
+        for field, value in values.items():
+            setattr(metrics, field, value)
+
+    ClassPerformanceMetrics.objects.bulk_create(created, batch_size=500)
+    ClassPerformanceMetrics.objects.bulk_update(
+        updated, CLASS_METRIC_FIELDS + ['academic_year', 'semester', 'last_updated'], batch_size=500,
+    )
+    return created + updated
+
+
 def calculate_class_performance_metrics(module, academic_year, semester):
     """Calculate performance metrics for a specific module"""
-    results = Result.objects.filter(
+    rows = list(Result.objects.filter(
         subject=module.name,
         academic_year=academic_year,
         semester=semester,
         is_published=True
-    )
+    ).order_by().values_list('score', 'grade'))
     
-    if not results.exists():
+    if not rows:
         return None
     
-    scores = [float(r.score) for r in results]
-    
-    class_average = sum(scores) / len(scores) if scores else 0
-    highest_score = max(scores) if scores else 0
-    lowest_score = min(scores) if scores else 0
-    
-    # Calculate standard deviation
-    if len(scores) > 1:
-        mean = class_average
-        variance = sum((x - mean) ** 2 for x in scores) / len(scores)
-        std_deviation = variance ** 0.5
-    else:
-        std_deviation = 0
-    
-    pass_count = results.filter(grade__in=['A', 'B', 'C', 'D']).count()
-    total = results.count()
-    pass_rate = (pass_count / total * 100) if total > 0 else 0
-    
-    metrics, created = ClassPerformanceMetrics.objects.get_or_create(
-        module=module,
-        academic_year=academic_year,
-        semester=semester,
-        defaults={
-            'class_average': class_average,
-            'highest_score': highest_score,
-            'lowest_score': lowest_score,
-            'std_deviation': std_deviation,
-            'pass_rate': pass_rate,
-            'total_students_enrolled': total,
-            'total_students_passed': pass_count,
-            'total_students_failed': total - pass_count,
-        }
+    values = class_metrics_from_scores(*_score_columns(rows))
+    return _save_class_metrics({module: values}, academic_year, semester)[0]
+
+
+def calculate_semester_class_metrics(academic_year, semester, subjects=None):
+    """Calculate performance metrics for every module with published results in a semester.
+
+    All (subject, score, grade) rows of the semester are read in one query,
+    sorted by subject in NumPy and split into one slice per subject. Modules
+    sharing a name share the subject's metrics, as in the single-module
+    version. `subjects` limits the run to those module names; their metrics
+    are removed when no published results remain. Returns the saved
+    ClassPerformanceMetrics rows.
+    """
+    modules = Module.objects.only('id', 'name').order_by()
+    results = Result.objects.filter(academic_year=academic_year, semester=semester, is_published=True)
+    if subjects is not None:
+        modules = modules.filter(name__in=subjects)
+        results = results.filter(subject__in=subjects)
+
+    modules_by_name = defaultdict(list)
+    for module in modules:
+        modules_by_name[module.name].append(module)
+
+    rows = list(results.order_by().values_list('subject', 'score', 'grade'))
+    if subjects is not None:
+        emptied = set(subjects) - {row[0] for row in rows}
+        if emptied:
+            ClassPerformanceMetrics.objects.filter(
+                module__name__in=emptied, academic_year=academic_year, semester=semester,
+            ).delete()
+    if not rows:
+        return []
+
+    columns = np.array(rows, dtype=object)
+    order = np.argsort(columns[:, 0].astype(str), kind='stable')
+    columns = columns[order]
+    subjects, starts = np.unique(columns[:, 0].astype(str), return_index=True)
+    scores, passed = _score_columns(columns[:, 1:])
+
+    values_by_module = {}
+    for subject, group in zip(subjects, np.split(np.arange(len(columns)), starts[1:])):
+        modules = modules_by_name.get(subject)
+        if not modules:
+            continue
+        values = class_metrics_from_scores(scores[group], passed[group])
+        for module in modules:
+            values_by_module[module] = values
+    return _save_class_metrics(values_by_module, academic_year, semester)
+
+
+def _trend_version_key(scope, pk):
+    return f'performance-trends-version:{scope}:{pk}'
+
+
+def _trend_version(scope, pk):
+    key = _trend_version_key(scope, pk)
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def _rate(passed, total):
+    return round(passed / total * 100, 2) if total else 0
+
+
+def performance_trends(program=None, department=None, faculty=None, start_year=None, end_year=None):
+    """Per-year and per-semester pass rate and mean score of published results.
+
+    Scoped to at most one of program/department/faculty (all results when
+    none is given) and to academic years starting in start_year..end_year
+    (open-ended when omitted). The rows come from one query grouped by
+    academic_year and semester; years are combined from their semesters
+    weighted by result count. Cached per scope until a result of that scope
+    is published, see invalidate_performance_trends.
+    """
+    scope, scope_obj = next(
+        ((name, obj) for name, obj in (('program', program), ('department', department), ('faculty', faculty)) if obj),
+        ('all', None),
     )
-    
-    if not created:
-        metrics.class_average = class_average
-        metrics.highest_score = highest_score
-        metrics.lowest_score = lowest_score
-        metrics.std_deviation = std_deviation
-        metrics.pass_rate = pass_rate
-        metrics.total_students_enrolled = total
-        metrics.total_students_passed = pass_count
-        metrics.total_students_failed = total - pass_count
-        metrics.save()
-    
-    return metrics
-
+    pk = scope_obj.pk if scope_obj else 0
+    cache_key = f'performance-trends:{scope}:{pk}:{_trend_version(scope, pk)}:{start_year}:{end_year}'
+    trends = cache.get(cache_key)
+    if trends is not None:
+        return trends
+
+    results = Result.objects.filter(is_published=True)
+    if scope_obj:
+        results = results.filter(**{scope: scope_obj})
+    if start_year is not None:
+        results = results.filter(academic_year__gte=f'{start_year}/')
+    if end_year is not None:
+        results = results.filter(academic_year__lt=f'{end_year + 1}/')
+
+    years = {}
+    for row in results.values('academic_year', 'semester').annotate(
+        total=Count('id'),
+        passed=Count('id', filter=Q(grade__in=PASSING_GRADES)),
+        avg_score=Avg('score'),
+    ).order_by('academic_year', 'semester'):
+        year = years.setdefault(row['academic_year'], {
+            'year': row['academic_year'], 'total': 0, 'passed': 0, 'score_sum': 0.0, 'semesters': [],
+        })
+        avg_score = float(row['avg_score'] or 0)
+        year['total'] += row['total']
+        year['passed'] += row['passed']
+        year['score_sum'] += avg_score * row['total']
+        year['semesters'].append({
+            'semester': row['semester'],
+            'total': row['total'],
+            'passed': row['passed'],
+            'pass_rate': _rate(row['passed'], row['total']),
+            'avg_score': round(avg_score, 2),
+        })
 
-def get_trend_analysis(program, years=3):
-    """Get performance trend over multiple academic years"""
-    from django.db.models import Avg
-    
     trends = []
-    for i in range(years):
-        # Get all academic years - simplified for demonstration
-        year = 2024 - i
-        snapshots = GradeDistributionSnapshot.objects.filter(
-            program=program,
-            academic_year=f"{year}/{year+1}"
-        )
-        
-        if snapshots.exists():
-            avg_pass_rate = snapshots.aggregate(avg=Avg('pass_rate'))['avg'] or 0
-            avg_score = snapshots.aggregate(avg=Avg('average_score'))['avg'] or 0
-            trends.append({
-                'year': f"{year}/{year+1}",
-                'avg_pass_rate': avg_pass_rate,
-                'avg_score': avg_score,
-            })
-    
+    for year in years.values():
+        score_sum = year.pop('score_sum')
+        year['avg_pass_rate'] = _rate(year['passed'], year['total'])
+        year['avg_score'] = round(score_sum / year['total'], 2) if year['total'] else 0
+        trends.append(year)
+
+    cache.set(cache_key, trends, getattr(settings, 'PERFORMANCE_TREND_TTL', 3600))
     return trends
 
 
+def invalidate_performance_trends(results):
+    """Drop the cached trends of every scope the given Result rows belong to."""
+    keys = {_trend_version_key('all', 0)}
+    for result in results:
+        for scope in ('program', 'department', 'faculty'):
+            pk = getattr(result, f'{scope}_id')
+            if pk:
+                keys.add(_trend_version_key(scope, pk))
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_trend_analysis(program, years=3):
+    """Get performance trend over the last `years` academic years, newest first"""
+    end_year = int(get_current_academic_year().split('/')[0])
+    return performance_trends(program=program, start_year=end_year - years + 1, end_year=end_year)[::-1]
+
+
 def identify_at_risk_students(academic_year, semester, gpa_threshold=1.5):
     """Identify students at risk of failing or on probation"""
     from student.models import StudentSemesterFolder
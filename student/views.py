@@ -9,7 +9,9 @@ from django.views.decorators.http import require_http_methods
 from io import BytesIO
 import json
 
-from .models import Student, Result, StudentSemesterFolder
+from .models import Student, Result
+from .results_cache import published_results
+from .results_folder import render_results_folder
 from django.contrib.auth import update_session_auth_hash
 from django.urls import reverse
 
@@ -111,8 +113,8 @@ def student_dashboard(request):
     except:
         return redirect('student_login')
     
-    # Get all results for the student
-    results = Result.objects.filter(student=student, is_published=True).order_by('-published_date')
+    # Published results, from the results-day read cache
+    results = published_results(student)
     
     # Group results by academic year
     results_by_year = {}
@@ -131,7 +133,7 @@ def student_dashboard(request):
     context = {
         'student': student,
         'results_by_year': results_by_year,
-        'total_results': results.count(),
+        'total_results': len(results),
         'publishing_messages': publishing_messages,  # Messages about when results will be published
     }
     
@@ -146,50 +148,9 @@ def student_results_folder(request):
     except:
         return redirect('student_login')
     
-    # Get all semester folders for the student
-    folders = StudentSemesterFolder.objects.filter(
-        student=student
-    ).select_related('program', 'department', 'faculty').order_by('-academic_year', '-semester')
-    
-    # Get data for each folder
-    folders_data = []
-    for folder in folders:
-        results = folder.results.filter(is_published=True).order_by('subject')
-        folders_data.append({
-            'folder': folder,
-            'results': results,
-            'total_score': folder.total_score,
-            'gpa': folder.gpa,
-        })
-    
-    # Calculate cumulative statistics (across all semesters)
-    all_results = Result.objects.filter(student=student, is_published=True)
-    total_modules = all_results.count()
-    
-    # Overall average
-    avg_grade = 'N/A'
-    if all_results.exists():
-        grades = []
-        for result in all_results:
-            if result.score and result.total_score and result.total_score > 0:
-                percentage = (result.score / result.total_score) * 100
-                grades.append(percentage)
-        if grades:
-            avg_grade = f"{sum(grades) / len(grades):.2f}%"
-    
-    # Overall GPA (average of all semester GPAs)
-    overall_gpa = 'N/A'
-    if folders.exists():
-        gpa_values = [f.gpa for f in folders if f.gpa > 0]
-        if gpa_values:
-            overall_gpa = round(sum(gpa_values) / len(gpa_values), 2)
-
     context = {
         'student': student,
-        'folders_data': folders_data,
-        'total_modules': total_modules,
-        'avg_grade': avg_grade,
-        'overall_gpa': overall_gpa,
+        'results_folder_body': render_results_folder(student),
     }
     
     return render(request, 'student/results_folder.html', context)
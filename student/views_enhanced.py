@@ -15,7 +15,7 @@ from datetime import timedelta
 import json
 import csv
 
-from student.models import Student, Result, Module, Program, Assessment, StudentSemesterFolder
+from student.models import Student, Result, Module, Program, Assessment, StudentSemesterFolder, Department, Faculty
 from student.models_enhanced import (
     GradeDistributionSnapshot,
     ClassPerformanceMetrics,
@@ -53,6 +53,7 @@ from student.utilities_enhanced import (
     calculate_grade_distribution,
     calculate_class_performance_metrics,
     get_trend_analysis,
+    performance_trends,
     identify_at_risk_students,
     calculate_gpa_from_grades,
     recalculate_student_cumulative_gpa,
@@ -86,17 +87,9 @@ def analytics_dashboard(request):
     # Get at-risk students
     at_risk_students = identify_at_risk_students(academic_year, semester)
     
-    # Get trend data
-    trends = []
-    for year in range(2022, 2025):
-        trend_snapshots = GradeDistributionSnapshot.objects.filter(
-            academic_year=f"{year}/{year+1}"
-        )
-        if trend_snapshots.exists():
-            trends.append({
-                'year': f"{year}/{year+1}",
-                'avg_pass_rate': trend_snapshots.aggregate(avg=Avg('pass_rate'))['avg'] or 0,
-            })
+    # Get trend data for the three academic years up to the selected one
+    end_year = int(academic_year.split('/')[0]) if academic_year[:4].isdigit() else None
+    trends = performance_trends(start_year=end_year - 2 if end_year else None, end_year=end_year)
     
     context = {
         'academic_year': academic_year,
@@ -112,6 +105,33 @@ def analytics_dashboard(request):
     return render(request, 'analytics/dashboard.html', context)
 
 
+@login_required
+def performance_trends_api(request):
+    """JSON pass rate and mean score per academic year and semester.
+
+    Optional ?program=, ?department= or ?faculty= (ids) narrow the scope;
+    ?start_year= and ?end_year= (e.g. 2021, 2024) bound the years.
+    """
+    scope = {}
+    for name, model in (('program', Program), ('department', Department), ('faculty', Faculty)):
+        if request.GET.get(name):
+            try:
+                pk = int(request.GET[name])
+            except ValueError:
+                return JsonResponse({'error': f'{name} must be a numeric id'}, status=400)
+            scope[name] = get_object_or_404(model, pk=pk)
+            break
+
+    try:
+        years = {
+            name: int(request.GET[name]) for name in ('start_year', 'end_year') if request.GET.get(name)
+        }
+    except ValueError:
+        return JsonResponse({'error': 'start_year and end_year must be years, e.g. 2024'}, status=400)
+
+    return JsonResponse({'trends': performance_trends(**scope, **years)})
+
+
 @login_required
 def class_performance_view(request):
     """View class performance metrics"""